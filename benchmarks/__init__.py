@@ -0,0 +1,15 @@
+"""
+Offline benchmark suite for journeylogger's hot paths.
+
+Run from the repo root:
+    python -m benchmarks                      # run everything, write results JSON
+    python -m benchmarks --compare A.json B.json
+"""
+
+import sys
+from pathlib import Path
+
+# Allow running from a plain checkout without `pip install -e .`
+_src = Path(__file__).resolve().parent.parent / "src"
+if str(_src) not in sys.path:
+    sys.path.insert(0, str(_src))
@@ -0,0 +1,65 @@
+# benchmarks/__main__.py
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def parse_args():
+    p = argparse.ArgumentParser(prog="python -m benchmarks")
+    p.add_argument("--only", action="append", help="Run only the named suite (repeatable)")
+    p.add_argument("--min-time", type=float, default=1.0, help="Seconds measured per benchmark")
+    p.add_argument("--quick", action="store_true", help="Shorthand for --min-time 0.2")
+    p.add_argument("-o", "--output", type=Path, help="Results JSON path (default benchmarks/results/<commit>.json)")
+    p.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"), type=Path,
+                   help="Compare two result files instead of running")
+    p.add_argument("--threshold", type=float, default=0.10, help="Allowed p50 slowdown before flagging (0.10 = 10%%)")
+    return p.parse_args()
+
+
+def compare(base: Path, head: Path, threshold: float) -> int:
+    from .harness import compare_results
+
+    rows = compare_results(base, head, threshold)
+    print(f"{'benchmark':<36}{'base p50 µs':>14}{'head p50 µs':>14}{'ratio':>9}")
+    for r in rows:
+        flag = "  ⚠️ regression" if r["regressed"] else ""
+        print(f"{r['name']:<36}{r['base']:>14.1f}{r['head']:>14.1f}{r['ratio']:>9.2f}{flag}")
+    return 1 if any(r["regressed"] for r in rows) else 0
+
+
+def main():
+    args = parse_args()
+    if args.compare:
+        sys.exit(compare(*args.compare, args.threshold))
+
+    # Must happen before journeylogger is imported: no network, in-memory sheet
+    os.environ["JOURNEYLOGGER_HTTP_MODE"] = "replay"
+
+    from .harness import format_table, git_commit, save_results
+    from .suites import SUITES, configure_pipeline
+
+    configure_pipeline()
+    min_time = 0.2 if args.quick else args.min_time
+    selected = args.only or list(SUITES)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="journeylogger-fixtures-") as fixture_dir:
+        for name in selected:
+            suite = SUITES[name]
+            print(f"▶ {name}", file=sys.stderr)
+            if name == "providers":
+                results.extend(suite(min_time, fixture_dir))
+            else:
+                results.extend(suite(min_time))
+
+    print(format_table(results))
+    out = save_results(results, args.output or RESULTS_DIR / f"{git_commit()}.json")
+    print(f"\n📄 Results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
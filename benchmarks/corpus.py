@@ -0,0 +1,129 @@
+# benchmarks/corpus.py
+"""
+Deterministic, realistic-looking inputs for the benchmarks: NI addresses built
+from towns.csv, expanded Google /dir/ URLs, Apple Maps links and short links.
+"""
+
+import random
+import re
+from pathlib import Path
+from urllib.parse import quote, quote_plus
+
+import pandas as pd
+
+towns_data_path = Path(__file__).resolve().parent.parent / "resources" / "data" / "towns.csv"
+
+STREETS = [
+    "Main Street", "High Street", "Church Road", "Station Road", "Mill Road",
+    "Belfast Road", "Dublin Road", "Bridge Street", "Market Square", "Castle Street",
+    "Ballymena Road", "Glen Road", "Shore Road", "Manse Road", "Killinchy Road",
+]
+PREMISES = [
+    "", "", "", "Unit 4 Generic Business Park", "Riverside Health Centre",
+    "Royal Victoria Hospital", "St Mary's Primary School", "The Old Mill",
+]
+
+# Northern Ireland bounding box, used for synthetic coordinates
+NI_LAT = (54.02, 55.30)
+NI_LON = (-8.15, -5.43)
+
+
+def load_towns() -> list[str]:
+    df = pd.read_csv(towns_data_path)
+    names = df["settlement"].str.replace(r"\[.*?\]", "", regex=True).str.strip()
+    return [n for n in names if n and not re.search(r"urban area|metropolitan", n, re.IGNORECASE)]
+
+
+def random_postcode(rng: random.Random) -> str:
+    letters = "ABDEFGHJLNPQRSTUWXYZ"
+    return f"BT{rng.randint(1, 94)} {rng.randint(0, 9)}{rng.choice(letters)}{rng.choice(letters)}"
+
+
+def random_latlon(rng: random.Random) -> tuple[float, float]:
+    return round(rng.uniform(*NI_LAT), 6), round(rng.uniform(*NI_LON), 6)
+
+
+def address_corpus(n: int = 400, seed: int = 7) -> list[str]:
+    """Mix of full, partial, postcode-only and unknown-town addresses."""
+    rng = random.Random(seed)
+    towns = load_towns()
+    out = []
+    for _ in range(n):
+        street = f"{rng.randint(1, 220)} {rng.choice(STREETS)}"
+        town = rng.choice(towns)
+        premises = rng.choice(PREMISES)
+        shape = rng.random()
+        if shape < 0.45:
+            parts = [street, town, random_postcode(rng)]
+        elif shape < 0.65:
+            parts = [premises or street, rng.choice(STREETS), town]
+        elif shape < 0.80:
+            parts = [street, f"{town} {random_postcode(rng)}"]
+        elif shape < 0.90:
+            parts = [street, "Tullyhappy", "Co. Armagh"]
+        else:
+            parts = [street, town, "County Down", random_postcode(rng), "United Kingdom"]
+        out.append(", ".join(p for p in parts if p))
+    return out
+
+
+def gmaps_dir_urls(n: int = 200, seed: int = 11) -> list[str]:
+    """Expanded /dir/ URLs as returned after following a maps.app.goo.gl link."""
+    rng = random.Random(seed)
+    addresses = address_corpus(n * 2, seed)
+    urls = []
+    for i in range(n):
+        lat, lon = random_latlon(rng)
+        origin = quote_plus(addresses[2 * i]).replace("%2C", ",")
+        dest = quote_plus(addresses[2 * i + 1]).replace("%2C", ",")
+        urls.append(
+            f"https://www.google.com/maps/dir/{origin}/{dest}/@{lat},{lon},12z/"
+            f"data=!3m1!4b1!4m14!4m13!1m5!1m1!1s0x0:0x0!2m2!1d{lon}!2d{lat}!1m5!1m1!1s0x0:0x0?entry=ttu"
+        )
+    return urls
+
+
+def apple_urls(n: int = 200, seed: int = 13) -> list[str]:
+    rng = random.Random(seed)
+    addresses = address_corpus(n, seed)
+    urls = []
+    for addr in addresses:
+        shape = rng.random()
+        if shape < 0.6:
+            urls.append(f"https://maps.apple.com/?address={quote(addr)}")
+        elif shape < 0.85:
+            lat, lon = random_latlon(rng)
+            urls.append(f"https://maps.apple.com/?daddr={quote(addr)}&ll={lat},{lon}")
+        else:
+            lat, lon = random_latlon(rng)
+            urls.append(f"https://maps.apple.com/?ll={lat},{lon}&q=Dropped%20Pin")
+    return urls
+
+
+def short_links(n: int = 50, seed: int = 17) -> dict[str, str]:
+    """maps.app.goo.gl short link → expanded /dir/ URL."""
+    rng = random.Random(seed)
+    alphabet = "ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz23456789"
+    return {
+        "https://maps.app.goo.gl/" + "".join(rng.choice(alphabet) for _ in range(17)): full
+        for full in gmaps_dir_urls(n, seed)
+    }
+
+
+SYLLABLES = [
+    "bally", "kil", "drum", "carrick", "glen", "derry", "letter", "knock", "lis", "tully",
+    "ard", "castle", "mount", "rath", "clon", "annagh", "augh", "more", "beg", "nagh",
+    "mona", "lough", "corr", "dun", "gort", "inish", "shan", "kirk", "ton", "ham",
+]
+QUALIFIERS = ["", "", "", "", "Upper ", "Lower ", "North ", "East ", "Little "]
+SUFFIXES = ["", "", "", "", " Green", " Bridge", " on Sea", " Cross", " End"]
+
+
+def synthetic_settlements(n: int, seed: int = 43) -> list[str]:
+    """n distinct made-up place names, to grow the settlement list without real data."""
+    rng = random.Random(seed)
+    names: dict[str, None] = {}
+    while len(names) < n:
+        stem = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+        names[f"{rng.choice(QUALIFIERS)}{stem}{rng.choice(SUFFIXES)}"] = None
+    return list(names)
@@ -0,0 +1,146 @@
+# benchmarks/fake_providers.py
+"""
+Deterministic stand-ins for Google, Nominatim, Photon, ORS and postcodes.io.
+
+The fake transport is plugged into http_client in record mode so that running
+the real pipeline once fills a fixture store whose keys match exactly what the
+providers send. Benchmarks and load tests then replay that store offline.
+"""
+
+import hashlib
+import json
+import math
+import tempfile
+from urllib.parse import urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .corpus import NI_LAT, NI_LON, short_links
+
+ROAD_FACTOR = 1.3
+
+
+def _hash_unit(text: str, salt: str) -> float:
+    digest = hashlib.sha1(f"{salt}:{text}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2**64
+
+
+def fake_coords(text: str) -> tuple[float, float]:
+    """Same text → same point inside Northern Ireland."""
+    lat = NI_LAT[0] + (NI_LAT[1] - NI_LAT[0]) * _hash_unit(text, "lat")
+    lon = NI_LON[0] + (NI_LON[1] - NI_LON[0]) * _hash_unit(text, "lon")
+    return round(lat, 6), round(lon, 6)
+
+
+def fake_postcode(text: str) -> str:
+    n = int(_hash_unit(text, "pc") * 10_000)
+    return f"BT{n % 94 + 1} {n % 10}{'ABDEFGHJLN'[n % 10]}{'PQRSTUWXYZ'[(n // 10) % 10]}"
+
+
+def _address(text: str) -> dict:
+    parts = [p.strip() for p in text.split(",") if p.strip()]
+    town = parts[1] if len(parts) > 1 else (parts[0] if parts else "Belfast")
+    return {
+        "road": parts[0] if parts else "",
+        "town": town,
+        "county": "County Down",
+        "state": "Northern Ireland",
+        "postcode": fake_postcode(text),
+        "country": "United Kingdom",
+        "country_code": "gb",
+    }
+
+
+def _haversine_m(lat1, lon1, lat2, lon2) -> float:
+    r = 6_371_000
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * r * math.asin(math.sqrt(a))
+
+
+def _response(url: str, payload, status: int = 200) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = status
+    resp.url = url
+    resp.encoding = "utf-8"
+    resp.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+    resp._content = (payload if isinstance(payload, str) else json.dumps(payload)).encode("utf-8")
+    return resp
+
+
+class FakeProviders:
+    """Callable with requests.request's signature answering every provider URL."""
+
+    def __init__(self, links: dict[str, str] | None = None):
+        self.links = dict(links or {})
+        self.calls = 0
+
+    def __call__(self, method, url, params=None, json=None, **kwargs):
+        self.calls += 1
+        params = params or {}
+        host, path = urlparse(url).netloc, urlparse(url).path
+
+        if host == "maps.app.goo.gl":
+            return _response(self.links.get(url.split("?")[0], url), "")
+
+        if host == "nominatim.openstreetmap.org" and path == "/search":
+            lat, lon = fake_coords(params["q"])
+            return _response(url, [{"lat": str(lat), "lon": str(lon), "address": _address(params["q"])}])
+
+        if host == "nominatim.openstreetmap.org" and path == "/reverse":
+            key = f"{float(params['lat']):.5f},{float(params['lon']):.5f}"
+            return _response(url, {"address": _address(f"{key}, {fake_postcode(key)[:4]}")})
+
+        if host == "photon.komoot.io":
+            lat, lon = fake_coords(params["q"])
+            return _response(url, {"features": [{"geometry": {"coordinates": [lon, lat]}}]})
+
+        if host == "api.openrouteservice.org" and "/geocode/" in path:
+            lat, lon = fake_coords(params["text"])
+            return _response(url, {"features": [{"geometry": {"coordinates": [lon, lat]}}]})
+
+        if host == "api.openrouteservice.org" and "/directions/" in path:
+            coords = json["coordinates"]
+            segments = [
+                {"distance": ROAD_FACTOR * _haversine_m(a[1], a[0], b[1], b[0]), "duration": 0.0}
+                for a, b in zip(coords, coords[1:])
+            ]
+            total = sum(s["distance"] for s in segments)
+            return _response(url, {"routes": [{"summary": {"distance": total}, "segments": segments}]})
+
+        if host == "api.postcodes.io":
+            outcode = path.rsplit("/", 1)[-1].split(" ")[0]
+            return _response(url, {"status": 200, "result": {"admin_district": f"District {outcode}"}})
+
+        return _response(url, {"error": "not faked"}, status=404)
+
+
+def build_fixture_store(directory=None, addresses=(), coords=(), links=None, urls=None) -> str:
+    """
+    Record fixtures for every provider call made by lookup_location() on each
+    address/coordinate string and by process_maps_link() on each URL.
+    `links` maps short links to the URL they expand to; `urls` defaults to
+    those short links. Returns the fixture directory.
+    """
+    from journeylogger import http_client
+    from journeylogger.map_utils import lookup_location
+    from journeylogger.map_processor import process_maps_link
+    from journeylogger.sheet_writer import MemorySheet
+
+    directory = directory or tempfile.mkdtemp(prefix="journeylogger-fixtures-")
+    links = links if links is not None else short_links()
+    fake = FakeProviders(links)
+
+    previous = (http_client.get_mode(), http_client._transport)
+    http_client.configure(mode="record", fixture_dir=directory, transport=fake)
+    sheet = MemorySheet()  # recording must not open the real sheet for origins
+    try:
+        for value in list(addresses) + list(coords):
+            lookup_location(value)
+        for url in (urls if urls is not None else links):
+            process_maps_link(url, target_sheet=sheet)
+    finally:
+        http_client.configure(mode=previous[0], transport=previous[1])
+    return directory
@@ -0,0 +1,181 @@
+# benchmarks/fake_telegram.py
+"""
+Local stand-in for the Telegram Bot API (api.telegram.org).
+
+Implements just enough of the HTTP API for python-telegram-bot to poll for
+updates and reply: getMe, getUpdates (long polling), sendMessage,
+editMessageText, deleteWebhook, setWebhook and getWebhookInfo. Updates are
+injected with push_message(); once the bot has called setWebhook they are
+POSTed to it instead, like Telegram does. Every bot call is timestamped so
+the load generator can measure reply latency.
+"""
+
+import json
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "JourneyLogger", "username": "journeylogger_bot"}
+
+
+class FakeTelegramServer:
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._lock = threading.Condition()
+        self._updates: list[dict] = []
+        self._next_update_id = 1
+        self._next_message_id = defaultdict(lambda: 1000)
+        self.sent: dict[int, list[dict]] = defaultdict(list)   # chat_id → outgoing calls
+        self.pushed: dict[int, float] = {}                      # update_id → push time
+        self.on_outgoing = None                                 # optional callback(call)
+        self.webhook_url: str | None = None
+        self.webhook_secret: str | None = None
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length).decode("utf-8") if length else ""
+                if self.headers.get("Content-Type", "").startswith("application/json"):
+                    params = json.loads(raw or "{}")
+                else:
+                    params = dict(parse_qsl(raw))
+                method = self.path.rsplit("/", 1)[-1]
+                result = server.dispatch(method, params)
+                body = json.dumps({"ok": True, "result": result}).encode("utf-8")
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # bot hung up mid long-poll during shutdown
+
+            do_GET = do_POST
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/bot"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._lock:
+            self._lock.notify_all()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    # ─── Injecting traffic ────────────────────────────────────────────────────────
+
+    def push_message(self, user_id: int, text: str, username: str | None = None) -> int:
+        """Queue a private text message from user_id; returns its update_id."""
+        with self._lock:
+            update_id = self._next_update_id
+            self._next_update_id += 1
+            user = {"id": user_id, "is_bot": False, "first_name": f"Driver {user_id}",
+                    "username": username or f"driver{user_id}"}
+            update = {
+                "update_id": update_id,
+                "message": {
+                    "message_id": update_id,
+                    "date": int(time.time()),
+                    "chat": {"id": user_id, "type": "private", "first_name": user["first_name"]},
+                    "from": user,
+                    "text": text,
+                },
+            }
+            self.pushed[update_id] = time.perf_counter()
+            if not self.webhook_url:
+                self._updates.append(update)
+                self._lock.notify_all()
+                return update_id
+
+        self._deliver(update)
+        return update_id
+
+    def _deliver(self, update: dict):
+        req = urllib.request.Request(
+            self.webhook_url,
+            data=json.dumps(update).encode("utf-8"),
+            headers={"Content-Type": "application/json",
+                     "X-Telegram-Bot-Api-Secret-Token": self.webhook_secret or ""},
+            method="POST",
+        )
+        with urllib.request.urlopen(req, timeout=10) as resp:
+            resp.read()
+
+    # ─── Bot API methods ─────────────────────────────────────────────────────────
+
+    def dispatch(self, method: str, params: dict):
+        handler = getattr(self, f"api_{method}", None)
+        return handler(params) if handler else True
+
+    def api_getMe(self, params):
+        return BOT_USER
+
+    def api_deleteWebhook(self, params):
+        self.webhook_url = self.webhook_secret = None
+        return True
+
+    def api_setWebhook(self, params):
+        self.webhook_url = params.get("url")
+        self.webhook_secret = params.get("secret_token")
+        return True
+
+    def api_getWebhookInfo(self, params):
+        return {"url": self.webhook_url or "", "has_custom_certificate": False,
+                "pending_update_count": len(self._updates)}
+
+    def api_getUpdates(self, params):
+        offset = int(params.get("offset") or 0)
+        timeout = float(params.get("timeout") or 0)
+        limit = int(params.get("limit") or 100)
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            # Confirm everything below the offset, as Telegram does
+            self._updates = [u for u in self._updates if u["update_id"] >= offset]
+            while not self._updates and time.monotonic() < deadline:
+                self._lock.wait(deadline - time.monotonic())
+            return self._updates[:limit]
+
+    def _record(self, method: str, params: dict, message_id: int | None = None) -> dict:
+        chat_id = int(params["chat_id"])
+        with self._lock:
+            if message_id is None:
+                message_id = self._next_message_id[chat_id]
+                self._next_message_id[chat_id] += 1
+        call = {"method": method, "chat_id": chat_id, "message_id": message_id,
+                "text": params.get("text", ""), "at": time.perf_counter()}
+        self.sent[chat_id].append(call)
+        if self.on_outgoing:
+            self.on_outgoing(call)
+        return {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": BOT_USER,
+            "text": call["text"],
+        }
+
+    def api_sendMessage(self, params):
+        return self._record("sendMessage", params)
+
+    def api_editMessageText(self, params):
+        return self._record("editMessageText", params, message_id=int(params["message_id"]))
@@ -0,0 +1,108 @@
+# benchmarks/harness.py
+"""
+Minimal timing harness: per-call wall times with perf_counter_ns, summarised as
+mean / percentiles / throughput, plus helpers to save and compare result files.
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def summarise(name: str, samples_ns: list[int], **extra) -> dict:
+    us = sorted(s / 1000 for s in samples_ns)
+    total_s = sum(samples_ns) / 1e9
+    return {
+        "name": name,
+        "calls": len(us),
+        "mean_us": round(statistics.fmean(us), 3),
+        "p50_us": round(percentile(us, 50), 3),
+        "p95_us": round(percentile(us, 95), 3),
+        "p99_us": round(percentile(us, 99), 3),
+        "min_us": round(us[0], 3),
+        "ops_per_sec": round(len(us) / total_s, 1) if total_s else None,
+        **extra,
+    }
+
+
+def run_benchmark(name: str, fn, inputs: list, min_time: float = 1.0, warmup: int = 1, **extra) -> dict:
+    """
+    Call fn(x) for every x in inputs, looping over the inputs until at least
+    min_time seconds have been measured (always at least one full pass).
+    """
+    for x in inputs[:warmup]:
+        fn(x)
+
+    samples: list[int] = []
+    spent = 0
+    clock = time.perf_counter_ns
+    while True:
+        for x in inputs:
+            t0 = clock()
+            fn(x)
+            dt = clock() - t0
+            samples.append(dt)
+            spent += dt
+        if spent >= min_time * 1e9:
+            break
+    return summarise(name, samples, inputs=len(inputs), **extra)
+
+
+# ─── Result files ──────────────────────────────────────────────────────────────
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def save_results(results: list[dict], path: Path) -> Path:
+    payload = {
+        "commit": git_commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": {r["name"]: r for r in results},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    return path
+
+
+def compare_results(base_path: Path, head_path: Path, threshold: float = 0.10, metric: str = "p50_us") -> list[dict]:
+    """Rows of (name, base, head, ratio, regressed) for benchmarks present in both files."""
+    with open(base_path, encoding="utf-8") as f:
+        base = json.load(f)["benchmarks"]
+    with open(head_path, encoding="utf-8") as f:
+        head = json.load(f)["benchmarks"]
+
+    rows = []
+    for name in sorted(set(base) & set(head)):
+        b, h = base[name][metric], head[name][metric]
+        ratio = h / b if b else float("inf")
+        rows.append({"name": name, "base": b, "head": h, "ratio": ratio, "regressed": ratio > 1 + threshold})
+    return rows
+
+
+def format_table(results: list[dict]) -> str:
+    lines = [f"{'benchmark':<36}{'calls':>8}{'mean µs':>12}{'p50 µs':>12}{'p95 µs':>12}{'ops/s':>12}"]
+    for r in results:
+        lines.append(
+            f"{r['name']:<36}{r['calls']:>8}{r['mean_us']:>12.1f}{r['p50_us']:>12.1f}"
+            f"{r['p95_us']:>12.1f}{(r['ops_per_sec'] or 0):>12.0f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,211 @@
+# benchmarks/loadtest.py
+"""
+Offline load test for the Telegram bot.
+
+Spins up the fake Bot API server, points a real journeylogger Application at
+it, replays provider responses from a generated fixture store, and simulates
+N drivers sending maps links with Poisson (or fixed-interval) arrivals.
+
+    python -m benchmarks.loadtest --users 20 --messages 5 --rate 0.5 --latency-ms 150
+    python -m benchmarks.loadtest --webhook ...   # embedded webhook server instead of polling
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+
+# Must happen before journeylogger is imported: no network, in-memory sheet
+os.environ["JOURNEYLOGGER_HTTP_MODE"] = "replay"
+
+from .corpus import short_links  # noqa: E402
+from .fake_providers import build_fixture_store  # noqa: E402
+from .fake_telegram import FakeTelegramServer  # noqa: E402
+from .harness import percentile  # noqa: E402
+
+FINAL_PREFIXES = ("🕑 Processed", "❌", "Please send")
+
+
+def is_final_reply(text: str) -> bool:
+    return text.startswith(FINAL_PREFIXES)
+
+
+class LatencyTracker:
+    """
+    Pairs each pushed message with its first sent reply (ack) and its final
+    reply, per chat. The final reply may arrive as an edit of the ack.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._awaiting_ack: dict[int, deque] = defaultdict(deque)
+        self._awaiting_final: dict[int, deque] = defaultdict(deque)
+        self.ack_ms: list[float] = []
+        self.reply_ms: list[float] = []
+        self.errors = 0
+        self.expected = 0
+        self.completed = 0
+        self.last_reply_at = 0.0
+
+    def on_push(self, chat_id: int, pushed_at: float):
+        with self._lock:
+            self._awaiting_ack[chat_id].append(pushed_at)
+            self._awaiting_final[chat_id].append(pushed_at)
+            self.expected += 1
+
+    def on_outgoing(self, call: dict):
+        chat_id, at, text = call["chat_id"], call["at"], call["text"]
+        with self._lock:
+            if call["method"] == "sendMessage" and self._awaiting_ack[chat_id]:
+                self.ack_ms.append((at - self._awaiting_ack[chat_id].popleft()) * 1000)
+            if is_final_reply(text) and self._awaiting_final[chat_id]:
+                self.reply_ms.append((at - self._awaiting_final[chat_id].popleft()) * 1000)
+                self.completed += 1
+                self.errors += not text.startswith("🕑")
+                self.last_reply_at = at
+
+    def done(self) -> bool:
+        with self._lock:
+            return self.expected > 0 and self.completed >= self.expected
+
+
+def build_schedule(users: int, messages: int, rate: float, links: list[str],
+                   arrival: str = "poisson", seed: int = 42) -> list[tuple[float, int, str]]:
+    """Sorted (offset_seconds, user_id, link) tuples for every simulated message."""
+    rng = random.Random(seed)
+    schedule = []
+    for u in range(users):
+        user_id = 10_000 + u
+        t = rng.uniform(0, 1 / rate) if rate else 0.0
+        for _ in range(messages):
+            schedule.append((t, user_id, rng.choice(links)))
+            t += rng.expovariate(rate) if arrival == "poisson" else 1 / rate
+    return sorted(schedule)
+
+
+def _drive(server: FakeTelegramServer, tracker: LatencyTracker, schedule, started: float):
+    """Runs on its own thread so a blocked bot event loop can't skew arrivals."""
+    for offset, user_id, link in schedule:
+        delay = started + offset - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        tracker.on_push(user_id, time.perf_counter())
+        server.push_message(user_id, link)
+
+
+async def run_load(users: int = 10, messages: int = 5, rate: float = 0.5, latency_ms: float = 0,
+                   jitter_ms: float = 0, arrival: str = "poisson", timeout: float = 600,
+                   webhook: bool = False) -> dict:
+    from journeylogger import http_client
+    from journeylogger.telegram_bot import build_application
+    from journeylogger.webhook_server import WebhookServer
+    from .suites import configure_pipeline
+
+    configure_pipeline()
+    links = short_links(40)
+    fixture_dir = tempfile.mkdtemp(prefix="journeylogger-loadtest-")
+    build_fixture_store(fixture_dir, links=links)
+    http_client.configure(mode="replay", fixture_dir=fixture_dir, latency_ms=latency_ms, jitter_ms=jitter_ms)
+
+    server = FakeTelegramServer().start()
+    tracker = LatencyTracker()
+    server.on_outgoing = tracker.on_outgoing
+    schedule = build_schedule(users, messages, rate, list(links), arrival)
+
+    app = build_application("123456:LOADTEST", base_url=server.base_url)
+    webhook_server = WebhookServer(app, url_path="/telegram", secret_token="loadtest-secret")
+    try:
+        async with app:
+            await app.start()
+            if webhook:
+                await webhook_server.start("127.0.0.1", 0)
+                await app.bot.set_webhook(url=f"http://127.0.0.1:{webhook_server.port}/telegram",
+                                          secret_token="loadtest-secret")
+            else:
+                await app.updater.start_polling(poll_interval=0.0, timeout=1)
+
+            started = time.perf_counter()
+            driver = threading.Thread(target=_drive, args=(server, tracker, schedule, started), daemon=True)
+            driver.start()
+
+            deadline = started + timeout
+            while (driver.is_alive() or not tracker.done()) and time.perf_counter() < deadline:
+                await asyncio.sleep(0.05)
+            elapsed = (tracker.last_reply_at or time.perf_counter()) - started
+
+            if webhook:
+                await webhook_server.stop()
+            else:
+                await app.updater.stop()
+            await app.stop()
+    finally:
+        server.stop()
+
+    def pct(values):
+        values = sorted(values)
+        return {p: round(percentile(values, p), 1) for p in (50, 90, 99)} | {"max": round(max(values or [0]), 1)}
+
+    return {
+        "users": users,
+        "messages_per_user": messages,
+        "rate_per_user": rate,
+        "arrival": arrival,
+        "mode": "webhook" if webhook else "polling",
+        "provider_latency_ms": latency_ms,
+        "sent": len(schedule),
+        "completed": tracker.completed,
+        "errors": tracker.errors,
+        "duration_s": round(elapsed, 2),
+        "throughput_msg_s": round(tracker.completed / elapsed, 2) if elapsed else None,
+        "ack_latency_ms": pct(tracker.ack_ms),
+        "reply_latency_ms": pct(tracker.reply_ms),
+    }
+
+
+def format_report(r: dict) -> str:
+    ack, rep = r["ack_latency_ms"], r["reply_latency_ms"]
+    return "\n".join([
+        f"Users: {r['users']} × {r['messages_per_user']} msgs @ {r['rate_per_user']}/s ({r['arrival']}, {r['mode']}), "
+        f"provider latency {r['provider_latency_ms']} ms",
+        f"Completed: {r['completed']}/{r['sent']}  errors: {r['errors']}  in {r['duration_s']} s",
+        f"Throughput: {r['throughput_msg_s']} msg/s",
+        f"Ack latency   p50 {ack[50]} ms  p90 {ack[90]} ms  p99 {ack[99]} ms  max {ack['max']} ms",
+        f"Reply latency p50 {rep[50]} ms  p90 {rep[90]} ms  p99 {rep[99]} ms  max {rep['max']} ms",
+    ])
+
+
+def parse_args():
+    p = argparse.ArgumentParser(prog="python -m benchmarks.loadtest")
+    p.add_argument("--users", type=int, default=10, help="Simulated drivers")
+    p.add_argument("--messages", type=int, default=5, help="Links sent per driver")
+    p.add_argument("--rate", type=float, default=0.5, help="Messages per second per driver")
+    p.add_argument("--arrival", choices=["poisson", "fixed"], default="poisson")
+    p.add_argument("--latency-ms", default="0", help="Simulated provider latency (ms or 'recorded')")
+    p.add_argument("--jitter-ms", type=float, default=0)
+    p.add_argument("--timeout", type=float, default=600, help="Give up after this many seconds")
+    p.add_argument("--webhook", action="store_true", help="Deliver updates via the embedded webhook server")
+    p.add_argument("-o", "--output", type=Path, help="Also write the report as JSON")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    latency = args.latency_ms if args.latency_ms == "recorded" else float(args.latency_ms)
+    report = asyncio.run(run_load(args.users, args.messages, args.rate, latency,
+                                  args.jitter_ms, args.arrival, args.timeout, args.webhook))
+    print(format_report(report))
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\n📄 Report written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# benchmarks/suites.py
+"""
+The benchmark definitions. Each suite returns a list of result dicts from
+harness.run_benchmark(). journeylogger is imported lazily so that __main__ can
+switch http_client to replay mode first.
+"""
+
+import logging
+
+from .corpus import (NI_LAT, NI_LON, address_corpus, apple_urls, gmaps_dir_urls, random_latlon, short_links,
+                     synthetic_settlements)
+from .fake_providers import build_fixture_store
+from .harness import run_benchmark
+
+BENCH_KNOWN_ADDRESSES = {
+    "home": ["19 drury lane, comber"],
+    "depot": ["generic business park", "bt99 xdx"],
+}
+
+
+def configure_pipeline():
+    """Give map_processor a home/depot and an ORS key so every stage runs."""
+    from journeylogger import map_processor
+
+    if not map_processor.known_addresses.get("home"):
+        map_processor.set_known_addresses(BENCH_KNOWN_ADDRESSES)
+    map_processor.ORS_API_KEY = map_processor.ORS_API_KEY or "benchmark"
+
+
+def bench_parse_address(min_time: float) -> list[dict]:
+    from journeylogger.address_parser import parse_address
+
+    corpus = address_corpus(400)
+    return [run_benchmark("parse_address", parse_address, corpus, min_time=min_time)]
+
+
+def bench_settlements(min_time: float) -> list[dict]:
+    """parse_address with the NI settlement list and with one 50× larger, both memory-mapped from disk."""
+    import tempfile
+    from pathlib import Path
+
+    from journeylogger import address_parser
+    from journeylogger.settlement_index import FuzzySettlementIndex
+    from journeylogger.settlement_store import SettlementStore, read_towns_csv, write_store
+
+    towns = read_towns_csv()
+    corpus = address_corpus(400)
+    original = (address_parser.settlement_store, address_parser.settlement_index)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in (1, 50):
+            path = Path(tmp) / f"settlements-{scale}x.idx"
+            write_store(towns + synthetic_settlements(len(towns) * (scale - 1)), path)
+            store = SettlementStore.open(path)
+            address_parser.settlement_store = store
+            address_parser.settlement_index = FuzzySettlementIndex(store.names())
+            try:
+                results.append(run_benchmark(f"parse_address[{scale}x]", address_parser.parse_address, corpus,
+                                             min_time=min_time, settlements=len(store)))
+            finally:
+                address_parser.settlement_store, address_parser.settlement_index = original
+                store.close()
+    return results
+
+
+def bench_batch_parse(min_time: float) -> list[dict]:
+    """parse_addresses over 20k distinct addresses, in-process and on a process pool."""
+    import os
+
+    from journeylogger.address_parser import parse_addresses
+
+    corpus = list(dict.fromkeys(address_corpus(24_000, seed=53)))[:20_000]
+    results = []
+    for workers in sorted({1, 2, os.cpu_count() or 1}):
+        results.append(run_benchmark(f"parse_addresses[20k, {workers}w]", lambda c: parse_addresses(c, workers=workers),
+                                     [corpus], min_time=min_time, warmup=0, addresses=len(corpus), workers=workers))
+    return results
+
+
+def bench_link_parsing(min_time: float) -> list[dict]:
+    from journeylogger.gmaps_utils import extract_addresses_from_gmaps_url
+    from journeylogger.map_processor import parse_apple_maps_url
+
+    return [
+        run_benchmark("extract_addresses_from_gmaps_url", extract_addresses_from_gmaps_url,
+                      gmaps_dir_urls(200), min_time=min_time),
+        run_benchmark("parse_apple_maps_url", parse_apple_maps_url, apple_urls(200), min_time=min_time),
+    ]
+
+
+def bench_classify_visit_type(min_time: float) -> list[dict]:
+    from journeylogger.map_processor import classify_visit_type
+
+    texts = address_corpus(300) + [
+        "19 Drury Lane, Comber, BT23 5AB",
+        "Unit 4 Generic Business Park, Antrim",
+        "Royal Victoria Hospital, Grosvenor Road, Belfast",
+    ]
+    return [run_benchmark("classify_visit_type", classify_visit_type, texts, min_time=min_time)]
+
+
+class _MissingFixtures(logging.Handler):
+    """Counts replayed provider calls that had no fixture; run_cascade swallows the errors."""
+
+    def __init__(self):
+        super().__init__()
+        self.missing = []
+
+    def emit(self, record):
+        event = getattr(record, "provider_event", {})
+        if event.get("outcome") == "no_fixture":
+            self.missing.append(f"{event['provider']} {event['method']} {event['key']}")
+
+
+def bench_providers(min_time: float, fixture_dir: str) -> list[dict]:
+    """lookup_location and process_maps_link against the replayed fixture store."""
+    import random
+
+    from journeylogger import geocache, http_client, provider_health
+    from journeylogger.map_processor import process_maps_link
+    from journeylogger.map_utils import lookup_location
+
+    rng = random.Random(23)
+    addresses = address_corpus(100, seed=29)
+    coords = ["{}, {}".format(*random_latlon(rng)) for _ in range(50)]
+    links = short_links(40)
+    urls = list(links) + apple_urls(40, seed=31)
+
+    def reset():
+        # Same starting state for both phases: no provider demoted, and no
+        # forward/route cache hits hiding requests from the recording or,
+        # on the second pass, from the measurement
+        provider_health.registry.reset()
+        geocache.forward_cache = geocache.ForwardGeocodeCache(maxsize=0)
+        geocache.route_cache = geocache.RouteCache(maxsize=0)
+        geocache.reverse_cache.clear()
+
+    reset()
+    build_fixture_store(fixture_dir, addresses=addresses, coords=coords, links=links, urls=urls)
+    reset()
+    http_client.configure(mode="replay", fixture_dir=fixture_dir, latency_ms=0)
+
+    handler = _MissingFixtures()
+    level, propagate = http_client.events.level, http_client.events.propagate
+    http_client.events.addHandler(handler)
+    http_client.events.setLevel(logging.INFO)
+    http_client.events.propagate = False
+    try:
+        results = [
+            run_benchmark("lookup_location[address]", lookup_location, addresses, min_time=min_time),
+            run_benchmark("lookup_location[latlon]", lookup_location, coords, min_time=min_time),
+            run_benchmark("process_maps_link[replay]", process_maps_link, urls, min_time=min_time),
+        ]
+    finally:
+        http_client.events.removeHandler(handler)
+        http_client.events.setLevel(level)
+        http_client.events.propagate = propagate
+    if handler.missing:
+        raise RuntimeError(f"{len(handler.missing)} replayed provider calls had no fixture, "
+                           f"e.g. {', '.join(sorted(set(handler.missing))[:5])}")
+    return results
+
+
+def bench_gazetteer(min_time: float) -> list[dict]:
+    """Offline reverse geocoding: shipped settlements plus a synthetic ~2 km postcode-sector grid."""
+    import random
+
+    from journeylogger.gazetteer import GAZETTEER_PATH, Gazetteer, read_rows
+
+    settlements = [(r["name"], float(r["lat"]), float(r["lon"]))
+                   for r in read_rows(GAZETTEER_PATH) if r["kind"] == "settlement"]
+    sectors = [(f"BT{i % 99} {i % 10}", NI_LAT[0] + 0.018 * y, NI_LON[0] + 0.03 * x)
+               for i, (y, x) in enumerate((y, x) for y in range(72) for x in range(91))]
+    gazetteer = Gazetteer(settlements, sectors)
+
+    rng = random.Random(37)
+    points = [random_latlon(rng) for _ in range(500)]
+    return [run_benchmark("Gazetteer.reverse", lambda p: gazetteer.reverse(*p), points, min_time=min_time)]
+
+
+def bench_reporting(min_time: float) -> list[dict]:
+    """Mileage reports over a synthetic three-year, 100k-row journey store."""
+    import random
+    from datetime import date, timedelta
+
+    from journeylogger.journey_store import JourneyStore, mileage_report
+
+    rng = random.Random(42)
+    towns = ["Belfast", "Bangor", "Newtownards", "Comber", "Lisburn", "Holywood", "Downpatrick"]
+    start = date(2023, 1, 1)
+    rows = []
+    for i in range(100_000):
+        day = start + timedelta(days=rng.randrange(3 * 365))
+        rows.append((f"{day.isoformat()}T{i % 1440 // 60:02d}:{i % 60:02d}", day.isoformat(), str(rng.randrange(5)),
+                     rng.choice(["visit", "visit", "home", "depot", "hospital"]),
+                     rng.choice(towns), "", None, None, rng.choice(towns), "", None, None,
+                     round(rng.uniform(1, 40), 2), f"u{i}", ""))
+    store = JourneyStore(":memory:")
+    store.add_rows(rows)
+    df = store.frame()
+
+    groupings = [["day"], ["week"], ["month", "visit_type"], ["origin_town", "destination_town"]]
+    return [
+        run_benchmark("JourneyStore.frame[100k]", lambda _: store.frame(), [None], min_time=min_time),
+        run_benchmark("mileage_report[100k]", lambda by: mileage_report(df, by), groupings, min_time=min_time),
+    ]
+
+
+SUITES = {
+    "parse_address": bench_parse_address,
+    "settlements": bench_settlements,
+    "batch_parse": bench_batch_parse,
+    "link_parsing": bench_link_parsing,
+    "classify_visit_type": bench_classify_visit_type,
+    "providers": bench_providers,
+    "gazetteer": bench_gazetteer,
+    "reporting": bench_reporting,
+}
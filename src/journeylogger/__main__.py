@@ -1,24 +1,28 @@
 # __main__py
 import os
-import logging
-from logging.handlers import RotatingFileHandler
 from pathlib import Path
 import argparse
 from dotenv import load_dotenv
 from .telegram_bot import start_bot
 from telegram.ext import ApplicationBuilder, MessageHandler, filters
 
-from .map_processor import process_maps_link
-from .sheet_writer import connect_to_sheet, append_journey_to_sheet
-
-sheet = connect_to_sheet()
+from .log_utils import configure_logging
+from .profiling import profile_link
 
 def parse_args():
     p = argparse.ArgumentParser()
     p.add_argument("--env", choices=["dev","prod"], default="prod")
     p.add_argument("--dry-run", action="store_true")
     p.add_argument("--verbose", action="store_true")
-    p.add_argument("-u", "--test-url", dest="test_url", type=str, help="(dry-run) Google Maps short link to process")
+    p.add_argument("-u", "--test-url", dest="test_url", type=str,
+                   help="(dry-run) Process one Google/Apple Maps link without writing to the sheet and print stage timings")
+    p.add_argument("--profile", metavar="FILE", help="With --test-url: save cProfile stats to FILE")
+    p.add_argument("--profile-top", type=int, default=0, metavar="N", help="With --test-url: print the N heaviest functions")
+    p.add_argument("--profile-sort", default="cumulative", help="pstats sort key for --profile-top (default: cumulative)")
+    p.add_argument("--webhook-url", help="Public HTTPS URL for Telegram to POST updates to (enables webhook mode)")
+    p.add_argument("--listen", default="0.0.0.0", help="Webhook server listen address")
+    p.add_argument("--port", type=int, default=8443, help="Webhook server port")
+    p.add_argument("--workers", type=int, default=1, help="Webhook worker processes sharing the port (per-chat ordering only holds with 1)")
     return p.parse_args()
 
 
@@ -34,75 +38,37 @@ def main():
     ORS_API_KEY = os.getenv("ORS_API_KEY")
     SERVICE_ACCOUNT_FILE = os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON", "service_account.json")
     DEFAULT_SHEET_ID = os.getenv("GOOGLE_SHEET_ID")
+    WEBHOOK_URL = args.webhook_url or os.getenv("TELEGRAM_WEBHOOK_URL")
+    WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET")
 
     # ── Use args.dry_run, args.verbose later in your logic ─────────────
     if args.verbose:
         print(f"Loaded env: {env_file}")
 
+    #   ─── Diagnose a single link, no bot and no sheet write ──────────────
+    if args.test_url:
+        profile_link(args.test_url, profile_path=args.profile, top=args.profile_top, sort=args.profile_sort)
+        return
+
     #   ─── Start the real bot ─────────────────────────────────────────────
     if not TELEGRAM_BOT_TOKEN:
         raise ValueError("TELEGRAM_BOT_TOKEN is not set in the environment variables.")
-    if not ORS_API_KEY:
-        raise ValueError("ORS_API_KEY is not set in the environment variables.")
+    if (not ORS_API_KEY and os.getenv("ROUTING_BACKEND", "ors").lower() == "ors"
+            and os.getenv("ROUTING_FALLBACK", "").lower() != "estimate"):
+        raise ValueError("ORS_API_KEY is not set in the environment variables "
+                         "(or choose another ROUTING_BACKEND, or set ROUTING_FALLBACK=estimate).")
     
-    start_bot(TELEGRAM_BOT_TOKEN)
-
-
-def configure_logging(log_dir="logs"):
-    """
-    Configures logging:
-    - INFO+ to info log
-    - ERROR+ to error log
-    - WARNING+ to console
-    - Silences HTTP + Telegram noise
-    """
-    os.makedirs(log_dir, exist_ok=True)
-
-    # Root logger
-    root = logging.getLogger()
-    root.setLevel(logging.DEBUG)  # Set high, handlers control output
-
-    # ── File handler: INFO and above ───────────────────────────
-    info_handler = RotatingFileHandler(
-        filename=os.path.join(log_dir, "journeylogger-info.log"),
-        maxBytes=1_000_000,
-        backupCount=3,
-        encoding="utf-8"
+    if WEBHOOK_URL and not WEBHOOK_SECRET:
+        raise ValueError("TELEGRAM_WEBHOOK_SECRET must be set when running in webhook mode.")
+
+    start_bot(
+        TELEGRAM_BOT_TOKEN,
+        webhook_url=WEBHOOK_URL,
+        listen=args.listen,
+        port=args.port,
+        secret_token=WEBHOOK_SECRET,
+        workers=args.workers,
     )
-    info_handler.setLevel(logging.INFO)
-    info_handler.setFormatter(logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    ))
-    root.addHandler(info_handler)
-
-    # ── File handler: ERROR only ───────────────────────────────
-    error_handler = RotatingFileHandler(
-        filename=os.path.join(log_dir, "journeylogger-errors.log"),
-        maxBytes=1_000_000,
-        backupCount=3,
-        encoding="utf-8"
-    )
-    error_handler.setLevel(logging.ERROR)
-    error_handler.setFormatter(logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    ))
-    root.addHandler(error_handler)
-
-    # ── Console handler: only WARNING+ ─────────────────────────
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.WARNING)
-    console_handler.setFormatter(logging.Formatter(
-        "%(levelname)s: %(message)s"
-    ))
-    root.addHandler(console_handler)
-
-    # ── Suppress external noise ────────────────────────────────
-    logging.getLogger("urllib3").setLevel(logging.WARNING)
-    logging.getLogger("httpx").setLevel(logging.WARNING)
-    logging.getLogger("telegram").setLevel(logging.WARNING)
-    logging.getLogger("telegram.ext._application").setLevel(logging.WARNING)
-
-    logging.info("Logging configured. Logs at '%s'.", log_dir)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,157 @@
+# address_parser.py
+"""
+Free-text address → (street, town, postcode, other_towns).
+
+parse_address() handles one string; parse_addresses() takes a list or
+pandas Series and returns the same fields as DataFrame columns. Repeated
+strings are parsed once. With workers > 1, the distinct strings are split
+into chunks and parsed on a process pool. Nothing here touches the network
+or the sheet, so workers start cheaply, and a memory-mapped
+JOURNEYLOGGER_SETTLEMENTS store is shared between them by the OS page cache.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .postcode_table import postcode_re
+from .settlement_index import FuzzySettlementIndex
+from .settlement_store import default_settlement_store
+
+COLUMNS = ["street", "town", "postcode", "other_towns"]
+
+# Settlement names, priority order: towns.csv, or the store in JOURNEYLOGGER_SETTLEMENTS
+settlement_store = default_settlement_store()
+ordered_settlements = settlement_store.names()
+
+# Trigram index for misspelt towns; below this Dice score a match is ignored
+FUZZY_TOWN_MIN_SCORE = float(os.getenv("FUZZY_TOWN_MIN_SCORE", "0.75"))
+settlement_index = FuzzySettlementIndex(ordered_settlements)
+
+
+def fuzzy_town_match(parts: List[str]) -> Tuple[Optional[int], Optional[str], float]:
+    """
+    Best fuzzy settlement match among address components:
+    (component index, settlement, confidence 0–1), or (None, None, 0.0).
+    Components with digits (house numbers, postcodes) are skipped.
+    """
+    best = (None, None, 0.0)
+    for idx, part in enumerate(parts):
+        if any(ch.isdigit() for ch in part):
+            continue
+        hit = settlement_index.match(part, FUZZY_TOWN_MIN_SCORE)
+        if hit and hit[1] > best[2]:
+            best = (idx, hit[0], hit[1])
+    return best
+
+def parse_address(dest_str: str) -> Tuple[Optional[str], Optional[str], Optional[str], List[str]]:
+    """
+    Parse an address string and extract street, primary town, postcode, and other candidate towns.
+
+    The primary town is the highest-priority match in the global 'settlement_store'.
+    Any additional matches are returned as 'other_towns'.
+
+    Args:
+        dest_str (str): The full address string to parse.
+
+    Returns:
+        Tuple containing:
+            - street (Optional[str]): The street component, if detectable.
+            - town (Optional[str]): The highest-priority matched town.
+            - postcode (Optional[str]): The extracted postcode in uppercase, if any.
+            - other_towns (List[str]): Other matched towns, ordered by descending priority.
+    """
+    s = dest_str.strip()
+    postcode: Optional[str] = None
+    street: Optional[str] = None
+    town: Optional[str] = None
+    other_towns: List[str] = []
+
+    # 1) Extract postcode
+    pc_match = postcode_re.search(s)
+    if pc_match:
+        postcode = pc_match.group(0).upper()
+        s = s[:pc_match.start()].rstrip(', ').strip()
+
+    # 2) Split into parts
+    parts = [p.strip() for p in s.split(',') if p.strip()]
+    if not parts:
+        return None, None, postcode, other_towns
+
+    # 3) Find matching settlements: every run of words looked up in the store,
+    # then ordered by settlement priority
+    ranks: Dict[str, int] = {}
+    for part in parts:
+        for sett, rank in settlement_store.find_in(part):
+            ranks.setdefault(sett, rank)
+    matches = sorted(ranks, key=ranks.__getitem__)
+
+    if matches:
+        town = matches[0]
+        other_towns = matches[1:]
+        # Determine street as first component before primary town
+        for idx, part in enumerate(parts):
+            if town.lower() in part.lower():
+                if idx > 0:
+                    street = parts[0]
+                break
+    else:
+        # Misspelt or differently spaced town? The first component is the street
+        # unless it's all there is.
+        candidates = parts[1:] if len(parts) > 1 else parts
+        _, fuzzy_town, _ = fuzzy_town_match(candidates)
+        if fuzzy_town:
+            town = fuzzy_town
+            street = parts[0] if len(parts) > 1 else None
+        # Fallback: use second component as town if available
+        elif len(parts) > 1:
+            street, town = parts[0], parts[1]
+        else:
+            street = parts[0]
+
+    return street, town, postcode, other_towns
+
+
+# ─── Batches ───────────────────────────────────────────────────────────────────
+
+def _parse_one(value) -> Tuple[Optional[str], Optional[str], Optional[str], List[str]]:
+    if not isinstance(value, str):
+        return None, None, None, []
+    return parse_address(value)
+
+
+def _parse_chunk(values: list) -> list:
+    return [_parse_one(v) for v in values]
+
+
+def parse_addresses(addresses, workers: int = 1, chunk_size: int = 2000) -> pd.DataFrame:
+    """
+    Parse many addresses into street, town, postcode and other_towns columns.
+    A Series keeps its index; other inputs get 0..n-1. Missing or non-string
+    values give an empty row. workers > 1 parses on that many processes (0 =
+    one per CPU); inputs of at most one chunk of distinct strings stay in
+    this process.
+    """
+    series = addresses if isinstance(addresses, pd.Series) else pd.Series(list(addresses), dtype=object)
+    distinct = list(dict.fromkeys(v for v in series if isinstance(v, str)))
+    workers = workers or os.cpu_count() or 1
+
+    if workers > 1 and len(distinct) > chunk_size:
+        # Several chunks per worker, so one slow shard doesn't leave the others idle
+        size = max(1, min(chunk_size, -(-len(distinct) // (workers * 4))))
+        chunks = [distinct[i:i + size] for i in range(0, len(distinct), size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = [row for rows in pool.map(_parse_chunk, chunks) for row in rows]
+    else:
+        parsed = _parse_chunk(distinct)
+
+    by_value = dict(zip(distinct, parsed))
+    empty = (None, None, None, [])
+    rows = [by_value.get(v, empty) if isinstance(v, str) else empty for v in series]
+    columns = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+    # object columns keep None as None; each row gets its own other_towns list
+    columns[3] = [list(towns) for towns in columns[3]]
+    return pd.DataFrame({name: pd.Series(values, index=series.index, dtype=object)
+                         for name, values in zip(COLUMNS, columns)})
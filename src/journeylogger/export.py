@@ -0,0 +1,187 @@
+# export.py
+"""
+Export journey history to CSV, GeoJSON or Parquet, a chunk at a time.
+
+Journeys come from the local store (journey_store) or straight from the
+Google Sheet, read in blocks of rows, and each chunk is written before the
+next is fetched. Memory use therefore depends on the chunk size, not on
+how much history there is.
+
+    python -m journeylogger.export --format csv -o journeys.csv --from 2026-04-01 --to 2027-03-31
+    python -m journeylogger.export --format geojson --geometry points --user 123456789 -o trips.geojson
+    python -m journeylogger.export --format parquet --source sheet -o journeys.parquet
+
+GeoJSON has one LineString per journey (origin → destination), or with
+--geometry points one Point per end. Journeys without coordinates are
+skipped, which includes every row that came from the sheet. Parquet needs
+pyarrow, imported only when that format is asked for; each chunk becomes one
+row group.
+"""
+
+import argparse
+import csv
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+from .journey_store import COLUMNS, DEFAULT_STORE_PATH, STORE_PATH, JourneyStore, sheet_record_row
+
+FORMATS = ("csv", "geojson", "parquet")
+DEFAULT_CHUNK_SIZE = 1000
+
+
+# ─── Sources ───────────────────────────────────────────────────────────────────
+
+def store_chunks(store: JourneyStore, start: date | None = None, end: date | None = None,
+                 user: str | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    yield from store.iter_chunks(start, end, user, chunk_size=chunk_size)
+
+
+def sheet_chunks(sheet, start: date | None = None, end: date | None = None,
+                 user: str | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Read the sheet chunk_size rows per request and yield the rows inside the
+    date range as store-shaped dicts. The sheet has no user column, so a
+    user filter is refused instead of silently ignored.
+    """
+    if user:
+        raise ValueError("The sheet has no user column; export from the store to filter by user")
+    return _sheet_chunks(sheet, start, end, chunk_size)
+
+
+def _sheet_chunks(sheet, start, end, chunk_size):
+    headers = sheet.get_values("A1:J1")[0]
+    first = 2
+    while first <= sheet.row_count:
+        block = sheet.get_values(f"A{first}:J{first + chunk_size - 1}")
+        if not block:
+            return
+        chunk = []
+        for cells in block:
+            row = sheet_record_row(dict(zip(headers, cells)))
+            if row is None:
+                continue
+            day = date.fromisoformat(row[1])
+            if (start and day < start) or (end and day > end):
+                continue
+            chunk.append(dict(zip(COLUMNS, row)))
+        if chunk:
+            yield chunk
+        first += chunk_size
+
+
+# ─── Writers ───────────────────────────────────────────────────────────────────
+
+def write_csv(chunks, out) -> int:
+    writer = csv.DictWriter(out, fieldnames=COLUMNS, lineterminator="\n")
+    writer.writeheader()
+    n = 0
+    for chunk in chunks:
+        writer.writerows(chunk)
+        n += len(chunk)
+    return n
+
+
+def journey_features(row: dict, geometry: str = "line") -> list[dict]:
+    """GeoJSON features for one journey row; [] when its coordinates are missing."""
+    properties = {k: v for k, v in row.items() if not k.endswith(("_lat", "_lon"))}
+    ends = {
+        role: [row[f"{role}_lon"], row[f"{role}_lat"]]
+        for role in ("origin", "destination")
+        if row[f"{role}_lat"] is not None and row[f"{role}_lon"] is not None
+    }
+    if geometry == "points":
+        return [{"type": "Feature", "geometry": {"type": "Point", "coordinates": xy},
+                 "properties": {**properties, "role": role}} for role, xy in ends.items()]
+    if len(ends) < 2:
+        return []
+    return [{"type": "Feature",
+             "geometry": {"type": "LineString", "coordinates": [ends["origin"], ends["destination"]]},
+             "properties": properties}]
+
+
+def write_geojson(chunks, out, geometry: str = "line") -> int:
+    """Stream a FeatureCollection: the features are written as they come, never held as one list."""
+    out.write('{"type":"FeatureCollection","features":[\n')
+    n, first = 0, True
+    for chunk in chunks:
+        for row in chunk:
+            for feature in journey_features(row, geometry):
+                out.write(("" if first else ",\n") + json.dumps(feature, ensure_ascii=False, separators=(",", ":")))
+                first = False
+                n += 1
+    out.write("\n]}\n")
+    return n
+
+
+def write_parquet(chunks, path) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow") from e
+
+    schema = pa.schema([
+        (name, pa.float64() if name.endswith(("_lat", "_lon")) or name == "distance_miles" else pa.string())
+        for name in COLUMNS
+    ])
+    n = 0
+    with pq.ParquetWriter(str(path), schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+            n += len(chunk)
+    return n
+
+
+def export(chunks, fmt: str, output=None, geometry: str = "line") -> int:
+    """Write chunks to output (a path, or stdout for csv/geojson when None); returns rows/features written."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}, expected one of {FORMATS}")
+    if fmt == "parquet":
+        if output is None:
+            raise ValueError("Parquet export needs an output file")
+        return write_parquet(chunks, output)
+
+    out = open(output, "w", newline="", encoding="utf-8") if output else sys.stdout
+    try:
+        if fmt == "csv":
+            return write_csv(chunks, out)
+        return write_geojson(chunks, out, geometry)
+    finally:
+        if output:
+            out.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m journeylogger.export",
+                                     description="Stream journey history to CSV, GeoJSON or Parquet.")
+    parser.add_argument("--format", choices=FORMATS, required=True)
+    parser.add_argument("-o", "--output", type=Path, help="Output file (default: stdout, not for parquet)")
+    parser.add_argument("--source", choices=("store", "sheet"), default="store")
+    parser.add_argument("--store", default=STORE_PATH or DEFAULT_STORE_PATH)
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, help="First day, YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="Last day, YYYY-MM-DD")
+    parser.add_argument("--user", help="Only journeys logged by this Telegram user id (store only)")
+    parser.add_argument("--geometry", choices=("line", "points"), default="line", help="GeoJSON features")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.source == "sheet":
+            from .sheet_writer import connect_to_sheet
+
+            chunks = sheet_chunks(connect_to_sheet(), args.start, args.end, args.user, args.chunk_size)
+        else:
+            chunks = store_chunks(JourneyStore(args.store), args.start, args.end, args.user, args.chunk_size)
+        n = export(chunks, args.format, args.output, geometry=args.geometry)
+    except (ImportError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    if args.output:
+        print(f"✅ Wrote {n} {'features' if args.format == 'geojson' else 'rows'} to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
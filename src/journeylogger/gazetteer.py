@@ -0,0 +1,328 @@
+# gazetteer.py
+"""
+Offline reverse geocoding against resources/data/gazetteer.csv.
+
+The gazetteer holds up to three kinds of point: settlement centroids
+(→ town), postcode-sector centroids (→ e.g. "BT23 5") and full postcodes
+(→ "BT23 5AB"). Each kind gets its own KD-tree over unit-sphere vectors, so
+a nearest-neighbour lookup is a few dozen comparisons.
+
+A point is only answered offline when a settlement is close enough for the
+town and a full postcode or a sector is close enough to place it; anything
+else (including every point when the file has settlements only, as shipped)
+is left to Nominatim, which returns a real postcode. A sector is only part
+of a postcode, so sector answers leave "postcode" blank and report the
+sector as raw["postcode_sector"].
+
+Rebuild the postcode rows from a full postcode list (ONSPD-style CSV with
+pcds/lat/long columns, or GeoNames' GB_full.txt); --full-postcodes keeps
+every postcode as well as the sector centroids:
+
+    python -m journeylogger.gazetteer --postcodes ONSPD.csv [--full-postcodes]
+"""
+
+import argparse
+import csv
+import logging
+import math
+import os
+import threading
+from collections import defaultdict
+from pathlib import Path
+
+from .settlement_index import fold
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+
+GAZETTEER_PATH = Path(os.getenv(
+    "JOURNEYLOGGER_GAZETTEER",
+    Path(__file__).parent.parent.parent / "resources" / "data" / "gazetteer.csv",
+))
+
+# Beyond these distances the nearest entry is not a trustworthy answer
+MAX_TOWN_KM = float(os.getenv("GAZETTEER_MAX_TOWN_KM", "8"))
+MAX_SECTOR_KM = float(os.getenv("GAZETTEER_MAX_SECTOR_KM", "3"))
+
+
+def _unit_vector(lat: float, lon: float) -> tuple[float, float, float]:
+    p, l = math.radians(lat), math.radians(lon)
+    return math.cos(p) * math.cos(l), math.cos(p) * math.sin(l), math.sin(p)
+
+
+def _chord_to_km(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+# ─── KD-tree over 3-D unit vectors ─────────────────────────────────────────────
+
+class KDTree:
+    """Static 3-d tree; chord distance on the unit sphere orders like great-circle distance."""
+
+    def __init__(self, points: list[tuple[float, float]]):
+        self.size = len(points)
+        items = [(_unit_vector(lat, lon), i) for i, (lat, lon) in enumerate(points)]
+        self.root = self._build(items, 0)
+
+    def _build(self, items, depth):
+        if not items:
+            return None
+        axis = depth % 3
+        items.sort(key=lambda item: item[0][axis])
+        mid = len(items) // 2
+        # node: (vector, index, axis, left, right)
+        return (items[mid][0], items[mid][1], axis,
+                self._build(items[:mid], depth + 1), self._build(items[mid + 1:], depth + 1))
+
+    def nearest(self, lat: float, lon: float) -> tuple[int, float] | None:
+        """(index, distance_km) of the closest point, or None for an empty tree."""
+        if self.root is None:
+            return None
+        target = _unit_vector(lat, lon)
+        best = [None, float("inf")]  # index, squared chord
+
+        def visit(node):
+            if node is None:
+                return
+            vec, index, axis, left, right = node
+            d2 = (vec[0] - target[0]) ** 2 + (vec[1] - target[1]) ** 2 + (vec[2] - target[2]) ** 2
+            if d2 < best[1]:
+                best[0], best[1] = index, d2
+            diff = target[axis] - vec[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            visit(near)
+            if diff * diff < best[1]:
+                visit(far)
+
+        visit(self.root)
+        return best[0], _chord_to_km(math.sqrt(best[1]))
+
+    def __len__(self):
+        return self.size
+
+
+# ─── Gazetteer ─────────────────────────────────────────────────────────────────
+
+class Gazetteer:
+
+    def __init__(self, settlements: list[tuple[str, float, float]], sectors: list[tuple[str, float, float]],
+                 postcodes: list[tuple[str, float, float]] = ()):
+        self.settlements = settlements
+        self.sectors = sectors
+        self.postcodes = list(postcodes)
+        self._town_tree = KDTree([(lat, lon) for _, lat, lon in settlements])
+        self._sector_tree = KDTree([(lat, lon) for _, lat, lon in sectors])
+        self._postcode_tree = KDTree([(lat, lon) for _, lat, lon in self.postcodes])
+        self._by_name = None
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "Gazetteer":
+        settlements, sectors, postcodes = [], [], []
+        for row in read_rows(path):
+            point = (float(row["lat"]), float(row["lon"]))
+            if row["kind"] == "settlement":
+                settlements.append((row["name"],) + point)
+            elif row["kind"] == "sector":
+                sectors.append((row["postcode"],) + point)
+            elif row["kind"] == "postcode":
+                postcodes.append((row["postcode"],) + point)
+        return cls(settlements, sectors, postcodes)
+
+    def settlement_position(self, name: str) -> tuple[float, float] | None:
+        """Centroid of a settlement by name (case/spacing-insensitive)."""
+        if self._by_name is None:
+            self._by_name = {fold(n): (lat, lon) for n, lat, lon in self.settlements}
+        return self._by_name.get(fold(name))
+
+    def nearest_town(self, lat: float, lon: float) -> tuple[str, float] | None:
+        hit = self._town_tree.nearest(lat, lon)
+        return (self.settlements[hit[0]][0], hit[1]) if hit else None
+
+    def nearest_sector(self, lat: float, lon: float) -> tuple[str, float] | None:
+        hit = self._sector_tree.nearest(lat, lon)
+        return (self.sectors[hit[0]][0], hit[1]) if hit else None
+
+    def nearest_postcode(self, lat: float, lon: float) -> tuple[str, float] | None:
+        hit = self._postcode_tree.nearest(lat, lon)
+        return (self.postcodes[hit[0]][0], hit[1]) if hit else None
+
+    def reverse(self, lat, lon, max_town_km: float = MAX_TOWN_KM,
+                max_sector_km: float = MAX_SECTOR_KM) -> dict | None:
+        """
+        Location dict shaped like map_utils.reverse_geocode()'s, or None when
+        no settlement is within max_town_km or neither a full postcode nor a
+        sector is within max_sector_km: without one of those the answer is
+        too vague to log, and the caller should ask Nominatim instead.
+        A full postcode fills "postcode"; a sector alone leaves it blank and
+        is reported as raw["postcode_sector"].
+        """
+        try:
+            lat_f, lon_f = float(lat), float(lon)
+        except (TypeError, ValueError):
+            return None
+
+        town = self.nearest_town(lat_f, lon_f)
+        if not town or town[1] > max_town_km:
+            return None
+        postcode = self.nearest_postcode(lat_f, lon_f)
+        if postcode and postcode[1] > max_sector_km:
+            postcode = None
+        sector = (postcode_sector(postcode[0]), postcode[1]) if postcode else self.nearest_sector(lat_f, lon_f)
+        if not sector or sector[1] > max_sector_km:
+            return None
+
+        return {
+            "lat": lat_f,
+            "lon": lon_f,
+            "town": town[0],
+            "postcode": postcode[0] if postcode else "",
+            "raw": {
+                "road": "",
+                "town": town[0],
+                "postcode": postcode[0] if postcode else "",
+                "postcode_sector": sector[0],
+                "source": "gazetteer",
+                "town_distance_km": round(town[1], 2),
+            },
+        }
+
+
+def read_rows(path: Path) -> list[dict]:
+    """Gazetteer CSV rows, skipping '#' comment lines."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(line for line in f if not line.startswith("#")))
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_gazetteer() -> Gazetteer:
+    """The shared gazetteer, loaded on first use; empty if the file is unavailable."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                try:
+                    _default = Gazetteer.from_csv(GAZETTEER_PATH)
+                except Exception as e:
+                    logger.warning("Offline gazetteer unavailable (%s): %s", GAZETTEER_PATH, e)
+                    _default = Gazetteer([], [])
+    return _default
+
+
+def offline_reverse_geocode(lat, lon) -> dict | None:
+    return default_gazetteer().reverse(lat, lon)
+
+
+# ─── Refreshing the postcode-sector rows ───────────────────────────────────────
+
+def postcode_sector(postcode: str) -> str | None:
+    """'BT23 5AB' / 'BT235AB' → 'BT23 5'."""
+    pc = "".join((postcode or "").split()).upper()
+    if len(pc) < 5:
+        return None
+    return f"{pc[:-3]} {pc[-3]}"
+
+
+def read_postcode_points(path: Path):
+    """(postcode, lat, lon) from an ONSPD-style CSV or a GeoNames postal-code .txt dump."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.suffix.lower() == ".txt":
+            # GeoNames: country, postcode, place, admin names/codes ×6, lat, lon, accuracy
+            for cols in csv.reader(f, delimiter="\t"):
+                if len(cols) > 10:
+                    yield cols[1], cols[9], cols[10]
+            return
+        reader = csv.DictReader(f)
+        fields = {name.lower(): name for name in reader.fieldnames or []}
+        pc_col = next((fields[c] for c in ("pcds", "pcd", "postcode") if c in fields), None)
+        lat_col = next((fields[c] for c in ("lat", "latitude") if c in fields), None)
+        lon_col = next((fields[c] for c in ("long", "lon", "lng", "longitude") if c in fields), None)
+        if not (pc_col and lat_col and lon_col):
+            raise ValueError(f"{path}: need postcode, lat and long columns, found {reader.fieldnames}")
+        for row in reader:
+            yield row[pc_col], row[lat_col], row[lon_col]
+
+
+def sector_centroids(points, area: str = "BT") -> list[tuple[str, float, float]]:
+    """Mean position of every postcode sector in `area`."""
+    sums = defaultdict(lambda: [0.0, 0.0, 0])
+    for postcode, lat, lon in points:
+        sector = postcode_sector(postcode)
+        if not sector or not sector.startswith(area):
+            continue
+        try:
+            lat_f, lon_f = float(lat), float(lon)
+        except (TypeError, ValueError):
+            continue
+        if not (-90 <= lat_f <= 90) or lat_f == 0:  # ONSPD marks missing grid refs as 99.999999
+            continue
+        acc = sums[sector]
+        acc[0] += lat_f
+        acc[1] += lon_f
+        acc[2] += 1
+    return sorted((s, round(a[0] / a[2], 5), round(a[1] / a[2], 5)) for s, a in sums.items())
+
+
+def full_postcodes(points, area: str = "BT") -> list[tuple[str, float, float]]:
+    """Every postcode in `area` with usable coordinates, normalised to "BT23 5AB"."""
+    found = {}
+    for postcode, lat, lon in points:
+        sector = postcode_sector(postcode)
+        if not sector or not sector.startswith(area):
+            continue
+        try:
+            lat_f, lon_f = float(lat), float(lon)
+        except (TypeError, ValueError):
+            continue
+        if not (-90 <= lat_f <= 90) or lat_f == 0:
+            continue
+        found[f"{sector}{''.join(postcode.split()).upper()[-2:]}"] = (round(lat_f, 5), round(lon_f, 5))
+    return sorted((pc, lat, lon) for pc, (lat, lon) in found.items())
+
+
+def write_gazetteer(path: Path, settlements, sectors, header_lines: list[str], postcodes=()):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for line in header_lines:
+            f.write(line if line.endswith("\n") else line + "\n")
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["kind", "name", "postcode", "lat", "lon"])
+        for name, lat, lon in settlements:
+            writer.writerow(["settlement", name, "", lat, lon])
+        for sector, lat, lon in sectors:
+            writer.writerow(["sector", "", sector, lat, lon])
+        for postcode, lat, lon in postcodes:
+            writer.writerow(["postcode", "", postcode, lat, lon])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m journeylogger.gazetteer",
+                                     description="Rebuild the postcode rows of the offline gazetteer.")
+    parser.add_argument("--postcodes", type=Path, required=True,
+                        help="ONSPD-style CSV (pcds, lat, long) or GeoNames GB_full.txt")
+    parser.add_argument("--area", default="BT", help="Postcode area to keep (default: BT; '' for the whole UK)")
+    parser.add_argument("--full-postcodes", action="store_true",
+                        help="Also keep every full postcode, so offline answers can fill the postcode column")
+    parser.add_argument("--gazetteer", type=Path, default=GAZETTEER_PATH)
+    args = parser.parse_args(argv)
+
+    with open(args.gazetteer, encoding="utf-8") as f:
+        header = [line for line in f if line.startswith("#")]
+    settlements = [(r["name"], r["lat"], r["lon"]) for r in read_rows(args.gazetteer) if r["kind"] == "settlement"]
+    points = list(read_postcode_points(args.postcodes))
+    sectors = sector_centroids(points, area=args.area.upper())
+    if not sectors:
+        print(f"❌ No {args.area} postcodes with coordinates found in {args.postcodes}")
+        return 1
+    postcodes = full_postcodes(points, area=args.area.upper()) if args.full_postcodes else []
+
+    write_gazetteer(args.gazetteer, settlements, sectors, header, postcodes)
+    print(f"✅ Wrote {len(settlements)} settlements, {len(sectors)} postcode sectors and {len(postcodes)} postcodes "
+          f"to {args.gazetteer}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
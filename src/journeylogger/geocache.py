@@ -0,0 +1,226 @@
+# geocache.py
+"""
+Provider-result caches:
+  reverse_cache  – reverse geocodes keyed by geohash cell, so points a few
+                   metres apart (same car park, same street) reuse one answer
+  forward_cache  – forward geocodes keyed by normalised address text
+  route_cache    – ORS leg distances keyed by the geohash cells of both ends
+
+Cell size (geohash precision), capacity and eviction policy of the reverse
+cache are set from the REVERSE_GEOCODE_CACHE_* environment variables or
+configure(); see the README. Geocode entries are stored as slotted
+models.Location records, not dicts. warmup.py fills these at startup.
+"""
+
+import os
+import threading
+
+from cachetools import FIFOCache, LFUCache, LRUCache, TTLCache
+
+from .models import Location
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+POLICIES = {"lru": LRUCache, "lfu": LFUCache, "fifo": FIFOCache, "ttl": TTLCache}
+
+
+def geohash(lat: float, lon: float, precision: int = 7) -> str:
+    """Standard base-32 geohash of (lat, lon)."""
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    chars, bits, ch, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                ch, lon_lo = ch << 1 | 1, mid
+            else:
+                ch, lon_hi = ch << 1, mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch, lat_lo = ch << 1 | 1, mid
+            else:
+                ch, lat_hi = ch << 1, mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(chars)
+
+
+def _make_cache(maxsize: int, policy: str, ttl: float):
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown cache policy '{policy}' (expected one of {', '.join(POLICIES)})")
+    if maxsize <= 0:
+        return None
+    if policy == "ttl":
+        return TTLCache(maxsize=maxsize, ttl=ttl)
+    return POLICIES[policy](maxsize=maxsize)
+
+
+class ReverseGeocodeCache:
+
+    def __init__(self, precision: int = 7, maxsize: int = 4096, policy: str = "lru", ttl: float = 86400):
+        self.precision = precision
+        self.maxsize = maxsize
+        self.policy = policy
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._cache = _make_cache(maxsize, policy, ttl)
+
+    def key(self, lat, lon) -> str | None:
+        try:
+            return geohash(float(lat), float(lon), self.precision)
+        except (TypeError, ValueError):
+            return None
+
+    def get(self, lat, lon) -> dict | None:
+        """A copy of the result cached for this cell, re-centred on (lat, lon)."""
+        key = self.key(lat, lon)
+        if self._cache is None or key is None:
+            return None
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        # to_dict() builds a fresh dict (and raw dict) each time, so callers may edit it
+        result = cached.to_dict()
+        result["lat"], result["lon"] = float(lat), float(lon)
+        return result
+
+    def put(self, lat, lon, result: dict | None):
+        key = self.key(lat, lon)
+        if self._cache is None or key is None or not result:
+            return
+        with self._lock:
+            self._cache[key] = Location.from_dict(result)
+
+    def clear(self):
+        with self._lock:
+            if self._cache is not None:
+                self._cache.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._cache) if self._cache is not None else 0
+
+
+class ForwardGeocodeCache:
+    """Address text → location; case and spacing don't matter ("Main St,  Bangor" == "main st, bangor")."""
+
+    def __init__(self, maxsize: int = 2048, ttl: float = 7 * 86400):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._cache = _make_cache(maxsize, "ttl", ttl)
+
+    @staticmethod
+    def key(text) -> str | None:
+        return " ".join(str(text).lower().split()) if text else None
+
+    def get(self, text) -> dict | None:
+        key = self.key(text)
+        if self._cache is None or key is None:
+            return None
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return cached.to_dict()
+
+    def put(self, text, result: dict | None):
+        key = self.key(text)
+        if self._cache is None or key is None or not result:
+            return
+        with self._lock:
+            self._cache[key] = Location.from_dict(result)
+
+    def clear(self):
+        with self._lock:
+            if self._cache is not None:
+                self._cache.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._cache) if self._cache is not None else 0
+
+
+class RouteCache:
+    """Driving miles per (start cell, end cell); precision 8 cells are about 38 m × 19 m."""
+
+    def __init__(self, precision: int = 8, maxsize: int = 4096, ttl: float = 7 * 86400):
+        self.precision = precision
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._cache = _make_cache(maxsize, "ttl", ttl)
+
+    def key(self, start, end) -> tuple[str, str] | None:
+        try:
+            return (geohash(float(start[0]), float(start[1]), self.precision),
+                    geohash(float(end[0]), float(end[1]), self.precision))
+        except (TypeError, ValueError, IndexError):
+            return None
+
+    def get(self, start, end) -> float | None:
+        key = self.key(start, end)
+        if self._cache is None or key is None:
+            return None
+        with self._lock:
+            miles = self._cache.get(key)
+            if miles is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return miles
+
+    def put(self, start, end, miles: float | None):
+        key = self.key(start, end)
+        if self._cache is None or key is None or miles is None:
+            return
+        with self._lock:
+            self._cache[key] = miles
+
+    def clear(self):
+        with self._lock:
+            if self._cache is not None:
+                self._cache.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._cache) if self._cache is not None else 0
+
+
+forward_cache = ForwardGeocodeCache(maxsize=int(os.getenv("FORWARD_GEOCODE_CACHE_SIZE", "2048")))
+route_cache = RouteCache(
+    precision=int(os.getenv("ROUTE_CACHE_PRECISION", "8")),
+    maxsize=int(os.getenv("ROUTE_CACHE_SIZE", "4096")),
+)
+
+reverse_cache = ReverseGeocodeCache(
+    precision=int(os.getenv("REVERSE_GEOCODE_CACHE_PRECISION", "7")),
+    maxsize=int(os.getenv("REVERSE_GEOCODE_CACHE_SIZE", "4096")),
+    policy=os.getenv("REVERSE_GEOCODE_CACHE_POLICY", "lru").lower(),
+    ttl=float(os.getenv("REVERSE_GEOCODE_CACHE_TTL", "86400")),
+)
+
+
+def configure(precision: int | None = None, maxsize: int | None = None,
+              policy: str | None = None, ttl: float | None = None) -> ReverseGeocodeCache:
+    """Replace the shared cache, keeping any setting not given. Existing entries are dropped."""
+    global reverse_cache
+    current = reverse_cache
+    reverse_cache = ReverseGeocodeCache(
+        precision=current.precision if precision is None else precision,
+        maxsize=current.maxsize if maxsize is None else maxsize,
+        policy=(policy or current.policy).lower(),
+        ttl=current.ttl if ttl is None else ttl,
+    )
+    return reverse_cache
@@ -1,3 +1,4 @@
+import logging
 import requests
 from urllib.parse import urlparse, parse_qs, unquote
 from .map_utils import *
@@ -6,6 +7,10 @@ import openrouteservice
 from openrouteservice import convert
 from dotenv import load_dotenv
 import os
+from . import http_client
+from .provider_health import run_cascade
+
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 
@@ -15,7 +20,7 @@ ORS_API_KEY = os.getenv("ORS_API_KEY")
 # ─── STEP 1: Expand the short Google Maps URL ──────────────────────────────────
 def expand_google_maps_url(short_url):
     try:
-        response = requests.get(short_url, allow_redirects=True, timeout=10)
+        response = http_client.get(short_url, provider="google", allow_redirects=True, timeout=10)
         final_url = response.url
 
         # Handle Google consent redirect
@@ -29,7 +34,7 @@ def expand_google_maps_url(short_url):
         return final_url
 
     except requests.RequestException as e:
-        print("❌ Error expanding URL:", e)
+        logger.error("Error expanding URL: %s", e)
         return None
     
 # ─── STEP 2: Extract origin + destination from a /dir/ or /place/ URL ──────────
@@ -81,10 +86,38 @@ def extract_addresses_from_gmaps_url(full_url):
             return origin, destination
 
     except Exception as e:
-        print("❌ Error extracting addresses:", e)
+        logger.error("Error extracting addresses: %s", e)
 
     return None, None
 
+# ─── STEP 2b: Every stop of a multi-stop /dir/ or ?daddr= link ─────────────────
+def extract_waypoints_from_gmaps_url(full_url) -> list[str | None]:
+    """
+    All stops of a directions link, origin first. An empty origin (the
+    driver's current location) is None. Returns [] for non-directions links.
+    """
+    parts = urlparse(full_url or "")
+    query = parse_qs(parts.query)
+
+    # /dir/<origin>/<stop>/…/<destination>/@lat,lon,zoom/data=…
+    if "/dir/" in parts.path:
+        waypoints = []
+        for segment in parts.path.split("/dir/", 1)[1].split("/"):
+            if segment.startswith("@") or segment.startswith("data="):
+                break
+            waypoints.append(unquote(segment.replace("+", " ")).strip() or None)
+        while waypoints and waypoints[-1] is None:
+            waypoints.pop()
+        return waypoints
+
+    # ?saddr=<origin>&daddr=<stop>+to:<stop>+to:<destination>
+    if "daddr" in query:
+        stops = [s.strip() for s in re.split(r"\s*\bto:", query["daddr"][0]) if s.strip()]
+        origin = query["saddr"][0].strip() if "saddr" in query else None
+        return [origin or None] + stops
+
+    return []
+
 # ─── FALLBACK: Geocode by Place ID ─────────────────────────────────────────────
 def geocode_by_place_id(place_id: str) -> str | None:
     """
@@ -95,8 +128,9 @@ def geocode_by_place_id(place_id: str) -> str | None:
         raise EnvironmentError("GOOGLE_API_KEY environment variable is required")
 
     try:
-        resp = requests.get(
+        resp = http_client.get(
             "https://maps.googleapis.com/maps/api/geocode/json",
+            provider="google",
             params={"place_id": place_id, "key": GOOGLE_API_KEY},
             timeout=10
         )
@@ -105,7 +139,7 @@ def geocode_by_place_id(place_id: str) -> str | None:
             loc = data["results"][0]["geometry"]["location"]
             return f"{loc['lat']}, {loc['lng']}"
     except requests.RequestException as e:
-        print("❌ Error geocoding place_id:", e)
+        logger.error("Error geocoding place_id: %s", e)
     return None
 
 # ─── FALLBACK: Decode Encoded Polyline ───────────────────────────────────────────
@@ -116,7 +150,7 @@ def decode_polyline(poly: str) -> list[tuple[float, float]]:
     try:
         return polyline.decode(poly)
     except Exception as e:
-        print("❌ Error decoding polyline:", e)
+        logger.error("Error decoding polyline: %s", e)
         return []
 
 # ─── STUB: Decode Google geocode token (undocumented) ───────────────────────────
@@ -125,7 +159,7 @@ def decode_geocode_token(token: str) -> tuple[float, float] | None:
     Placeholder for decoding Google internal geocode tokens.
     Not supported by public APIs.
     """
-    print("⚠️ decode_geocode_token is not implemented")
+    logger.warning("decode_geocode_token is not implemented")
     return None
 
 
@@ -145,20 +179,17 @@ def geocode_destination(query: dict, geonames_username: str = None):
     full_url = query.get("_full_url")  # if you pass it in
     daddr    = query.get("daddr", [""])[0]
 
-    # 1) your primary forward_geocode (e.g. ORS)
-    coords = try_coords(forward_geocode, daddr)
-    # 2) free: Nominatim
-    if not coords:
-        coords = try_coords(forward_geocode_nominatim, daddr)
+    # 1-3) ORS, Nominatim, Photon in that order; open or failing circuits last
+    coords = run_cascade([
+        ("ors", forward_geocode),
+        ("nominatim", forward_geocode_nominatim),
+        ("photon", geocode_with_photon),
+    ], daddr)
 
     # 2.d try openrouteservice
     # if not coords:
     #     _, coords = get_route_coords_from_query(query)
 
-    # 3) free: Photon
-    if not coords:
-        coords = try_coords(geocode_with_photon, daddr)
-
     # 4) pb-param scrape
     if not coords and full_url:
         coords = try_coords(extract_from_pb, full_url)
@@ -0,0 +1,420 @@
+# http_client.py
+"""
+Single HTTP entry point for every provider call (Google, Nominatim, Photon,
+ORS, postcodes.io, …) with an optional record/replay layer underneath.
+
+Modes, picked with JOURNEYLOGGER_HTTP_MODE or configure():
+  live    – straight through to `requests` (default)
+  record  – call the provider and save each response to the fixture store
+  replay  – serve responses from the fixture store, never touching the network
+
+Fixtures live under JOURNEYLOGGER_FIXTURES (default tests/fixtures/http), one
+JSON file per distinct request, grouped by provider. Secrets such as API keys
+and auth headers are never part of the key or the stored file.
+
+Identical requests issued concurrently (same provider and request key) are
+coalesced: one goes out, the others wait and share its response. Turn this
+off with JOURNEYLOGGER_COALESCE=0.
+
+Outside replay mode every call is also reported to provider_health, and a
+provider whose circuit breaker is open fails fast with CircuitOpenError.
+
+Calls that reach the real network are paced per provider by one shared
+limiter, whichever thread makes them: PROVIDER_MIN_INTERVAL_S (default
+"nominatim=1,ors=1") gives the minimum seconds between two calls to a
+provider, matching Nominatim's usage policy and the ORS free tier.
+
+Each call that actually goes out (or is replayed) logs one INFO event on the
+"journeylogger.provider" logger, e.g.
+  provider=nominatim GET status=200 ms=182 mode=live outcome=ok key=1f3a9c20
+with the same fields attached to the record as `provider_event` for
+structured handlers. Coalesced waiters and skipped calls are not events.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .provider_health import CircuitOpenError, registry as health
+
+events = logging.getLogger("journeylogger.provider")
+
+# ─── Configuration ──────────────────────────────────────────────────────────────
+
+MODES = ("live", "record", "replay")
+
+root = Path(__file__).resolve().parent.parent.parent
+DEFAULT_FIXTURE_DIR = root / "tests" / "fixtures" / "http"
+
+# Query params / body fields that carry credentials and must not leak into fixtures
+SECRET_PARAMS = {"api_key", "key", "apikey", "token", "username", "email"}
+
+_mode = os.getenv("JOURNEYLOGGER_HTTP_MODE", "live").lower()
+_fixture_dir = Path(os.getenv("JOURNEYLOGGER_FIXTURES", DEFAULT_FIXTURE_DIR))
+_latency = os.getenv("JOURNEYLOGGER_REPLAY_LATENCY_MS", "0")
+_jitter_ms = float(os.getenv("JOURNEYLOGGER_REPLAY_JITTER_MS", "0"))
+_transport = requests.request
+_coalesce = os.getenv("JOURNEYLOGGER_COALESCE", "1") not in ("0", "false", "no")
+_min_intervals = os.getenv("PROVIDER_MIN_INTERVAL_S", "nominatim=1,ors=1")
+
+
+class FixtureNotFoundError(requests.ConnectionError):
+    """Raised in replay mode when no fixture was recorded for a request.
+
+    Subclasses ConnectionError so providers treat it exactly like the network
+    being down and fall through to their next fallback.
+    """
+
+
+def configure(mode: str | None = None, fixture_dir=None, latency_ms=None, jitter_ms: float | None = None,
+              transport=None, coalesce: bool | None = None):
+    """
+    Override the env-derived settings at runtime (benchmarks, load tests).
+    latency_ms is a number of milliseconds or "recorded" to reuse each
+    fixture's captured round-trip time. transport replaces requests.request
+    for live/record calls, e.g. to record against a local fake provider.
+    """
+    global _mode, _fixture_dir, _latency, _jitter_ms, _transport, _coalesce
+    if mode is not None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown HTTP mode {mode!r}, expected one of {MODES}")
+        _mode = mode
+    if fixture_dir is not None:
+        _fixture_dir = Path(fixture_dir)
+    if latency_ms is not None:
+        _latency = str(latency_ms)
+    if jitter_ms is not None:
+        _jitter_ms = float(jitter_ms)
+    if transport is not None:
+        _transport = transport
+    if coalesce is not None:
+        _coalesce = coalesce
+
+
+def get_mode() -> str:
+    return _mode
+
+
+def is_replay() -> bool:
+    """True when no real network traffic should happen."""
+    return _mode == "replay"
+
+
+def uses_network() -> bool:
+    """True when calls reach real providers, so rate-limit throttles apply."""
+    return _mode != "replay" and _transport is requests.request
+
+
+# ─── Fixture store ──────────────────────────────────────────────────────────────
+
+def _scrub(mapping) -> dict:
+    if not mapping:
+        return {}
+    return {k: v for k, v in dict(mapping).items() if k.lower() not in SECRET_PARAMS}
+
+
+def _scrub_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in SECRET_PARAMS]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def request_key(method: str, url: str, params=None, body=None) -> str:
+    """
+    Stable fingerprint of a request: method, URL, sorted params and JSON body,
+    with credentials stripped so recordings made with different keys match.
+    """
+    canonical = json.dumps(
+        {
+            "method": method.upper(),
+            "url": _scrub_url(url),
+            "params": _scrub(params),
+            "body": body,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+class FixtureStore:
+    """Directory of recorded responses: <root>/<provider>/<key>.json"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def path_for(self, provider: str, key: str) -> Path:
+        return self.directory / provider / f"{key}.json"
+
+    def load(self, provider: str, key: str) -> dict | None:
+        path = self.path_for(provider, key)
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, provider: str, key: str, method: str, url: str, params, body,
+             status_code: int, text: str, final_url: str | None = None,
+             headers: dict | None = None, elapsed_ms: float = 0.0):
+        path = self.path_for(provider, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fixture = {
+            "request": {
+                "method": method.upper(),
+                "url": _scrub_url(url),
+                "params": _scrub(params),
+                "body": body,
+            },
+            "response": {
+                "status_code": status_code,
+                "url": _scrub_url(final_url or url),
+                "headers": {"Content-Type": (headers or {}).get("Content-Type", "application/json")},
+                "text": text,
+                "elapsed_ms": round(elapsed_ms, 1),
+            },
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, indent=2, ensure_ascii=False)
+        return path
+
+    def add(self, provider: str, method: str, url: str, params=None, body=None,
+            payload=None, status_code: int = 200, final_url: str | None = None, elapsed_ms: float = 0.0):
+        """Register a synthetic response; payload may be a str or JSON-able object."""
+        text = payload if isinstance(payload, str) else json.dumps(payload)
+        key = request_key(method, url, params, body)
+        return self.save(provider, key, method, url, params, body, status_code, text,
+                         final_url=final_url, elapsed_ms=elapsed_ms)
+
+
+def _build_response(fixture: dict) -> requests.Response:
+    """Turn a stored fixture back into a real requests.Response."""
+    data = fixture["response"]
+    resp = requests.Response()
+    resp.status_code = data["status_code"]
+    resp.url = data["url"]
+    resp.headers = CaseInsensitiveDict(data.get("headers", {}))
+    resp.encoding = "utf-8"
+    resp._content = data["text"].encode("utf-8")
+    resp._content_consumed = True  # lets iter_content() replay it for stream=True callers
+    return resp
+
+
+def _simulated_delay(fixture: dict, key: str) -> float:
+    """Seconds to sleep for a replayed call; jitter is seeded by the key so runs repeat."""
+    if _latency == "recorded":
+        base_ms = fixture["response"].get("elapsed_ms", 0.0)
+    else:
+        base_ms = float(_latency or 0)
+    if _jitter_ms:
+        base_ms += random.Random(key).uniform(-_jitter_ms, _jitter_ms)
+    return max(base_ms, 0.0) / 1000
+
+
+# ─── Rate limiting ──────────────────────────────────────────────────────────────
+
+def parse_intervals(spec: str) -> dict[str, float]:
+    """'nominatim=1, ors=1.5' → {"nominatim": 1.0, "ors": 1.5}"""
+    intervals = {}
+    for item in (spec or "").split(","):
+        name, _, seconds = item.partition("=")
+        if name.strip() and seconds.strip():
+            intervals[name.strip()] = float(seconds)
+    return intervals
+
+
+class RateLimiter:
+    """
+    Keeps calls to each provider at least its interval apart across every
+    thread. A caller reserves the provider's next free slot under the lock,
+    then sleeps outside it until the slot comes round.
+    """
+
+    def __init__(self, intervals: dict[str, float], clock=time.monotonic, sleep=time.sleep):
+        self.intervals = dict(intervals)
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._next: dict[str, float] = {}
+
+    def wait(self, provider: str) -> float:
+        """Block until a call to provider may go out; returns the seconds waited."""
+        interval = self.intervals.get(provider)
+        if not interval:
+            return 0.0
+        with self._lock:
+            now = self.clock()
+            slot = max(now, self._next.get(provider, now))
+            self._next[provider] = slot + interval
+        delay = slot - now
+        if delay > 0:
+            self.sleep(delay)
+        return delay
+
+
+limiter = RateLimiter(parse_intervals(_min_intervals))
+
+
+# ─── Coalescing ─────────────────────────────────────────────────────────────────
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Runs fn() once per key at a time: callers arriving while a call for the
+    same key is in flight block until it finishes and get the same result
+    (or exception) instead of making their own call.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: dict = {}
+        self.shared = 0  # calls answered by someone else's flight
+
+    def do(self, key, fn):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.shared += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+
+flights = SingleFlight()
+
+
+# ─── Public request API ─────────────────────────────────────────────────────────
+
+def request(method: str, url: str, *, provider: str, params=None, json=None, **kwargs) -> requests.Response:
+    """
+    Drop-in for requests.request() that honours the record/replay mode.
+    `provider` names the fixture folder (e.g. "nominatim", "ors").
+    Concurrent identical requests share one call and one Response object,
+    so treat the response as read-only.
+    """
+    key = request_key(method, url, params, json)
+    if not _coalesce or kwargs.get("stream"):
+        return _request(method, url, key, provider, params, json, **kwargs)
+    return flights.do((provider, key), lambda: _request(method, url, key, provider, params, json, **kwargs))
+
+
+def _log_event(provider: str, method: str, key: str, started: float, status, outcome: str):
+    if not events.isEnabledFor(logging.INFO):
+        return
+    event = {
+        "provider": provider,
+        "method": method.upper(),
+        "status": status,
+        "ms": round((time.perf_counter() - started) * 1000),
+        "mode": _mode,
+        "outcome": outcome,
+        "key": key[:8],
+    }
+    events.info("provider=%(provider)s %(method)s status=%(status)s ms=%(ms)d mode=%(mode)s "
+                "outcome=%(outcome)s key=%(key)s", event, extra={"provider_event": event})
+
+
+def _request(method: str, url: str, key: str, provider: str, params, json, **kwargs) -> requests.Response:
+    started = time.perf_counter()
+    try:
+        resp = _call(method, url, key, provider, params, json, **kwargs)
+    except CircuitOpenError:
+        _log_event(provider, method, key, started, None, "circuit_open")
+        raise
+    except FixtureNotFoundError:
+        _log_event(provider, method, key, started, None, "no_fixture")
+        raise
+    except requests.RequestException as e:
+        _log_event(provider, method, key, started, None, type(e).__name__)
+        raise
+    _log_event(provider, method, key, started, resp.status_code, "ok" if resp.ok else "http_error")
+    return resp
+
+
+def _call(method: str, url: str, key: str, provider: str, params, json, **kwargs) -> requests.Response:
+    store = FixtureStore(_fixture_dir)
+
+    if _mode == "replay":
+        fixture = store.load(provider, key)
+        if fixture is None:
+            raise FixtureNotFoundError(f"No {provider} fixture for {method.upper()} {url} (key {key})")
+        delay = _simulated_delay(fixture, key)
+        if delay:
+            time.sleep(delay)
+        return _build_response(fixture)
+
+    breaker = health.get(provider)
+    if not breaker.allow():
+        raise CircuitOpenError(f"{provider} circuit open, skipping {method.upper()} {_scrub_url(url)}")
+
+    if uses_network():
+        limiter.wait(provider)
+    started = time.perf_counter()
+    try:
+        resp = _transport(method, url, params=params, json=json, **kwargs)
+    except requests.RequestException:
+        breaker.record(False, time.perf_counter() - started)
+        raise
+    except BaseException:
+        breaker.record(True, time.perf_counter() - started)  # our bug, not the provider's
+        raise
+    # Rate limiting and server errors count against the provider; other 4xx are our request
+    breaker.record(resp.status_code < 500 and resp.status_code != 429, time.perf_counter() - started)
+
+    if _mode == "record":
+        store.save(
+            provider, key, method, url, params, json,
+            status_code=resp.status_code,
+            text=resp.text,
+            final_url=resp.url,
+            headers=resp.headers,
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+        )
+    if not kwargs.get("stream"):
+        _ = resp.content  # read the body now so every waiter can use it
+    return resp
+
+
+def get(url: str, *, provider: str, params=None, **kwargs) -> requests.Response:
+    return request("GET", url, provider=provider, params=params, **kwargs)
+
+
+def post(url: str, *, provider: str, json=None, **kwargs) -> requests.Response:
+    return request("POST", url, provider=provider, json=json, **kwargs)
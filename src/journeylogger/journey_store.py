@@ -0,0 +1,286 @@
+# journey_store.py
+"""
+Local SQLite mirror of every journey the bot logs, for reporting without
+Sheets API reads.
+
+The bot appends to the store right after the sheet, one row per sheet row
+(so one per leg of a multi-stop route), plus coordinates and the Telegram
+user. Existing history is back-filled with `import`; rows are keyed on
+(processed minute, URL, note) so importing twice or importing rows the bot
+already mirrored adds nothing.
+
+    python -m journeylogger.journey_store import                  # one read of the sheet
+    python -m journeylogger.journey_store report --by month
+    python -m journeylogger.journey_store report --by week visit_type --from 2026-09-01
+
+Reports load the selected rows into a DataFrame once and aggregate with
+pandas groupbys. Set JOURNEYLOGGER_STORE to move the database, or to an
+empty string to stop the bot mirroring.
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from . import http_client
+from .models import coord
+from .sheet_writer import journey_rows
+
+logger = logging.getLogger(__name__)
+
+root = Path(__file__).resolve().parent.parent.parent
+DEFAULT_STORE_PATH = str(root / "data" / "journeys.sqlite")
+STORE_PATH = os.getenv("JOURNEYLOGGER_STORE", DEFAULT_STORE_PATH)
+
+LONDON = ZoneInfo("Europe/London")
+
+COLUMNS = [
+    "processed_at", "day", "user", "visit_type",
+    "origin_town", "origin_postcode", "origin_lat", "origin_lon",
+    "destination_town", "destination_postcode", "destination_lat", "destination_lon",
+    "distance_miles", "url", "note",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS journeys (
+    id                   INTEGER PRIMARY KEY,
+    processed_at         TEXT NOT NULL,   -- Europe/London, minute precision like the sheet
+    day                  TEXT NOT NULL,   -- YYYY-MM-DD
+    user                 TEXT,
+    visit_type           TEXT,
+    origin_town          TEXT,
+    origin_postcode      TEXT,
+    origin_lat           REAL,
+    origin_lon           REAL,
+    destination_town     TEXT,
+    destination_postcode TEXT,
+    destination_lat      REAL,
+    destination_lon      REAL,
+    distance_miles       REAL,
+    url                  TEXT NOT NULL DEFAULT '',
+    note                 TEXT NOT NULL DEFAULT '',
+    UNIQUE (processed_at, url, note)
+);
+CREATE INDEX IF NOT EXISTS journeys_day ON journeys (day);
+"""
+
+# Report groupings: time buckets are derived from `day`, the rest are columns
+PERIODS = {"day": "D", "week": "W-SUN", "month": "M"}
+GROUPINGS = [*PERIODS, "visit_type", "origin_town", "destination_town", "user"]
+
+
+class JourneyStore:
+
+    def __init__(self, path):
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def add_rows(self, rows: list[tuple]) -> int:
+        """Insert rows in COLUMNS order; returns how many were new."""
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO journeys ({', '.join(COLUMNS)}) VALUES ({placeholders})", rows
+            )
+            return self._conn.total_changes - before
+
+    def add_journeys(self, journeys: list[tuple[dict, str]], timestamp: datetime | None = None,
+                     note="", user=None) -> int:
+        """Mirror what append_journeys_to_sheet() writes for these (result, url) pairs."""
+        timestamp = timestamp or datetime.now(LONDON)
+        rows = [row for result, url in journeys
+                for row in store_rows(result, url, timestamp, note=note, user=user)]
+        return self.add_rows(rows)
+
+    def import_sheet_records(self, records: list[dict]) -> int:
+        """Back-fill from sheet records (get_all_records() dicts); unparseable rows are skipped."""
+        return self.add_rows([row for row in map(sheet_record_row, records) if row is not None])
+
+    def frame(self, start: date | None = None, end: date | None = None, user: str | None = None) -> pd.DataFrame:
+        """Journeys with start <= day <= end (either open), as a DataFrame with a datetime `day`."""
+        where, params = _filters(start, end, user)
+        with self._lock:
+            df = pd.read_sql_query(f"SELECT {', '.join(COLUMNS)} FROM journeys WHERE {where} ORDER BY processed_at, id",
+                                   self._conn, params=params)
+        df["day"] = pd.to_datetime(df["day"])
+        return df
+
+    def iter_chunks(self, start: date | None = None, end: date | None = None, user: str | None = None,
+                    chunk_size: int = 1000):
+        """
+        Yield the selected journeys as lists of at most chunk_size dicts, in
+        insertion order. Each chunk is its own keyset query, so memory stays
+        flat and the bot can keep appending meanwhile.
+        """
+        where, params = _filters(start, end, user)
+        sql = f"SELECT id, {', '.join(COLUMNS)} FROM journeys WHERE {where} AND id > ? ORDER BY id LIMIT ?"
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(sql, [*params, last_id, chunk_size]).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield [dict(zip(COLUMNS, row[1:])) for row in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM journeys").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def store_rows(result: dict, url: str, timestamp: datetime, note="", user=None) -> list[tuple]:
+    """Store rows for one result: the sheet row values plus coordinates and user."""
+    legs = result.get("legs") or [result]
+    processed = timestamp.astimezone(LONDON) if timestamp.tzinfo else timestamp
+    rows = []
+    for leg, sheet_row in zip(legs, journey_rows(result, url, timestamp=timestamp, note=note)):
+        origin, dest = leg["origin"], leg["destination"]
+        rows.append((
+            processed.strftime("%Y-%m-%dT%H:%M"), processed.date().isoformat(),
+            None if user is None else str(user), sheet_row[2] or None,
+            sheet_row[3] or None, sheet_row[4] or None, coord(origin.get("lat")), coord(origin.get("lon")),
+            sheet_row[5] or None, sheet_row[6] or None, coord(dest.get("lat")), coord(dest.get("lon")),
+            coord(leg.get("distance_miles")), url or "", sheet_row[9] or "",
+        ))
+    return rows
+
+
+def _filters(start: date | None, end: date | None, user) -> tuple[str, list]:
+    where, params = ["1=1"], []
+    if start:
+        where.append("day >= ?")
+        params.append(start.isoformat())
+    if end:
+        where.append("day <= ?")
+        params.append(end.isoformat())
+    if user:
+        where.append("user = ?")
+        params.append(str(user))
+    return " AND ".join(where), params
+
+
+def sheet_record_row(record: dict) -> tuple | None:
+    """A sheet record (header → cell) as a store row in COLUMNS order; None if it has no valid timestamp."""
+    processed = parse_sheet_timestamp(record.get("Processed Timestamp", ""))
+    if processed is None:
+        return None
+    return (
+        processed.strftime("%Y-%m-%dT%H:%M"), processed.date().isoformat(), None,
+        record.get("Journey Type") or None,
+        record.get("Origin Town") or None, record.get("Origin Postcode") or None, None, None,
+        record.get("Destination Town") or None, record.get("Destination Postcode") or None, None, None,
+        coord(record.get("Estimated Mileage (ORS)")), record.get("Raw URL") or "", record.get("Notes") or "",
+    )
+
+
+def parse_sheet_timestamp(text: str) -> datetime | None:
+    """'18 October 2026, 14:03 BST' → naive London datetime (the zone name is dropped)."""
+    try:
+        return datetime.strptime(text.strip().rsplit(" ", 1)[0], "%d %B %Y, %H:%M")
+    except ValueError:
+        return None
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_store() -> JourneyStore | None:
+    """
+    The shared store at STORE_PATH, opened on first use; None if mirroring is
+    off. In replay mode it is an in-memory database, like the MemorySheet.
+    """
+    global _default
+    if not STORE_PATH:
+        return None
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = JourneyStore(":memory:" if http_client.is_replay() else STORE_PATH)
+    return _default
+
+
+def mirror_journeys(journeys: list[tuple[dict, str]], timestamp: datetime | None = None, note="", user=None):
+    """Best-effort copy of freshly logged journeys into the local store."""
+    try:
+        store = default_store()
+        if store is not None:
+            store.add_journeys(journeys, timestamp=timestamp, note=note, user=user)
+    except Exception as e:
+        logger.warning("Failed to mirror journeys to the local store: %s", e)
+
+
+# ─── Reporting ─────────────────────────────────────────────────────────────────
+
+def mileage_report(df: pd.DataFrame, by: list[str]) -> pd.DataFrame:
+    """Journeys, total/mean miles and journeys without a distance, grouped by the `by` keys."""
+    unknown = [b for b in by if b not in GROUPINGS]
+    if unknown:
+        raise ValueError(f"Unknown grouping {unknown}, expected any of {GROUPINGS}")
+
+    keys = [df["day"].dt.to_period(PERIODS[b]).rename(b) if b in PERIODS else df[b].fillna("").rename(b)
+            for b in by]
+    miles = df["distance_miles"]
+    grouped = pd.DataFrame({"miles": miles, "unmeasured": miles.isna()}).groupby(keys, sort=True)
+    report = grouped.agg(journeys=("miles", "size"), miles=("miles", "sum"),
+                         mean_miles=("miles", "mean"), unmeasured=("unmeasured", "sum"))
+    return report.round(2)
+
+
+def _parse_day(text: str) -> date:
+    return date.fromisoformat(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m journeylogger.journey_store",
+                                     description="Local journey store: back-fill from the sheet and mileage reports.")
+    parser.add_argument("--store", default=STORE_PATH or DEFAULT_STORE_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("import", help="Copy every sheet row into the store (one Sheets read)")
+
+    report = commands.add_parser("report", help="Mileage totals from the store")
+    report.add_argument("--by", nargs="+", default=["month"], choices=GROUPINGS)
+    report.add_argument("--from", dest="start", type=_parse_day, help="First day, YYYY-MM-DD")
+    report.add_argument("--to", dest="end", type=_parse_day, help="Last day, YYYY-MM-DD")
+    report.add_argument("--user", help="Only journeys logged by this Telegram user id")
+    report.add_argument("--csv", action="store_true", help="Print CSV instead of a table")
+    args = parser.parse_args(argv)
+
+    store = JourneyStore(args.store)
+
+    if args.command == "import":
+        from .sheet_writer import connect_to_sheet, get_all_records
+
+        added = store.import_sheet_records(get_all_records(connect_to_sheet()))
+        print(f"✅ Imported {added} new rows into {args.store} ({len(store)} in total)")
+        return 0
+
+    df = store.frame(args.start, args.end, args.user)
+    if df.empty:
+        print(f"ℹ️ No journeys in {args.store} for that range")
+        return 1
+    table = mileage_report(df, args.by)
+    print(table.to_csv() if args.csv else table.to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,158 @@
+# known_locations.py
+"""
+Compiled lookup of known locations (home, depot, …) by text and by position.
+
+- PhraseMatcher: every known phrase folded into one trie-shaped regex, so a
+  text is scanned once in C however many phrases there are.
+- GeofenceIndex: a radius around each known site, bucketed in a uniform grid
+  so a point only ever checks the geofences in its own and adjacent cells.
+- KnownLocations: both, built from the addresses.json mapping, where each
+  category lists phrases and/or {"lat": .., "lon": .., "radius_m": ..} entries.
+"""
+
+import logging
+import math
+import re
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6_371_008.8
+DEFAULT_RADIUS_M = 150.0
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+# ─── Text: trie-compiled multi-phrase regex ────────────────────────────────────
+
+def trie_regex(phrases) -> str:
+    """
+    Regex source matching any of `phrases`, factored as a trie so shared
+    prefixes are tested once (e.g. "bt9 1", "bt9 7" → "bt9\\ (?:1|7)").
+    """
+    trie: dict = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        optional = "" in node
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        if optional:
+            return f"(?:{'|'.join(alts)})?"
+        return alts[0] if len(alts) == 1 else f"(?:{'|'.join(alts)})"
+
+    return build(trie)
+
+
+class PhraseMatcher:
+    """Case-insensitive substring matcher for many phrases at once."""
+
+    def __init__(self, phrases: dict[str, str]):
+        # phrase → value; phrases compared lowercased, like the old `in` checks
+        self.values = {p.lower().strip(): v for p, v in phrases.items() if p and p.strip()}
+        source = trie_regex(self.values)
+        # Lookahead finds the longest phrase starting at every position, overlaps included
+        self.pattern = re.compile(f"(?=({source}))") if source else None
+
+    def find_all(self, text: str) -> list[str]:
+        """Values of every phrase found in text, in order of appearance (deduplicated)."""
+        if not self.pattern or not text:
+            return []
+        found = (self.values[m.group(1)] for m in self.pattern.finditer(text.lower()))
+        return list(dict.fromkeys(found))
+
+
+# ─── Position: grid-bucketed geofences ─────────────────────────────────────────
+
+class GeofenceIndex:
+    """Circular geofences in a uniform grid; cell size ≥ the largest radius."""
+
+    def __init__(self, cell_m: float = 500.0):
+        self.cell_m = cell_m
+        self._fences: list[tuple[float, float, float, str]] = []
+        self._grid: dict[tuple[int, int], list[int]] = defaultdict(list)
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        # Equirectangular metres are plenty accurate at geofence scale
+        y = lat * 111_320.0
+        x = lon * 111_320.0 * math.cos(math.radians(lat))
+        return int(y // self.cell_m), int(x // self.cell_m)
+
+    def add(self, lat: float, lon: float, radius_m: float, value: str):
+        if radius_m > self.cell_m:
+            self._rebuild(radius_m)
+        self._fences.append((lat, lon, radius_m, value))
+        self._grid[self._cell(lat, lon)].append(len(self._fences) - 1)
+
+    def _rebuild(self, cell_m: float):
+        self.cell_m = cell_m
+        self._grid.clear()
+        for i, (lat, lon, _, _) in enumerate(self._fences):
+            self._grid[self._cell(lat, lon)].append(i)
+
+    def find(self, lat: float, lon: float) -> list[tuple[float, str]]:
+        """(distance_m, value) of every geofence containing the point, nearest first."""
+        cy, cx = self._cell(lat, lon)
+        hits = []
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                for i in self._grid.get((cy + dy, cx + dx), ()):
+                    flat, flon, radius, value = self._fences[i]
+                    d = haversine_m(lat, lon, flat, flon)
+                    if d <= radius:
+                        hits.append((d, value))
+        return sorted(hits)
+
+    def __len__(self):
+        return len(self._fences)
+
+
+# ─── Both, from the addresses.json mapping ─────────────────────────────────────
+
+class KnownLocations:
+
+    def __init__(self, mapping: dict[str, list] | None = None, default_radius_m: float = DEFAULT_RADIUS_M):
+        mapping = mapping or {}
+        self.categories = list(mapping)
+        phrases: dict[str, str] = {}
+        self.geofences = GeofenceIndex()
+        for category, entries in mapping.items():
+            for entry in entries or []:
+                if isinstance(entry, dict):
+                    try:
+                        self.geofences.add(float(entry["lat"]), float(entry["lon"]),
+                                           float(entry.get("radius_m", default_radius_m)), category)
+                    except (KeyError, TypeError, ValueError):
+                        logger.warning("Ignoring malformed geofence for %r: %s", category, entry)
+                elif isinstance(entry, str):
+                    phrases.setdefault(entry, category)
+        self.phrases = PhraseMatcher(phrases)
+
+    def match_text(self, text: str | None) -> list[str]:
+        """Categories whose phrases occur in text."""
+        return self.phrases.find_all(text or "")
+
+    def match_point(self, lat, lon) -> list[str]:
+        """Categories whose geofence contains (lat, lon), nearest first."""
+        try:
+            lat, lon = float(lat), float(lon)
+        except (TypeError, ValueError):
+            return []
+        return list(dict.fromkeys(value for _, value in self.geofences.find(lat, lon)))
+
+    def match(self, text: str | None = None, lat=None, lon=None) -> set[str]:
+        """Union of text and geofence matches."""
+        found = set(self.match_text(text))
+        if lat not in (None, "") and lon not in (None, ""):
+            found.update(self.match_point(lat, lon))
+        return found
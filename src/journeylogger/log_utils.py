@@ -0,0 +1,140 @@
+# log_utils.py
+"""
+Logging setup and per-journey correlation IDs.
+
+configure_logging() puts a single QueueHandler on the root logger; the file
+and console handlers run on a QueueListener thread, so a log call on the
+event loop or a worker thread only enqueues the record.
+
+Every record carries `correlation_id` from a ContextVar: set it with
+correlation() around a journey. asyncio.to_thread copies the context
+automatically; use propagate() for work handed to a ThreadPoolExecutor.
+"""
+
+import atexit
+import contextvars
+import logging
+import os
+import queue
+import uuid
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+correlation_id: contextvars.ContextVar[str] = contextvars.ContextVar("correlation_id", default="-")
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(correlation_id)s] %(message)s"
+
+_listener: QueueListener | None = None
+_queue_handler: QueueHandler | None = None
+
+
+def new_correlation_id() -> str:
+    return uuid.uuid4().hex[:8]
+
+
+@contextmanager
+def correlation(cid: str | None = None):
+    """Tag every log record in this block (and threads it spawns via to_thread/propagate) with cid."""
+    token = correlation_id.set(cid or new_correlation_id())
+    try:
+        yield correlation_id.get()
+    finally:
+        correlation_id.reset(token)
+
+
+def propagate(fn):
+    """Wrap fn so it runs in a copy of the caller's context (correlation ID included) on any thread."""
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.copy().run(fn, *args, **kwargs)
+
+
+class CorrelationFilter(logging.Filter):
+    """Stamps the current correlation ID on the record in the emitting thread."""
+
+    def filter(self, record):
+        if not hasattr(record, "correlation_id"):
+            record.correlation_id = correlation_id.get()
+        return True
+
+
+def configure_logging(log_dir="logs") -> QueueListener:
+    """
+    Configures logging:
+    - INFO+ to info log
+    - ERROR+ to error log
+    - WARNING+ to console
+    - Silences HTTP + Telegram noise
+    All three handlers sit behind one QueueHandler/QueueListener pair.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return _listener
+
+    os.makedirs(log_dir, exist_ok=True)
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    # ── File handler: INFO and above ───────────────────────────
+    info_handler = RotatingFileHandler(
+        filename=os.path.join(log_dir, "journeylogger-info.log"),
+        maxBytes=1_000_000,
+        backupCount=3,
+        encoding="utf-8"
+    )
+    info_handler.setLevel(logging.INFO)
+    info_handler.setFormatter(formatter)
+
+    # ── File handler: ERROR only ───────────────────────────────
+    error_handler = RotatingFileHandler(
+        filename=os.path.join(log_dir, "journeylogger-errors.log"),
+        maxBytes=1_000_000,
+        backupCount=3,
+        encoding="utf-8"
+    )
+    error_handler.setLevel(logging.ERROR)
+    error_handler.setFormatter(formatter)
+
+    # ── Console handler: only WARNING+ ─────────────────────────
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.WARNING)
+    console_handler.setFormatter(logging.Formatter("%(levelname)s: [%(correlation_id)s] %(message)s"))
+
+    # ── Root logger only enqueues; the listener thread does the I/O ──
+    log_queue: queue.Queue = queue.Queue(-1)
+    _queue_handler = QueueHandler(log_queue)
+    _queue_handler.addFilter(CorrelationFilter())
+
+    root = logging.getLogger()
+    root.setLevel(logging.DEBUG)  # Set high, handlers control output
+    root.addHandler(_queue_handler)
+
+    _listener = QueueListener(log_queue, info_handler, error_handler, console_handler,
+                              respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    # ── Suppress external noise ────────────────────────────────
+    logging.getLogger("urllib3").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("telegram").setLevel(logging.WARNING)
+    logging.getLogger("telegram.ext._application").setLevel(logging.WARNING)
+
+    logging.info("Logging configured. Logs at '%s'.", log_dir)
+    return _listener
+
+
+def _restart_in_child():
+    # A forked webhook worker inherits the QueueHandler but not the listener
+    # thread; give it a fresh queue and a new listener over the same handlers.
+    global _listener
+    if _listener is None:
+        return
+    inherited = _listener
+    atexit.unregister(inherited.stop)
+    log_queue: queue.Queue = queue.Queue(-1)
+    _queue_handler.queue = log_queue
+    _listener = QueueListener(log_queue, *inherited.handlers, respect_handler_level=inherited.respect_handler_level)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+os.register_at_fork(after_in_child=_restart_in_child)
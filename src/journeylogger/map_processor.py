@@ -1,19 +1,26 @@
 import os
+import logging
 import requests
 import re
 import sys
 import time
 from dotenv import load_dotenv
 import json
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Tuple, List, Dict
 from pathlib import Path
 from urllib.parse import urlparse, parse_qs
-from journeylogger.map_utils import reverse_geocode, get_town_from_uk_postcode, make_empty_location_dict
-
-from .sheet_writer import connect_to_sheet
-
-sheet = connect_to_sheet()
+from journeylogger.map_utils import reverse_geocode, get_town_from_uk_postcode, make_empty_location_dict, estimate_road_distance_miles
+from . import routing
+from .known_locations import KnownLocations
+from .address_parser import parse_address, fuzzy_town_match
+from .gazetteer import default_gazetteer
+from .log_utils import correlation, correlation_id, propagate
+from .models import Journey, Location, coord
+from .profiling import stage
+from .sheet_router import sheet_for
+
+logger = logging.getLogger(__name__)
 
 # ─── Figure out which .env to load ─────────────────────────────────────────────
 # Grab the script that kicked everything off:
@@ -35,7 +42,7 @@ ORS_API_KEY    = os.getenv("ORS_API_KEY")
 NOMINATUM_AGENT = os.getenv("NOMINATUM_AGENT")
 
 from .map_utils import lookup_location
-from .gmaps_utils import expand_google_maps_url, extract_addresses_from_gmaps_url
+from .gmaps_utils import expand_google_maps_url, extract_addresses_from_gmaps_url, extract_waypoints_from_gmaps_url
 
 # Load known addresses JSON
 addresses_path = Path(__file__).parent.parent / "journeylogger" / "secrets" / "addresses.json"
@@ -44,114 +51,34 @@ try:
     with open(addresses_path, "r", encoding="utf-8") as f:
         known_addresses = json.load(f)
 except Exception as e:
-    print(f"⚠️ Failed to load known addresses: {e}")
+    logger.warning("Failed to load known addresses: %s", e)
     known_addresses = {
         "home": [],
         "depot": []
     }
 
+# Phrases and geofences from addresses.json, compiled once
+known_locations = KnownLocations(known_addresses)
 
-# load towns data
-towns_data_path = Path(__file__).parent.parent.parent / "resources" / "data" / "towns.csv"
-df_towns = pd.read_csv(towns_data_path)
-
-# Clean settlement names: remove bracketed footnotes like [c], [e], etc.
-df_towns["settlement"] = df_towns["settlement"].str.replace(r"\[.*?\]", "", regex=True).str.strip()
-
-# Clean classification field: strip quotes and whitespace
-df_towns["classification"] = df_towns["classification"].str.replace(r"['\"]", "", regex=True).str.strip()
 
-# Define the classification priority mapping
-classification_priority = {
-    "small town": 1,
-    "medium town": 2,
-    "large town": 3,
-    "small village or hamlet": 4,
-    "village": 5,
-    "intermediate settlement": 6
-}
+def set_known_addresses(mapping: dict):
+    """Swap in a new addresses.json-style mapping and recompile the matchers."""
+    global known_addresses, known_locations
+    known_addresses = mapping
+    known_locations = KnownLocations(mapping)
 
-# Normalize and map classifications
-df_towns["classification_lower"] = df_towns["classification"].str.lower().map(classification_priority)
 
-# Drop rows that aren't part of our priority set
-df_cleaned = df_towns.dropna(subset=["classification_lower"])
+def home_address() -> str:
+    """The first text entry under "home" (geofence entries can't be geocoded)."""
+    for entry in known_addresses.get("home", []):
+        if isinstance(entry, str):
+            return entry
+    raise ValueError("No home address configured in addresses.json")
 
-# Build a list of (settlement, priority)
-settlement_priority = sorted(
-    zip(df_cleaned["settlement"], df_cleaned["classification_lower"]),
-    key=lambda x: x[1]  # sort by priority
-)
 
-# ——— UK postcode pattern (very common case) ———
-# Compile postcode regex for NI format (BTxx xxx)
-postcode_re = re.compile(r"\bBT\d{1,2}\s?\d[A-Z]{2}\b", re.IGNORECASE)
-
-# Prepare list of settlements sorted by priority
-ordered_settlements = [s for s, _ in settlement_priority]
-
-def parse_address(dest_str: str) -> Tuple[Optional[str], Optional[str], Optional[str], List[str]]:
-    """
-    Parse an address string and extract street, primary town, postcode, and other candidate towns.
-
-    The primary town is selected based on the global 'ordered_settlements' priority list.
-    Any additional matches are returned as 'other_towns'.
-
-    Args:
-        dest_str (str): The full address string to parse.
-
-    Returns:
-        Tuple containing:
-            - street (Optional[str]): The street component, if detectable.
-            - town (Optional[str]): The highest-priority matched town.
-            - postcode (Optional[str]): The extracted postcode in uppercase, if any.
-            - other_towns (List[str]): Other matched towns, ordered by descending priority.
-    """
-    s = dest_str.strip()
-    postcode: Optional[str] = None
-    street: Optional[str] = None
-    town: Optional[str] = None
-    other_towns: List[str] = []
-
-    # 1) Extract postcode
-    pc_match = postcode_re.search(s)
-    if pc_match:
-        postcode = pc_match.group(0).upper()
-        s = s[:pc_match.start()].rstrip(', ').strip()
-
-    # 2) Split into parts
-    parts = [p.strip() for p in s.split(',') if p.strip()]
-    if not parts:
-        return None, None, postcode, other_towns
-
-    # 3) Find matching settlements
-    raw_matches: List[str] = []
-    for sett in ordered_settlements:
-        # compile a pattern like r'\bMaghera\b'
-        pattern = re.compile(rf"\b{re.escape(sett)}\b", re.IGNORECASE)
-        if any(pattern.search(part) for part in parts):
-            raw_matches.append(sett)
-
-    # Deduplicate while preserving order
-    matches = list(dict.fromkeys(raw_matches))
-
-    if matches:
-        town = matches[0]
-        other_towns = matches[1:]
-        # Determine street as first component before primary town
-        for idx, part in enumerate(parts):
-            if town.lower() in part.lower():
-                if idx > 0:
-                    street = parts[0]
-                break
-    else:
-        # Fallback: use second component as town if available
-        if len(parts) > 1:
-            street, town = parts[0], parts[1]
-        else:
-            street = parts[0]
+# "54.58, -5.86": a destination given as coordinates
+LAT_LON_RE = re.compile(r"^\s*-?\d+(\.\d+)?\s*,\s*-?\d+(\.\d+)?\s*$")
 
-    return street, town, postcode, other_towns
 
 # ─── STEP 5: Pull destination's embedded lat/lon from the full URL ─────────────
 def extract_lat_lon_from_url(full_url):
@@ -165,57 +92,55 @@ def extract_lat_lon_from_url(full_url):
 
 
 # ─── STEP 6: Classify the visit type based on known‐location rules ────────────
-def classify_visit_type(address_string):
-    addr = (address_string or "").lower()
+def classify_visit_type(address_string, lat=None, lon=None):
+    """
+    home > hospital > depot > visit. Known places match on any of their
+    phrases in the address, or on (lat, lon) falling inside one of their
+    geofences; every phrase is checked in a single compiled scan.
+    """
+    matched = known_locations.match(address_string, lat, lon)
 
-    # Check for home
-    if any(home in addr for home in known_addresses.get("home", [])):
-        if "19" in addr:
-            return "home"
+    if "home" in matched:
+        return "home"
 
-    # Check for hospital
-    if "hospital" in addr:
+    if "hospital" in (address_string or "").lower() or "hospital" in matched:
         return "hospital"
 
-    # Check for depot
-    if any(depot in addr for depot in known_addresses.get("depot", [])):
+    if "depot" in matched:
         return "depot"
 
     return "visit"
 
 
 # ─── STEP 7: Get driving‐route distance from OpenRouteService ──────────────────
+def route_backend() -> routing.RoutingBackend:
+    """The backend chosen by ROUTING_BACKEND (public ORS with ORS_API_KEY by default)."""
+    return routing.configured_backend(ORS_API_KEY)
+
+
+def get_route_distance(lat1, lon1, lat2, lon2):
+    legs = get_route_legs([(lat1, lon1), (lat2, lon2)])
+    return legs[0] if legs else None
+
+
+def get_route_legs(points) -> list[float] | None:
+    """
+    Driving distance in miles for each leg between consecutive (lat, lon)
+    points, from one request to the configured routing backend. When every
+    leg is already in geocache.route_cache no request is made.
+    """
+    return routing.route_legs(points, route_backend())
+
+
 def get_route_distance_via_ors(lat1, lon1, lat2, lon2, api_key):
-    url = "https://api.openrouteservice.org/v2/directions/driving-car"
-    headers = {
-        "Authorization": api_key,
-        "Content-Type": "application/json"
-    }
-    body = {
-        "coordinates": [
-            [float(lon1), float(lat1)],
-            [float(lon2), float(lat2)]
-        ]
-    }
+    legs = get_route_legs_via_ors([(lat1, lon1), (lat2, lon2)], api_key)
+    return legs[0] if legs else None
 
-    try:
-        time.sleep(1)  # Rate limit: ORS allows 1 request per second for free tier
-        response = requests.post(url, headers=headers, json=body, timeout=10)
-        if response.status_code != 200:
-            print("❌ ORS API error:", response.status_code)
-            print("Message:", response.text)
-            return None
 
-        data = response.json()
-        # In the v2/directions JSON, distance is under routes[0].summary.distance
-        meters = data["routes"][0]["summary"]["distance"]
-        miles = meters / 1609.344
-        return miles
+def get_route_legs_via_ors(points, api_key) -> list[float] | None:
+    """Legs from the public ORS API whatever ROUTING_BACKEND says."""
+    return routing.route_legs(points, routing.ORSBackend(api_key))
 
-    except Exception as e:
-        print("❌ ORS request failed:", e)
-        return None
-    
 
 def parse_apple_maps_url(url: str):
     parsed = urlparse(url)
@@ -233,40 +158,76 @@ def parse_apple_maps_url(url: str):
 
 
 # ─── CORE FUNCTION: process_maps_link ──────────────────────────────────────────
-def process_maps_link(short_url):
+def _emit(on_progress, stage: str, payload: dict):
+    """Report a pipeline stage to the caller; a failing callback never breaks processing."""
+    if on_progress is None:
+        return
+    try:
+        on_progress(stage, payload)
+    except Exception as e:
+        logger.warning("Progress callback failed at stage %r: %s", stage, e)
+
+
+def resolve_link(short_url) -> dict | None:
     """
-    Given a Google Maps short link, returns a dict with:
-      - origin: { raw, lat, lon, town, postcode }
-      - destination: { raw, lat, lon, town, postcode, visit_type }
-      - distance_miles: float or None
+    Stage 1: expand/parse a Google or Apple Maps link into raw origin and
+    destination strings (plus "stops", every stop after the origin, for
+    multi-stop routes). Returns None for unsupported or unreadable links.
     """
     # 1) Expand the short link
     if short_url.startswith("https://maps.app.goo.gl/"):
-        full_url = expand_google_maps_url(short_url)
+        with stage("expand"):
+            full_url = expand_google_maps_url(short_url)
         if not full_url:
             return None
 
-        # 2) Parse origin + destination strings
-        origin_str, destination_str = extract_addresses_from_gmaps_url(full_url)
+        with stage("parse"):
+            # 2) Multi-stop route: keep every stop, routed together later
+            waypoints = extract_waypoints_from_gmaps_url(full_url)
+            if len(waypoints) > 2:
+                return {"url": short_url, "origin_str": waypoints[0],
+                        "destination_str": waypoints[-1], "stops": waypoints[1:]}
+
+            # 2) Parse origin + destination strings
+            origin_str, destination_str = extract_addresses_from_gmaps_url(full_url)
 
     elif short_url.startswith("https://maps.apple.com/"):
         full_url = short_url  # Apple links aren't usually shortened
-        parsed = parse_apple_maps_url(full_url)
+        with stage("parse"):
+            parsed = parse_apple_maps_url(full_url)
         origin_str = parsed["origin_str"]
         destination_str = parsed["destination_str"]
 
         # Fallback: use latlon if destination_str is missing
         if not destination_str and parsed["latlon"]:
             lat_str, lon_str = parsed["latlon"].split(",")
-            destination_info = reverse_geocode(float(lat_str), float(lon_str))
-            destination_str = destination_info.get("raw", {}).get("road")  # fallback raw text
-        else:
-            destination_info = None  # will be set later via lookup_location
-            
+            with stage("geocode"):
+                destination_info = reverse_geocode(float(lat_str), float(lon_str))
+            raw = (destination_info or {}).get("raw", {})
+            # fallback raw text; without a road (e.g. an offline gazetteer answer) keep the
+            # coordinates themselves, which resolve to this exact point rather than a town centroid
+            destination_str = raw.get("road") or parsed["latlon"]
 
     else:
         return None  # Unsupported link
-    
+
+    return {"url": short_url, "origin_str": origin_str, "destination_str": destination_str}
+
+
+def resolve_origin(origin_str, previous: dict | None = None, target_sheet=None) -> tuple[str, dict | None]:
+    """
+    Stage 2: geocode the origin. Links without an origin start from the
+    previous journey's destination: `previous` (a result dict from earlier in
+    the same batch) if given, else today's last row of target_sheet (the
+    user's sheet; default: the router's default sheet), else home.
+    Returns (origin_str, origin_info).
+    """
+    if not origin_str and previous:
+        dest = Location.from_dict(previous["destination"])
+        origin_str = dest.raw or ", ".join(part for part in (dest.town, dest.postcode) if part)
+        if dest.has_coords:
+            return origin_str, {"lat": dest.lat, "lon": dest.lon, "town": dest.town, "postcode": dest.postcode}
+
     last_url_parsed = None
 
     if not origin_str:
@@ -277,8 +238,8 @@ def process_maps_link(short_url):
         current_day = now.strftime("%d %B %Y")
 
         # 2) Pull all rows and filter to today’s entries
-        #    (requires sheet = connect_to_sheet() in scope)
-        records = sheet.get_all_records()
+        with stage("sheet"):
+            records = (target_sheet if target_sheet is not None else sheet_for()).get_all_records()
         todays = []
         for r in records:
             if r.get("Calendar Day", "").lower() == current_day.lower():
@@ -293,19 +254,20 @@ def process_maps_link(short_url):
             last_url = last.get("Raw URL")
             last_url_parsed = parse_apple_maps_url(last_url)
 
-            if town and postcode:
+            if town or postcode:
             # TODO handle if previous day has a blank destination, defaults to home currently
-                origin_str = f"{town}, {postcode}"
+                # A town alone is enough (offline answers may leave the postcode blank)
+                origin_str = ", ".join(part for part in (town, postcode) if part)
             else:
                 # missing data – fall back to home
-                origin_str = known_addresses["home"][0]
+                origin_str = home_address()
         else:
             # 3b) First journey of the day – start from home
-            origin_str = known_addresses["home"][0]
-
+            origin_str = home_address()
 
     # 3) Geocode origin
-    origin_info = lookup_location(origin_str)
+    with stage("geocode"):
+        origin_info = lookup_location(origin_str)
     
     # handle case where previous destination is somewhere where the intial village
     # can't be forward geocoded but valid lat/lon is available. This could result in
@@ -313,31 +275,48 @@ def process_maps_link(short_url):
     # not match the previous destination post code.
     if last_url_parsed and last_url_parsed.get("latlon"):
         lat_str, lon_str = last_url_parsed["latlon"].split(",")
+        lat, lon = coord(lat_str), coord(lon_str)
 
+        # Compare as numbers: geocoders return floats, the URL gives strings
         coords_differ = (
             origin_info is None or
-            origin_info.get("lat") != lat_str or
-            origin_info.get("lon") != lon_str
+            coord(origin_info.get("lat")) != lat or
+            coord(origin_info.get("lon")) != lon
         )
 
-        if coords_differ:
+        if coords_differ and lat is not None and lon is not None:
             origin_info = {
-                "lat": lat_str,
-                "lon": lon_str,
+                "lat": lat,
+                "lon": lon,
+                "town": town or None,
                 "postcode": postcode or "",
             }
 
+    return origin_str, origin_info
 
+
+def resolve_destination(destination_str) -> tuple[dict, str]:
+    """
+    Stage 3: geocode the destination, reconcile it with what parse_address()
+    finds in the raw string, and classify the visit.
+    Returns (destination_info, visit_type).
+    """
     # 4) Geocode destination (prefer embedded lat/lon if available)
     
     # if dest_lat and dest_lon:
-    destination_info = lookup_location(destination_str)
+    with stage("geocode"):
+        destination_info = lookup_location(destination_str)
 
     if not destination_info:
         destination_info = make_empty_location_dict()
 
-    # check fields against what can be parsed from the dest str
-    parsed_addr, parsed_town, parsed_postcode, other_towns = parse_address(destination_str)
+    # check fields against what can be parsed from the dest str; bare coordinates
+    # have no address in them (parse_address would take the longitude as the town)
+    if LAT_LON_RE.match(destination_str or ""):
+        parsed_addr, parsed_town, parsed_postcode, other_towns = None, None, None, []
+    else:
+        with stage("parse"):
+            parsed_addr, parsed_town, parsed_postcode, other_towns = parse_address(destination_str)
     
     # Trust the parsed address over any forward geocoded options, won't align precisely with 
     # co-ordinates which are only used for distance calculation
@@ -351,59 +330,223 @@ def process_maps_link(short_url):
         if destination_info["raw"].get("road") != parsed_addr:
             destination_info["raw"]["road"] = parsed_addr
         
-    # attempt to get lat and lon again
-    if destination_info["lat"] == '' or destination_info["lon"] == '':
-        towns_only = f"{other_towns}, {parsed_town}" if parsed_town else ""
-        cleaned_towns = towns_only.replace("[", "").replace("]", "").replace("'", "")
-        retry_dest_info = lookup_location(cleaned_towns)
-        destination_info["lat"] = retry_dest_info["lat"]
-        destination_info["lon"] = retry_dest_info["lon"]
+    # attempt to get lat and lon again: the town's centroid from the local
+    # gazetteer if it has it, otherwise one more geocode of the town names
+    if coord(destination_info["lat"]) is None or coord(destination_info["lon"]) is None:
+        with stage("retry"):
+            centroid = next(filter(None, (default_gazetteer().settlement_position(t)
+                                          for t in [parsed_town, *other_towns] if t)), None)
+            if centroid:
+                destination_info["lat"], destination_info["lon"] = centroid
+            else:
+                towns_only = f"{other_towns}, {parsed_town}" if parsed_town else ""
+                cleaned_towns = towns_only.replace("[", "").replace("]", "").replace("'", "")
+                retry_dest_info = lookup_location(cleaned_towns)
+                if retry_dest_info:
+                    destination_info["lat"] = retry_dest_info["lat"]
+                    destination_info["lon"] = retry_dest_info["lon"]
 
     # 5) Classify the visit type
     dest_raw_dict = destination_info.get("raw", {}) if destination_info else {}
-    dest_full_text = " ".join(dest_raw_dict.values()).strip()
-    visit_type = classify_visit_type(dest_full_text)
-
-    # 6) Compute driving‐route distance via ORS
-    distance_miles = None
-    if origin_info and destination_info and ORS_API_KEY:
-        distance_miles = get_route_distance_via_ors(
-            origin_info["lat"],
-            origin_info["lon"],
-            destination_info["lat"],
-            destination_info["lon"],
-            ORS_API_KEY
-        )
+    dest_full_text = " ".join(v for v in dest_raw_dict.values() if isinstance(v, str)).strip()
+    visit_type = classify_visit_type(dest_full_text, destination_info.get("lat"), destination_info.get("lon"))
 
-    # 7) Build the result dict
-    result = {
-        "origin": {
-            "raw":      origin_str,
-            "lat":      origin_info.get("lat")      if origin_info else None,
-            "lon":      origin_info.get("lon")      if origin_info else None,
-            "town":     origin_info.get("town")     if origin_info else None,
-            "postcode": origin_info.get("postcode") if origin_info else None,
-        },
-        "destination": {
-            "raw":       destination_str,
-            "lat":       destination_info.get("lat")      if destination_info else None,
-            "lon":       destination_info.get("lon")      if destination_info else None,
-            "town":      destination_info.get("town")     if destination_info else None,
-            "postcode":  destination_info.get("postcode") if destination_info else None,
-            "visit_type": visit_type,
-        },
-        "distance_miles": distance_miles
-    }
+    return destination_info, visit_type
+
+
+def build_result(origin_str, origin_info, destination_str, destination_info, visit_type) -> dict:
+    """
+    Stage 4: assemble the result dict (no distance yet) and fill missing towns
+    from postcodes. Coordinates come out as floats or None whatever the
+    geocoder returned.
+    """
+    result = Journey(
+        Location.from_dict(origin_info, raw=origin_str, visit_type=None),
+        Location.from_dict(destination_info, raw=destination_str, visit_type=visit_type),
+    ).to_dict()
 
     # Town check
-    if result["origin"]["town"] is None:
-        result["origin"]["town"] = get_town_from_uk_postcode(result["origin"]["postcode"])
-    if result["destination"]["town"] is None:
-        result["destination"]["town"] = get_town_from_uk_postcode(result["destination"]["postcode"])
+    with stage("postcode"):
+        if result["origin"]["town"] is None:
+            result["origin"]["town"] = get_town_from_uk_postcode(result["origin"]["postcode"])
+        if result["destination"]["town"] is None:
+            result["destination"]["town"] = get_town_from_uk_postcode(result["destination"]["postcode"])
+
+    return result
+
+
+def add_route_distance(result: dict, on_progress=None) -> dict:
+    """Stage 5: driving-route distance from the routing backend, with a straight-line estimate reported first."""
+    if result.get("legs"):
+        return add_route_distances(result, on_progress)
+
+    origin, dest = result["origin"], result["destination"]
+    if None not in (origin["lat"], origin["lon"], dest["lat"], dest["lon"]):
+        provisional = estimate_road_distance_miles(origin["lat"], origin["lon"], dest["lat"], dest["lon"])
+        if provisional is not None:
+            _emit(on_progress, "provisional_distance", {**result, "distance_miles": provisional})
 
+        with stage("route"):
+            result["distance_miles"] = get_route_distance(
+                origin["lat"],
+                origin["lon"],
+                dest["lat"],
+                dest["lon"],
+            )
+
+    _emit(on_progress, "distance", result)
     return result
 
 
+def add_route_distances(journey: dict, on_progress=None) -> dict:
+    """Stage 5 for a multi-stop journey: every leg from one routing request."""
+    legs = journey["legs"]
+    points = [legs[0]["origin"]] + [leg["destination"] for leg in legs]
+
+    if all(p["lat"] is not None and p["lon"] is not None for p in points):
+        estimates = [estimate_road_distance_miles(a["lat"], a["lon"], b["lat"], b["lon"])
+                     for a, b in zip(points, points[1:])]
+        if None not in estimates:
+            _emit(on_progress, "provisional_distance", {**journey, "distance_miles": sum(estimates)})
+
+        with stage("route"):
+            miles = get_route_legs([(p["lat"], p["lon"]) for p in points])
+        for leg, leg_miles in zip(legs, miles or [None] * len(legs)):
+            leg["distance_miles"] = leg_miles
+    else:
+        # A stop without coordinates can't be part of the route: do the legs we can
+        for leg in legs:
+            add_route_distance(leg)
+
+    known = [leg["distance_miles"] for leg in legs if leg["distance_miles"] is not None]
+    journey["distance_miles"] = sum(known) if known else None
+    _emit(on_progress, "distance", journey)
+    return journey
+
+
+def build_journey(origin_str, origin_info, stops: list[str], destinations: list[tuple[dict, str]]) -> dict:
+    """
+    Stage 4 for a multi-stop route: one result per leg, each leg starting
+    where the previous one ended. The journey's origin/destination are the
+    first and last stops; "legs" holds the per-leg results.
+    """
+    legs = []
+    for stop_str, (destination_info, visit_type) in zip(stops, destinations):
+        leg = build_result(origin_str, origin_info, stop_str, destination_info, visit_type)
+        legs.append(leg)
+        origin_str, origin_info = stop_str, leg["destination"]
+    return {
+        "origin": legs[0]["origin"],
+        "destination": legs[-1]["destination"],
+        "distance_miles": None,
+        "legs": legs,
+    }
+
+
+def process_maps_link(short_url, on_progress=None, previous: dict | None = None, target_sheet=None):
+    """
+    Given a Google Maps short link, returns a dict with:
+      - origin: { raw, lat, lon, town, postcode }
+      - destination: { raw, lat, lon, town, postcode, visit_type }
+      - distance_miles: float or None
+
+    previous, if given, is the result of the journey just before this one
+    and becomes the origin when the link has none. Otherwise the origin is
+    the last destination logged today in target_sheet (default: the
+    router's default sheet, opened on first use).
+
+    on_progress(stage, payload), if given, is called as results arrive:
+      - "addresses":            { origin, destination } raw strings
+      - "locations":            result dict with towns/postcodes, no distance yet
+      - "provisional_distance": result dict with a straight-line road estimate
+      - "distance":             the final result dict (same object as returned)
+
+    For a multi-stop route the result also has "legs", one result dict per
+    leg, and distance_miles is their total.
+    """
+    link = resolve_link(short_url)
+    if not link:
+        return None
+
+    if link.get("stops"):
+        origin_str, origin_info = resolve_origin(link["origin_str"], previous, target_sheet)
+        _emit(on_progress, "addresses", {"origin": origin_str, "destination": " → ".join(link["stops"])})
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            destinations = list(pool.map(propagate(resolve_destination), link["stops"]))
+        journey = build_journey(origin_str, origin_info, link["stops"], destinations)
+        _emit(on_progress, "locations", journey)
+        return add_route_distances(journey, on_progress)
+
+    destination_str = link["destination_str"]
+    origin_str, origin_info = resolve_origin(link["origin_str"], previous, target_sheet)
+    _emit(on_progress, "addresses", {"origin": origin_str, "destination": destination_str})
+
+    destination_info, visit_type = resolve_destination(destination_str)
+
+    result = build_result(origin_str, origin_info, destination_str, destination_info, visit_type)
+    _emit(on_progress, "locations", result)
+
+    return add_route_distance(result, on_progress)
+
+
+def process_maps_links(urls: list[str], max_workers: int = 4, target_sheet=None) -> list[dict | None]:
+    """
+    Process several links (e.g. one message with a day's journeys) at once.
+
+    Link expansion, destination geocoding and routing run concurrently, with
+    Nominatim and ORS calls still paced by http_client's shared per-provider
+    limiter; origins are chained in the given order, so a link without an
+    origin starts from the previous link's destination. Returns one result (or
+    None for a bad link) per URL, in order.
+    """
+    if not urls:
+        return []
+
+    # Each link logs under its own ID, "<message id>.<n>", whichever thread runs it
+    parent = correlation_id.get()
+
+    def attempt(i, fn, *args):
+        # One bad link must not sink the rest of the batch
+        with correlation(f"{parent}.{i + 1}"):
+            try:
+                return fn(*args)
+            except Exception as e:
+                logger.error("%s failed in batch: %s", fn.__name__, e)
+                return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        links = list(pool.map(lambda i: attempt(i, resolve_link, urls[i]), range(len(urls))))
+        def destination(i):
+            link = links[i]
+            if not link:
+                return None
+            if link.get("stops"):
+                dests = [attempt(i, resolve_destination, stop) for stop in link["stops"]]
+                return None if None in dests else dests
+            return attempt(i, resolve_destination, link["destination_str"])
+
+        destinations = list(pool.map(destination, range(len(links))))
+
+        results: list[dict | None] = []
+        previous = None
+        for i, (link, dest) in enumerate(zip(links, destinations)):
+            origin = attempt(i, resolve_origin, link["origin_str"], previous, target_sheet) if link and dest else None
+            if not origin:
+                results.append(None)
+                continue
+            if link.get("stops"):
+                result = attempt(i, build_journey, *origin, link["stops"], dest)
+            else:
+                result = attempt(i, build_result, *origin, link["destination_str"], *dest)
+            results.append(result)
+            previous = result or previous
+
+        routed = [(i, r) for i, r in enumerate(results) if r]
+        list(pool.map(lambda item: attempt(item[0], add_route_distance, item[1]), routed))
+
+    return results
+
+
 # ─── If run as a script, prompt for input and print output ────────────────────
 if __name__ == "__main__":
     short_url = input("Paste Google Maps short link: ").strip()
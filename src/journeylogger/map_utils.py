@@ -1,11 +1,20 @@
+import logging
 import requests
 import re
 import os
+import math
 from urllib.parse import urlparse, parse_qs
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from pathlib import Path
 import json
+from . import http_client
+from .known_locations import PhraseMatcher
+from .gazetteer import offline_reverse_geocode
+from .postcode_table import offline_town_from_postcode
+from . import geocache
+from .provider_health import run_cascade
+
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 
@@ -14,8 +23,16 @@ ORS_API_KEY = os.getenv("ORS_API_KEY")
 
 # Load known addresses from secrets JSON
 known_addresses_path = Path(__file__).parent / "secrets" / "known_addresses.json"
-with open(known_addresses_path, "r", encoding="utf-8") as f:
-    known_addresses = json.load(f)
+try:
+    with open(known_addresses_path, "r", encoding="utf-8") as f:
+        known_addresses = json.load(f)
+except Exception as e:
+    logger.warning("Failed to load known addresses: %s", e)
+    known_addresses = {}
+
+# One compiled matcher over every known-address key; earlier keys win ties
+known_address_matcher = PhraseMatcher({key: key for key in known_addresses})
+known_address_order = {key.lower().strip(): i for i, key in enumerate(known_addresses)}
 
 def forward_geocode(address: str) -> tuple[float, float] | None:
     """
@@ -37,7 +54,7 @@ def forward_geocode(address: str) -> tuple[float, float] | None:
     }
 
     try:
-        resp = requests.get(url, headers=headers, params=params, timeout=10)
+        resp = http_client.get(url, provider="ors", headers=headers, params=params, timeout=10)
         resp.raise_for_status()
         data = resp.json()
 
@@ -50,7 +67,7 @@ def forward_geocode(address: str) -> tuple[float, float] | None:
         return lat, lon
 
     except requests.RequestException as e:
-        print(f"❌ ORS geocoding error for '{address}':", e)
+        logger.error("ORS geocoding error for %r: %s", address, e)
         return None
 
 # ─── STEP 3a: Forward geocode (address → lat/lon + town + postcode) via Nominatim ─
@@ -72,24 +89,23 @@ def forward_geocode_nominatim(query_text):
 
 
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+        response = http_client.get(url, provider="nominatim", params=params, headers=headers, timeout=10)
 
         # 1) If status_code is not 200, print and return None
         if response.status_code != 200:
-            print(f"❌ Nominatim forward‐geocode HTTP {response.status_code}: {response.text.strip()}")
+            logger.error("Nominatim forward-geocode HTTP %s: %s", response.status_code, response.text.strip()[:200])
             return None
 
         # 2) Attempt to parse JSON
         try:
             data = response.json()
         except ValueError as ve:
-            print("❌ Nominatim forward‐geocode returned invalid JSON:", ve)
-            print("   Raw response body:", response.text[:200])
+            logger.error("Nominatim forward-geocode returned invalid JSON: %s (body: %.200s)", ve, response.text)
             return None
 
         # 3) If the JSON is empty (no results), bail
         if not data:
-            print(f"ℹ️  No forward‐geocode results for '{query_text}'.")
+            logger.info("No forward-geocode results for %r", query_text)
             return None
 
         # 4) Otherwise grab the first result
@@ -101,7 +117,7 @@ def forward_geocode_nominatim(query_text):
             lat_f = float(result["lat"])
             lon_f = float(result["lon"])
         except (KeyError, ValueError) as e:
-            print("❌ Unexpected lat/lon format in Nominatim response:", e)
+            logger.error("Unexpected lat/lon format in Nominatim response: %s", e)
             return None
 
         return {
@@ -113,12 +129,33 @@ def forward_geocode_nominatim(query_text):
         }
 
     except requests.RequestException as e:
-        print("❌ Error in forward geocoding (network issue):", e)
+        logger.error("Forward geocoding failed (network issue): %s", e)
         return None
 
 
 # ─── STEP 3b: Reverse geocode (lat/lon → town + postcode) via Nominatim ────
-def reverse_geocode(lat, lon):
+def reverse_geocode(lat, lon, offline=True):
+    """
+    Town and postcode for a point. Answered from the local gazetteer (no
+    road) when it has a settlement and a postcode or sector close enough,
+    otherwise, or with offline=False, from the geohash cache and Nominatim.
+    """
+    if offline:
+        local = offline_reverse_geocode(lat, lon)
+        if local:
+            return local
+
+    # Nearby points (same geohash cell) share one Nominatim answer
+    cached = geocache.reverse_cache.get(lat, lon)
+    if cached:
+        return cached
+
+    result = reverse_geocode_nominatim(lat, lon)
+    geocache.reverse_cache.put(lat, lon, result)
+    return result
+
+
+def reverse_geocode_nominatim(lat, lon):
     url = "https://nominatim.openstreetmap.org/reverse"
     params = {
         "lat": lat,
@@ -134,25 +171,24 @@ def reverse_geocode(lat, lon):
     }
 
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+        response = http_client.get(url, provider="nominatim", params=params, headers=headers, timeout=10)
 
         # 1) Check HTTP status
         if response.status_code != 200:
-            print(f"❌ Nominatim reverse‐geocode HTTP {response.status_code}: {response.text.strip()}")
+            logger.error("Nominatim reverse-geocode HTTP %s: %s", response.status_code, response.text.strip()[:200])
             return None
 
         # 2) Parse JSON
         try:
             data = response.json()
         except ValueError as ve:
-            print("❌ Nominatim reverse‐geocode returned invalid JSON:", ve)
-            print("   Raw response body:", response.text[:200])
+            logger.error("Nominatim reverse-geocode returned invalid JSON: %s (body: %.200s)", ve, response.text)
             return None
 
         # 3) Extract address field if present
         address = data.get("address", {})
         if not address:
-            print(f"ℹ️  No reverse‐geocode address found for {lat}, {lon}.")
+            logger.info("No reverse-geocode address found for %s, %s", lat, lon)
             return None
 
         # 4) Convert lat/lon to floats
@@ -160,7 +196,7 @@ def reverse_geocode(lat, lon):
             lat_f = float(lat)
             lon_f = float(lon)
         except ValueError:
-            print("❌ Invalid numeric format for lat/lon:", lat, lon)
+            logger.error("Invalid numeric format for lat/lon: %s, %s", lat, lon)
             return None
 
         return {
@@ -172,14 +208,14 @@ def reverse_geocode(lat, lon):
         }
 
     except requests.RequestException as e:
-        print("❌ Error in reverse geocoding (network issue):", e)
+        logger.error("Reverse geocoding failed (network issue): %s", e)
         return None
     
 def geocode_with_photon(address: str):
     """Free forward-geocode via Komoot’s Photon service."""
     url = "https://photon.komoot.io/api/"
     params = {"q": address, "limit": 1}
-    r = requests.get(url, params=params, timeout=5).json()
+    r = http_client.get(url, provider="photon", params=params, timeout=5).json()
     feats = r.get("features")
     if feats:
         lon, lat = feats[0]["geometry"]["coordinates"]
@@ -195,21 +231,65 @@ def extract_from_pb(full_url: str):
         return float(m.group(1)), float(m.group(2))
     return None
 
+# <meta> tags and the end of <head>, scanned on raw bytes as they arrive
+_META_TAG = re.compile(rb"<meta\b[^>]*>", re.IGNORECASE)
+_META_ATTR = re.compile(rb"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+_HEAD_END = re.compile(rb"</head\s*>|<body\b", re.IGNORECASE)
+META_SCAN_LIMIT = 256 * 1024  # give up on a page whose head runs past this
+
+
+def _icbm_coords(content: str):
+    lat, lon = map(float, content.split(","))
+    return lat, lon
+
+
+def _scan_meta(data: bytes, start: int):
+    """(ICBM content or None, head ended?) for tags beginning at or after start."""
+    for tag in _META_TAG.finditer(data, start):
+        attrs = {m.group(1).lower(): m.group(2) or m.group(3) or m.group(4) or b""
+                 for m in _META_ATTR.finditer(tag.group(0))}
+        if attrs.get(b"name", b"").upper() == b"ICBM" and b"content" in attrs:
+            return attrs[b"content"].decode("latin-1"), True
+    return None, bool(_HEAD_END.search(data, start))
+
+
 def scrape_meta_coords(full_url: str):
-    """Scrape <meta name='ICBM'> from Maps’ classic HTML."""
-    r = requests.get(full_url + "&output=classic", timeout=5)
-    soup = BeautifulSoup(r.text, "html.parser")
+    """
+    Scrape <meta name='ICBM'> from Maps’ classic HTML. The body is streamed
+    and scanned as it arrives; reading stops at the tag or the end of <head>.
+    BeautifulSoup only sees the bytes read so far, and only when they
+    mention ICBM but the scan couldn't read the tag.
+    """
+    r = http_client.get(full_url + "&output=classic", provider="google", timeout=5, stream=True)
+    data, start = b"", 0
+    try:
+        for chunk in r.iter_content(chunk_size=8192):
+            data += chunk
+            content, head_done = _scan_meta(data, start)
+            if content:
+                return _icbm_coords(content)
+            if head_done or len(data) >= META_SCAN_LIMIT:
+                break
+            # A tag can't contain "<", so only the last one may still be incomplete
+            start = max(data.rfind(b"<"), start)
+    finally:
+        r.close()
+
+    if b"icbm" not in data.lower():
+        return None
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(data.decode(r.encoding or "utf-8", errors="replace"), "html.parser")
     icbm = soup.find("meta", {"name": "ICBM"})
     if icbm and "content" in icbm.attrs:
-        lat, lon = map(float, icbm["content"].split(","))
-        return lat, lon
+        return _icbm_coords(icbm["content"])
     return None
 
 def geocode_with_geonames(address: str, username: str):
     """Free forward-geocode via GeoNames (requires free signup)."""
     url = "http://api.geonames.org/searchJSON"
     params = {"q": address, "maxRows": 1, "username": username}
-    r = requests.get(url, params=params, timeout=5).json()
+    r = http_client.get(url, provider="geonames", params=params, timeout=5).json()
     gn = r.get("geonames")
     if gn:
         return float(gn[0]["lat"]), float(gn[0]["lng"])
@@ -219,12 +299,10 @@ def lookup_location(value):
     if not value:
         return None
 
-    v = value.lower()
-
     # Check known addresses
-    for key in known_addresses:
-        if key in v:
-            return known_addresses[key]
+    matches = known_address_matcher.find_all(value)
+    if matches:
+        return known_addresses[min(matches, key=lambda k: known_address_order[k.lower().strip()])]
 
     # Regex to match lat,lon (e.g. "54.58, -5.86")
     lat_lon_pattern = r'^\s*-?\d+(\.\d+)?\s*,\s*-?\d+(\.\d+)?\s*$'
@@ -236,14 +314,51 @@ def lookup_location(value):
             except Exception:
                 return None
         else:
-            return forward_geocode_nominatim(value)
+            return geocode_address(value)
     else:
-        return forward_geocode_nominatim(value)
+        return geocode_address(value)
+
+
+def geocode_address(address: str):
+    """
+    Free-text address → location dict from Nominatim, falling back to Photon
+    and then ORS (a provider whose circuit is open or that keeps failing is
+    tried last). Photon/ORS only give coordinates, so their town comes from
+    the offline gazetteer when it covers them.
+    """
+    def from_coords(geocode):
+        def wrapped(text):
+            coords = geocode(text)
+            if not coords:
+                return None
+            lat, lon = map(float, coords)
+            location = offline_reverse_geocode(lat, lon) or make_empty_location_dict()
+            location["lat"], location["lon"] = lat, lon
+            return location
+        return wrapped
+
+    cached = geocache.forward_cache.get(address)
+    if cached:
+        return cached
+
+    result = run_cascade([
+        ("nominatim", forward_geocode_nominatim),
+        ("photon", from_coords(geocode_with_photon)),
+        ("ors", from_coords(forward_geocode)),
+    ], address)
+    geocache.forward_cache.put(address, result)
+    return result
     
-def get_town_from_uk_postcode(postcode):
+def get_town_from_uk_postcode(postcode, offline=True):
+    """District for a postcode: from the local BT table if it knows it, else postcodes.io."""
+    if offline:
+        town = offline_town_from_postcode(postcode)
+        if town:
+            return town
+
     try:
         url = f"https://api.postcodes.io/postcodes/{postcode}"
-        response = requests.get(url)
+        response = http_client.get(url, provider="postcodes_io", timeout=10)
         response.raise_for_status()
         data = response.json()
 
@@ -253,9 +368,27 @@ def get_town_from_uk_postcode(postcode):
         result = data.get("result", {})
         return result.get("admin_district") or result.get("parish") or result.get("admin_ward")
     except Exception as e:
-        print(f"Error fetching town for postcode {postcode}: {e}")
+        logger.error("Error fetching town for postcode %s: %s", postcode, e)
         return None
     
+# Typical ratio of road distance to great-circle distance for NI journeys
+ROAD_CIRCUITY = 1.3
+
+def estimate_road_distance_miles(lat1, lon1, lat2, lon2) -> float | None:
+    """
+    Straight-line (haversine) distance scaled by ROAD_CIRCUITY: an instant,
+    offline approximation of the driving distance in miles.
+    Returns None if any coordinate is missing or not numeric.
+    """
+    try:
+        p1, p2 = math.radians(float(lat1)), math.radians(float(lat2))
+        dl = math.radians(float(lon2) - float(lon1))
+    except (TypeError, ValueError):
+        return None
+    a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    km = 2 * 6371.0088 * math.asin(math.sqrt(a))
+    return km / 1.609344 * ROAD_CIRCUITY
+
 def make_empty_location_dict() -> dict:
     """
     Returns a structured location dictionary with empty strings for all values.
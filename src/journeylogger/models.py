@@ -0,0 +1,216 @@
+# models.py
+"""
+Typed records for locations and journeys.
+
+The pipeline still hands plain dicts to its callers (Telegram replies, sheet
+rows and tests read result["destination"]["town"]), but every result is
+normalised through these classes, and caches keep them instead of dicts:
+  - lat/lon are float or None, never '' or a numeric string
+  - town names are interned, so repeated records share one string
+  - __slots__ keeps each record to a handful of pointers
+
+Codecs: to_json()/from_json() write compact positional JSON; pack()/unpack()
+a binary form of two doubles plus length-prefixed UTF-8 strings.
+"""
+
+import json
+import math
+import struct
+import sys
+from dataclasses import dataclass
+
+_COORDS = struct.Struct("<dd")
+_LENGTH = struct.Struct("<I")
+_COUNT = struct.Struct("<H")
+_DISTANCE = struct.Struct("<d")
+_NONE = 0xFFFFFFFF
+
+# raw is either the text the location was given as, or provider address components
+_RAW_NONE, _RAW_TEXT, _RAW_FIELDS = 0, 1, 2
+
+
+def coord(value) -> float | None:
+    """54.6 / '54.6' → 54.6; None, '', 'nan' or junk → None."""
+    if value is None or value == "":
+        return None
+    try:
+        f = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(f) else f
+
+
+def _intern(s):
+    return sys.intern(s) if isinstance(s, str) else s
+
+
+@dataclass(slots=True)
+class Location:
+    lat: float | None = None
+    lon: float | None = None
+    town: str | None = None
+    postcode: str | None = None
+    raw: str | tuple | None = None      # str, or address components as ((key, value), …)
+    visit_type: str | None = None
+
+    def __post_init__(self):
+        self.lat = coord(self.lat)
+        self.lon = coord(self.lon)
+        self.town = _intern(self.town)
+        self.postcode = _intern(self.postcode)
+        if isinstance(self.raw, dict):
+            self.raw = tuple(self.raw.items())
+
+    @property
+    def has_coords(self) -> bool:
+        return self.lat is not None and self.lon is not None
+
+    @classmethod
+    def from_dict(cls, d: dict | None, **overrides) -> "Location":
+        d = d or {}
+        fields = {
+            "lat": d.get("lat"),
+            "lon": d.get("lon"),
+            "town": d.get("town"),
+            "postcode": d.get("postcode"),
+            "raw": d.get("raw"),
+            "visit_type": d.get("visit_type"),
+        }
+        fields.update(overrides)
+        return cls(**fields)
+
+    def to_dict(self) -> dict:
+        d = {
+            "raw": dict(self.raw) if isinstance(self.raw, tuple) else self.raw,
+            "lat": self.lat,
+            "lon": self.lon,
+            "town": self.town,
+            "postcode": self.postcode,
+        }
+        if self.visit_type is not None:
+            d["visit_type"] = self.visit_type
+        return d
+
+    # ── Codecs ────────────────────────────────────────────────────────────
+
+    def to_json_obj(self) -> list:
+        raw = dict(self.raw) if isinstance(self.raw, tuple) else self.raw
+        return [self.lat, self.lon, self.town, self.postcode, raw, self.visit_type]
+
+    @classmethod
+    def from_json_obj(cls, obj: list) -> "Location":
+        return cls(*obj)
+
+    def pack(self) -> bytes:
+        if isinstance(self.raw, tuple):
+            kind, raw = _RAW_FIELDS, json.dumps(dict(self.raw), separators=(",", ":"))
+        else:
+            kind, raw = (_RAW_NONE, None) if self.raw is None else (_RAW_TEXT, self.raw)
+        nan = math.nan
+        return b"".join((
+            _COORDS.pack(nan if self.lat is None else self.lat, nan if self.lon is None else self.lon),
+            _pack_str(self.town), _pack_str(self.postcode), _pack_str(self.visit_type),
+            bytes((kind,)), _pack_str(raw),
+        ))
+
+    @classmethod
+    def unpack_from(cls, buf, offset: int = 0) -> tuple["Location", int]:
+        lat, lon = _COORDS.unpack_from(buf, offset)
+        offset += _COORDS.size
+        town, offset = _unpack_str(buf, offset)
+        postcode, offset = _unpack_str(buf, offset)
+        visit_type, offset = _unpack_str(buf, offset)
+        kind = buf[offset]
+        raw, offset = _unpack_str(buf, offset + 1)
+        if kind == _RAW_FIELDS:
+            raw = json.loads(raw)
+        return cls(lat, lon, town, postcode, raw, visit_type), offset
+
+
+@dataclass(slots=True)
+class Journey:
+    origin: Location
+    destination: Location
+    distance_miles: float | None = None
+    legs: tuple["Journey", ...] = ()
+
+    def __post_init__(self):
+        self.distance_miles = coord(self.distance_miles)
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Journey":
+        return cls(
+            Location.from_dict(d.get("origin")),
+            Location.from_dict(d.get("destination")),
+            d.get("distance_miles"),
+            tuple(cls.from_dict(leg) for leg in d.get("legs") or ()),
+        )
+
+    def to_dict(self) -> dict:
+        destination = self.destination.to_dict()
+        destination.setdefault("visit_type", None)
+        d = {"origin": self.origin.to_dict(), "destination": destination, "distance_miles": self.distance_miles}
+        if self.legs:
+            d["legs"] = [leg.to_dict() for leg in self.legs]
+        return d
+
+    # ── Codecs ────────────────────────────────────────────────────────────
+
+    def to_json_obj(self) -> list:
+        obj = [self.origin.to_json_obj(), self.destination.to_json_obj(), self.distance_miles]
+        if self.legs:
+            obj.append([leg.to_json_obj() for leg in self.legs])
+        return obj
+
+    @classmethod
+    def from_json_obj(cls, obj: list) -> "Journey":
+        legs = tuple(cls.from_json_obj(leg) for leg in obj[3]) if len(obj) > 3 else ()
+        return cls(Location.from_json_obj(obj[0]), Location.from_json_obj(obj[1]), obj[2], legs)
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_json_obj(), separators=(",", ":"), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text: str) -> "Journey":
+        return cls.from_json_obj(json.loads(text))
+
+    def pack(self) -> bytes:
+        parts = [
+            _DISTANCE.pack(math.nan if self.distance_miles is None else self.distance_miles),
+            self.origin.pack(), self.destination.pack(), _COUNT.pack(len(self.legs)),
+        ]
+        parts.extend(leg.pack() for leg in self.legs)
+        return b"".join(parts)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "Journey":
+        journey, _ = cls.unpack_from(memoryview(data))
+        return journey
+
+    @classmethod
+    def unpack_from(cls, buf, offset: int = 0) -> tuple["Journey", int]:
+        (distance,) = _DISTANCE.unpack_from(buf, offset)
+        origin, offset = Location.unpack_from(buf, offset + _DISTANCE.size)
+        destination, offset = Location.unpack_from(buf, offset)
+        (count,) = _COUNT.unpack_from(buf, offset)
+        offset += _COUNT.size
+        legs = []
+        for _ in range(count):
+            leg, offset = cls.unpack_from(buf, offset)
+            legs.append(leg)
+        return cls(origin, destination, distance, tuple(legs)), offset
+
+
+def _pack_str(s: str | None) -> bytes:
+    if s is None:
+        return _LENGTH.pack(_NONE)
+    data = s.encode("utf-8")
+    return _LENGTH.pack(len(data)) + data
+
+
+def _unpack_str(buf, offset: int) -> tuple[str | None, int]:
+    (n,) = _LENGTH.unpack_from(buf, offset)
+    offset += _LENGTH.size
+    if n == _NONE:
+        return None, offset
+    return bytes(buf[offset:offset + n]).decode("utf-8"), offset + n
@@ -0,0 +1,200 @@
+# postcode_table.py
+"""
+Offline BT postcode → district lookup from resources/data/bt_postcodes.csv.
+
+Rows are keyed by outcode ("BT23") and, once refreshed from a full postcode
+list, by sector ("BT23 5"). Keys are held as one sorted list and searched
+with bisect; a lookup tries the sector first, then the outcode.
+
+Rebuild from a postcode file with district/ward names (postcodes.io or
+Doogal-style CSV: postcode, latitude, longitude, district, ward columns):
+
+    python -m journeylogger.postcode_table --postcodes BT_postcodes.csv
+"""
+
+import argparse
+import csv
+import logging
+import os
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from .gazetteer import postcode_sector, read_rows
+
+logger = logging.getLogger(__name__)
+
+POSTCODE_TABLE_PATH = Path(os.getenv(
+    "JOURNEYLOGGER_POSTCODE_TABLE",
+    Path(__file__).parent.parent.parent / "resources" / "data" / "bt_postcodes.csv",
+))
+
+FIELDS = ["key", "post_town", "admin_district", "ward", "lat", "lon"]
+
+# UK postcode grammar: outward code A9, A99, A9A, AA9, AA99 or AA9A (letters
+# restricted by position), optional space, digit + two inward-code letters
+postcode_re = re.compile(
+    r"\b(?:GIR\s?0AA|[A-PR-UWYZ](?:\d[\dA-HJKPSTUW]?|[A-HK-Y]\d[\dABEHMNPRV-Y]?)\s?\d[ABD-HJLNP-UW-Z]{2})\b",
+    re.IGNORECASE,
+)
+
+
+def outcode(postcode: str) -> str | None:
+    """'bt23 5ab' → 'BT23'; a bare outcode is returned as is."""
+    pc = "".join((postcode or "").split()).upper()
+    if len(pc) >= 5 and pc[-3].isdigit():
+        return pc[:-3]
+    return pc or None
+
+
+class PostcodeTable:
+
+    def __init__(self, rows: list[dict]):
+        rows = sorted(rows, key=lambda r: r["key"])
+        self.keys = [r["key"] for r in rows]
+        self.rows = rows
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "PostcodeTable":
+        return cls(read_rows(path))
+
+    def _get(self, key: str) -> dict | None:
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return self.rows[i]
+        return None
+
+    def lookup(self, postcode: str) -> dict | None:
+        """Most specific row for a full postcode, sector or outcode."""
+        sector = postcode_sector(postcode)
+        return (sector and self._get(sector)) or self._get(outcode(postcode) or "")
+
+    def town(self, postcode: str) -> str | None:
+        """Same precedence as postcodes.io in get_town_from_uk_postcode: district, then ward."""
+        row = self.lookup(postcode)
+        if not row:
+            return None
+        return row.get("admin_district") or row.get("ward") or row.get("post_town") or None
+
+    def __len__(self):
+        return len(self.keys)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_table() -> PostcodeTable:
+    """The shared table, loaded on first use; empty if the file is unavailable."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                try:
+                    _default = PostcodeTable.from_csv(POSTCODE_TABLE_PATH)
+                except Exception as e:
+                    logger.warning("Offline postcode table unavailable (%s): %s", POSTCODE_TABLE_PATH, e)
+                    _default = PostcodeTable([])
+    return _default
+
+
+def offline_town_from_postcode(postcode: str) -> str | None:
+    return default_table().town(postcode)
+
+
+# ─── Refresh ───────────────────────────────────────────────────────────────────
+
+def _column(fields: dict[str, str], *candidates: str) -> str | None:
+    return next((fields[c] for c in candidates if c in fields), None)
+
+
+def read_postcode_records(path: Path, area: str = "BT"):
+    """(postcode, district, ward, lat, lon) for every postcode in `area`."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fields = {name.lower().strip(): name for name in reader.fieldnames or []}
+        pc_col = _column(fields, "pcds", "postcode", "pcd")
+        district_col = _column(fields, "district", "admin_district", "laua_name", "local authority")
+        ward_col = _column(fields, "ward", "admin_ward", "ward_name")
+        lat_col = _column(fields, "latitude", "lat")
+        lon_col = _column(fields, "longitude", "long", "lon", "lng")
+        if not (pc_col and district_col):
+            raise ValueError(f"{path}: need postcode and district columns, found {reader.fieldnames}")
+
+        for row in reader:
+            postcode = (row[pc_col] or "").strip().upper()
+            if not postcode.startswith(area):
+                continue
+            yield (postcode, (row[district_col] or "").strip(), (row.get(ward_col) or "").strip() if ward_col else "",
+                   row.get(lat_col) if lat_col else None, row.get(lon_col) if lon_col else None)
+
+
+def build_rows(records, post_towns: dict[str, str]) -> list[dict]:
+    """Outcode and sector rows: the most common district/ward and the mean position per key."""
+    groups = defaultdict(lambda: {"districts": Counter(), "wards": Counter(), "lat": 0.0, "lon": 0.0, "n": 0})
+    for postcode, district, ward, lat, lon in records:
+        for key in (outcode(postcode), postcode_sector(postcode)):
+            if not key:
+                continue
+            g = groups[key]
+            g["districts"][district] += bool(district)
+            g["wards"][ward] += bool(ward)
+            try:
+                lat_f, lon_f = float(lat), float(lon)
+            except (TypeError, ValueError):
+                continue
+            if -90 <= lat_f <= 90 and lat_f:
+                g["lat"] += lat_f
+                g["lon"] += lon_f
+                g["n"] += 1
+
+    rows = []
+    for key, g in groups.items():
+        district = max(g["districts"], key=g["districts"].get, default="")
+        # Wards are only meaningful at sector level
+        ward = max(g["wards"], key=g["wards"].get, default="") if " " in key else ""
+        rows.append({
+            "key": key,
+            "post_town": post_towns.get(key.split(" ")[0], ""),
+            "admin_district": district,
+            "ward": ward,
+            "lat": round(g["lat"] / g["n"], 5) if g["n"] else "",
+            "lon": round(g["lon"] / g["n"], 5) if g["n"] else "",
+        })
+    return sorted(rows, key=lambda r: r["key"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m journeylogger.postcode_table",
+                                     description="Rebuild the offline BT postcode → district table.")
+    parser.add_argument("--postcodes", type=Path, required=True,
+                        help="CSV with postcode, district and (optionally) ward/latitude/longitude columns")
+    parser.add_argument("--area", default="BT", help="Postcode area to keep (default: BT; '' for the whole UK)")
+    parser.add_argument("--table", type=Path, default=POSTCODE_TABLE_PATH)
+    args = parser.parse_args(argv)
+
+    header, post_towns = [], {}
+    if args.table.exists():
+        with open(args.table, encoding="utf-8") as f:
+            header = [line for line in f if line.startswith("#")]
+        # Post towns aren't in the usual postcode datasets: keep the existing ones
+        post_towns = {r["key"]: r["post_town"] for r in read_rows(args.table) if " " not in r["key"]}
+
+    rows = build_rows(read_postcode_records(args.postcodes, args.area.upper()), post_towns)
+    if not rows:
+        print(f"❌ No {args.area} postcodes found in {args.postcodes}")
+        return 1
+
+    with open(args.table, "w", newline="", encoding="utf-8") as f:
+        f.writelines(header)
+        writer = csv.DictWriter(f, fieldnames=FIELDS, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"✅ Wrote {len(rows)} outcode/sector rows to {args.table}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,125 @@
+# profiling.py
+"""
+Per-stage timing for diagnosing slow links.
+
+The pipeline marks its expensive steps with stage("geocode") etc. Outside
+timing() these blocks cost one ContextVar lookup and record nothing. Inside
+timing(), every stage's calls and wall time are added up, including those
+run on worker threads through log_utils.propagate (multi-stop routes).
+
+    python -m journeylogger --test-url https://maps.app.goo.gl/... [--profile out.pstats] [--profile-top 25]
+
+runs process_maps_link without writing to the sheet, prints a table of
+stages, and can also save cProfile stats (open them with
+`python -m pstats out.pstats` or snakeviz).
+"""
+
+import cProfile
+import contextvars
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+STAGES = ("expand", "parse", "sheet", "geocode", "retry", "route", "postcode")
+
+_timer: contextvars.ContextVar["StageTimer | None"] = contextvars.ContextVar("stage_timer", default=None)
+
+
+class StageTimer:
+    """Calls and seconds per stage name; safe to share between threads."""
+
+    def __init__(self):
+        self.seconds: dict[str, float] = defaultdict(float)
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self.seconds[name] += seconds
+            self.calls[name] += 1
+
+    def rows(self, wall_s: float) -> list[tuple[str, int, float, float]]:
+        """(stage, calls, ms, % of wall time) in pipeline order, then "other" for untimed work."""
+        names = [s for s in STAGES if s in self.calls] + sorted(set(self.calls) - set(STAGES))
+        rows = [(s, self.calls[s], self.seconds[s] * 1000, self.seconds[s] / wall_s * 100 if wall_s else 0.0)
+                for s in names]
+        # Stages on worker threads overlap, so "other" can't go below zero
+        other = max(wall_s - sum(self.seconds.values()), 0.0)
+        rows.append(("other", 0, other * 1000, other / wall_s * 100 if wall_s else 0.0))
+        return rows
+
+
+@contextmanager
+def stage(name: str):
+    """Time the block under `name` when a timing() is active; otherwise do nothing."""
+    timer = _timer.get()
+    if timer is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - start)
+
+
+@contextmanager
+def timing():
+    """Collect stage timings for everything run in this block."""
+    timer = StageTimer()
+    token = _timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _timer.reset(token)
+
+
+def format_stage_table(timer: StageTimer, wall_s: float) -> str:
+    lines = [f"{'stage':<10} {'calls':>5} {'ms':>10} {'%':>6}", "─" * 34]
+    for name, calls, ms, pct in timer.rows(wall_s):
+        lines.append(f"{name:<10} {calls or '':>5} {ms:>10.1f} {pct:>6.1f}")
+    lines.append("─" * 34)
+    lines.append(f"{'total':<10} {'':>5} {wall_s * 1000:>10.1f}")
+    return "\n".join(lines)
+
+
+def profile_link(url: str, profile_path: str | None = None, top: int = 0, sort: str = "cumulative",
+                 out=sys.stdout) -> dict | None:
+    """
+    Process one link with no sheet write and print its stage timings.
+    With profile_path, cProfile stats are saved there; with top, the `top`
+    heaviest functions (by `sort`) are printed as well. cProfile only sees
+    the calling thread, so for multi-stop routes the per-stop geocodes show
+    up in the stage table but not in the profile.
+    """
+    from .map_processor import process_maps_link
+
+    profiler = cProfile.Profile() if profile_path or top else None
+    with timing() as timer:
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            result = process_maps_link(url)
+        finally:
+            if profiler:
+                profiler.disable()
+            wall_s = time.perf_counter() - start
+
+    if result:
+        origin, dest = result["origin"], result["destination"]
+        print(f"✅ {origin.get('town')} {origin.get('postcode')} → {dest.get('town')} {dest.get('postcode')}"
+              f" ({dest.get('visit_type')}): {result.get('distance_miles')} miles", file=out)
+    else:
+        print("❌ Failed to process the link.", file=out)
+    print(format_stage_table(timer, wall_s), file=out)
+
+    if profile_path:
+        profiler.dump_stats(profile_path)
+        print(f"📄 cProfile stats written to {profile_path}", file=out)
+    if top:
+        pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(top)
+    return result
@@ -0,0 +1,166 @@
+# provider_health.py
+"""
+Per-provider health: rolling success rate and latency, a circuit breaker,
+and an ordering helper for fallback cascades.
+
+http_client records every real call here and refuses calls to a provider
+whose breaker is open (raising CircuitOpenError, which providers already
+treat like the network being down). After a cooldown one probe call is let
+through (half-open); success closes the breaker, failure re-opens it.
+
+Cascades keep their fixed preference order (Nominatim first for geocoding:
+it is the only one that returns a town and postcode). A provider only
+moves to the back when its breaker is open or it has been failing; latency
+never reorders it, and in record or replay mode nothing is reordered.
+
+Tuning: PROVIDER_BREAKER_FAILURES (consecutive failures to open, default 5),
+PROVIDER_BREAKER_COOLDOWN_S (default 30), PROVIDER_HEALTH_WINDOW (calls kept
+for the rolling stats, default 50), PROVIDER_MIN_SUCCESS_RATE (below this a
+provider is tried after the healthy ones, default 0.5).
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+import requests
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+FAILURE_THRESHOLD = int(os.getenv("PROVIDER_BREAKER_FAILURES", "5"))
+COOLDOWN_S = float(os.getenv("PROVIDER_BREAKER_COOLDOWN_S", "30"))
+WINDOW = int(os.getenv("PROVIDER_HEALTH_WINDOW", "50"))
+MIN_SUCCESS_RATE = float(os.getenv("PROVIDER_MIN_SUCCESS_RATE", "0.5"))
+
+# Until a provider has this many samples its success rate isn't judged
+MIN_SAMPLES = 3
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of calling a provider whose breaker is open."""
+
+
+class ProviderHealth:
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD,
+                 cooldown_s: float = COOLDOWN_S, window: int = WINDOW, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown_s = cooldown_s
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._samples: deque[tuple[bool, float]] = deque(maxlen=window)
+        self._consecutive_failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self.clock() - self._opened_at >= self.cooldown_s:
+            self._state = HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; in half-open state only one probe at a time."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, ok: bool, latency_s: float):
+        with self._lock:
+            self._samples.append((ok, latency_s))
+            state = self._current_state()
+            if ok:
+                self._consecutive_failures = 0
+                self._state = CLOSED
+            else:
+                self._consecutive_failures += 1
+                if state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                    self._state = OPEN
+                    self._opened_at = self.clock()
+            self._probing = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            n = len(self._samples)
+            ok = sum(1 for success, _ in self._samples if success)
+            latencies = [lat for _, lat in self._samples]
+            return {
+                "provider": self.name,
+                "state": self._current_state(),
+                "calls": n,
+                "success_rate": ok / n if n else None,
+                "mean_latency_s": sum(latencies) / n if n else None,
+            }
+
+    def degraded(self, min_success_rate: float = MIN_SUCCESS_RATE) -> bool:
+        """Breaker open, or a rolling success rate below min_success_rate."""
+        s = self.stats()
+        if s["state"] == OPEN:
+            return True
+        return s["calls"] >= MIN_SAMPLES and s["success_rate"] < min_success_rate
+
+
+class HealthRegistry:
+
+    def __init__(self, **defaults):
+        self.defaults = defaults
+        self._providers: dict[str, ProviderHealth] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> ProviderHealth:
+        with self._lock:
+            if name not in self._providers:
+                self._providers[name] = ProviderHealth(name, **self.defaults)
+            return self._providers[name]
+
+    def order(self, names: list[str]) -> list[str]:
+        """The given order, with degraded providers moved (in order) behind the healthy ones."""
+        degraded = {name for name in names if self.get(name).degraded()}
+        return [n for n in names if n not in degraded] + [n for n in names if n in degraded]
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            providers = list(self._providers.values())
+        return [p.stats() for p in providers]
+
+    def reset(self):
+        with self._lock:
+            self._providers.clear()
+
+
+registry = HealthRegistry()
+
+
+def run_cascade(steps: list[tuple[str, callable]], *args):
+    """
+    Try (provider, fn) steps in the given order, degraded providers last,
+    and return the first truthy result. Exceptions count as "no answer";
+    http_client has already recorded the provider's health. Record and
+    replay runs always use the given order, so a replay asks for exactly the
+    fixtures the recording captured.
+    """
+    from . import http_client  # imports this module
+
+    by_name = dict(steps)
+    names = [name for name, _ in steps]
+    for name in (names if http_client.get_mode() != "live" else registry.order(names)):
+        try:
+            result = by_name[name](*args)
+        except Exception:
+            result = None
+        if result:
+            return result
+    return None
@@ -0,0 +1,196 @@
+# routing.py
+"""
+Driving distances from a configurable routing backend.
+
+ROUTING_BACKEND picks one:
+
+    ors        public OpenRouteService API (default; needs ORS_API_KEY, 1 request/s on the free tier,
+               paced by http_client's shared limiter)
+    ors-local  self-hosted ORS, e.g. the openrouteservice Docker image; no key, no rate limit
+    osrm       OSRM-compatible server, e.g. osrm-routed on an NI extract
+    estimate   straight-line distance × ROAD_CIRCUITY, offline and instant
+
+ROUTING_URL overrides the backend's base URL (defaults: the public ORS API,
+http://localhost:8080/ors and http://localhost:5000). With
+ROUTING_FALLBACK=estimate, a journey whose route can't be fetched gets the
+estimate instead of no distance.
+
+Every backend returns miles per leg between consecutive (lat, lon) points,
+in one request for a whole multi-stop route. Results other than estimates
+go into geocache.route_cache.
+"""
+
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+
+from . import geocache, http_client
+from .map_utils import estimate_road_distance_miles
+
+logger = logging.getLogger(__name__)
+
+METRES_PER_MILE = 1609.344
+
+ROUTING_BACKEND = os.getenv("ROUTING_BACKEND", "ors").lower()
+ROUTING_URL = os.getenv("ROUTING_URL")
+ROUTING_FALLBACK = os.getenv("ROUTING_FALLBACK", "").lower()
+
+
+class RoutingBackend(ABC):
+    """Base class: legs() returns miles per leg, or None when the route can't be had."""
+
+    name = "base"
+    cacheable = True
+
+    @property
+    def ready(self) -> bool:
+        """False when the backend is missing configuration (e.g. an API key)."""
+        return True
+
+    @abstractmethod
+    def legs(self, points: list[tuple]) -> list[float] | None:
+        """Miles for each leg between consecutive (lat, lon) points."""
+
+
+class ORSBackend(RoutingBackend):
+
+    name = "ors"
+
+    def __init__(self, api_key: str | None = None, base_url: str = "https://api.openrouteservice.org",
+                 profile: str = "driving-car", provider: str = "ors"):
+        self.api_key = api_key
+        self.url = f"{base_url.rstrip('/')}/v2/directions/{profile}"
+        self.provider = provider
+
+    @property
+    def ready(self) -> bool:
+        # The public API needs a key; a self-hosted one doesn't
+        return bool(self.api_key) or self.provider != "ors"
+
+    def legs(self, points):
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = self.api_key
+        body = {"coordinates": [[float(lon), float(lat)] for lat, lon in points]}
+
+        try:
+            # Paced by http_client's limiter: "ors" is 1 request/s, "ors-local" unlimited
+            response = http_client.post(self.url, provider=self.provider, headers=headers, json=body, timeout=10)
+            if response.status_code != 200:
+                logger.error("ORS API error %s: %.200s", response.status_code, response.text)
+                return None
+
+            route = response.json()["routes"][0]
+            # In the v2/directions JSON, each leg is a segment; the total is under summary.distance
+            segments = route.get("segments") or []
+            if len(segments) == len(points) - 1:
+                return [seg["distance"] / METRES_PER_MILE for seg in segments]
+            if len(points) == 2:
+                return [route["summary"]["distance"] / METRES_PER_MILE]
+            logger.error("ORS returned %d segments for %d legs", len(segments), len(points) - 1)
+            return None
+
+        except Exception as e:
+            logger.error("ORS request failed: %s", e)
+            return None
+
+
+class OSRMBackend(RoutingBackend):
+
+    name = "osrm"
+
+    def __init__(self, base_url: str = "http://localhost:5000", profile: str = "driving"):
+        self.base_url = base_url.rstrip("/")
+        self.profile = profile
+
+    def legs(self, points):
+        coords = ";".join(f"{float(lon)},{float(lat)}" for lat, lon in points)
+        url = f"{self.base_url}/route/v1/{self.profile}/{coords}"
+        try:
+            response = http_client.get(url, provider="osrm", params={"overview": "false"}, timeout=5)
+            data = response.json()
+            if response.status_code != 200 or data.get("code") != "Ok":
+                logger.error("OSRM error %s: %s", response.status_code, data.get("message") or data.get("code"))
+                return None
+            legs = data["routes"][0]["legs"]
+            if len(legs) != len(points) - 1:
+                logger.error("OSRM returned %d legs for %d", len(legs), len(points) - 1)
+                return None
+            return [leg["distance"] / METRES_PER_MILE for leg in legs]
+        except Exception as e:
+            logger.error("OSRM request failed: %s", e)
+            return None
+
+
+class EstimateBackend(RoutingBackend):
+
+    name = "estimate"
+    cacheable = False  # instant, and not a real route
+
+    def legs(self, points):
+        legs = [estimate_road_distance_miles(a[0], a[1], b[0], b[1]) for a, b in zip(points, points[1:])]
+        return None if None in legs else legs
+
+
+def make_backend(name: str, url: str | None = None, ors_api_key: str | None = None) -> RoutingBackend:
+    """Backend for a ROUTING_BACKEND value."""
+    if name == "ors":
+        return ORSBackend(ors_api_key, **({"base_url": url} if url else {}))
+    if name == "ors-local":
+        return ORSBackend(None, base_url=url or "http://localhost:8080/ors", provider="ors-local")
+    if name == "osrm":
+        return OSRMBackend(url or "http://localhost:5000")
+    if name == "estimate":
+        return EstimateBackend()
+    raise ValueError(f"Unknown ROUTING_BACKEND {name!r}: use ors, ors-local, osrm or estimate")
+
+
+_configured: dict = {}
+_configured_lock = threading.Lock()
+
+
+def configured_backend(ors_api_key: str | None = None) -> RoutingBackend:
+    """The ROUTING_BACKEND / ROUTING_URL backend; the public ORS one uses ors_api_key."""
+    key = (ROUTING_BACKEND, ROUTING_URL, ors_api_key if ROUTING_BACKEND == "ors" else None)
+    with _configured_lock:
+        if key not in _configured:
+            _configured[key] = make_backend(ROUTING_BACKEND, ROUTING_URL, ors_api_key)
+        return _configured[key]
+
+
+def configure(backend: str | None = None, url: str | None = None, fallback: str | None = None):
+    """Switch backend at runtime (tests, benchmarks); settings not given are kept."""
+    global ROUTING_BACKEND, ROUTING_URL, ROUTING_FALLBACK
+    if backend is not None:
+        make_backend(backend.lower(), url)  # fail fast on a bad name
+        ROUTING_BACKEND = backend.lower()
+    if url is not None:
+        ROUTING_URL = url or None
+    if fallback is not None:
+        ROUTING_FALLBACK = fallback.lower()
+
+
+def route_legs(points: list[tuple], backend: RoutingBackend) -> list[float] | None:
+    """
+    Miles per leg between consecutive (lat, lon) points. When every leg is in
+    geocache.route_cache no request is made. A backend that isn't ready (e.g.
+    public ORS without a key) is not asked; like a failed request, that gives
+    None, or the estimate with ROUTING_FALLBACK=estimate.
+    """
+    pairs = list(zip(points, points[1:]))
+    if not pairs:
+        return None
+    cached = [geocache.route_cache.get(a, b) for a, b in pairs]
+    if None not in cached:
+        return cached
+
+    legs = backend.legs(points) if backend.ready else None
+    if legs and backend.cacheable:
+        for (a, b), miles in zip(pairs, legs):
+            geocache.route_cache.put(a, b, miles)
+    if legs is None and ROUTING_FALLBACK == "estimate" and backend.name != "estimate":
+        legs = EstimateBackend().legs(points)
+        if legs:
+            logger.warning("%s route unavailable, using the straight-line estimate", backend.name)
+    return legs
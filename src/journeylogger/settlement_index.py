@@ -0,0 +1,109 @@
+# settlement_index.py
+"""
+Fuzzy settlement lookup for misspelt or oddly spaced town names
+("Newtonards", "Newtown Ards" → "Newtownards").
+
+Names are folded to lowercase letters/digits with spaces removed, cut into
+padded trigrams, and kept in an inverted index. A query only scores the
+names sharing at least one trigram with it; the score is the Dice
+coefficient of the two trigram sets (1.0 = identical after folding). With a
+minimum score only the postings of the query's rarest trigrams are read, so
+a lookup stays cheap as the settlement list grows.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_BRACKETS = re.compile(r"\(.*?\)")
+
+# Decorations in towns.csv names that people never type
+_PREFIXES = ("metropolitan ",)
+_SUFFIXES = (" town", " city", " village")
+
+
+def fold(name: str) -> str:
+    """'Newtown Ards' / "Gibson's Hill" → 'newtownards' / 'gibsonshill'."""
+    return _NON_ALNUM.sub("", (name or "").lower())
+
+
+def trigrams(folded: str) -> set[str]:
+    padded = f"$${folded}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def aliases(settlement: str) -> list[str]:
+    """Spellings a settlement is known by: 'Warrenpoint / Burren' → Warrenpoint, Burren."""
+    found = []
+    for part in _BRACKETS.sub("", settlement).split("/"):
+        part = part.strip()
+        lower = part.lower()
+        for prefix in _PREFIXES:
+            if lower.startswith(prefix):
+                part, lower = part[len(prefix):], lower[len(prefix):]
+        for suffix in _SUFFIXES:
+            if lower.endswith(suffix) and len(lower) > len(suffix) + 3:
+                part, lower = part[:-len(suffix)], lower[:-len(suffix)]
+        if part:
+            found.append(part.strip())
+    return list(dict.fromkeys(found))
+
+
+class FuzzySettlementIndex:
+
+    def __init__(self, settlements: list[str]):
+        """settlements in priority order; on equal scores the earlier one wins."""
+        self.names: list[str] = []        # display name per alias
+        self._grams: list[set[str]] = []
+        self._rank: list[int] = []
+        self._exact: dict[str, int] = {}
+        self._postings: dict[str, list[int]] = defaultdict(list)
+
+        for rank, settlement in enumerate(settlements):
+            for alias in aliases(settlement):
+                key = fold(alias)
+                if len(key) < 3 or key in self._exact:
+                    continue
+                i = len(self.names)
+                self.names.append(alias)
+                self._rank.append(rank)
+                self._exact[key] = i
+                grams = trigrams(key)
+                self._grams.append(grams)
+                for g in grams:
+                    self._postings[g].append(i)
+
+    def match(self, text: str, min_score: float = 0.0) -> tuple[str, float] | None:
+        """(settlement, score) of the best match for text, or None below min_score."""
+        key = fold(text)
+        if len(key) < 3:
+            return None
+        if key in self._exact:
+            return self.names[self._exact[key]], 1.0
+
+        query = trigrams(key)
+        if min_score > 0:
+            # A name scoring min_score shares at least `need` trigrams with the query, so it
+            # holds one of the len(query) - need + 1 rarest; only those postings are read.
+            need = max(1, math.ceil(len(query) * min_score / (2 - min_score) - 1e-9))
+            rare = sorted(query, key=lambda g: len(self._postings.get(g, ())))[:len(query) - need + 1]
+            candidates = {i for g in rare for i in self._postings.get(g, ())}
+            shared = {i: len(query & self._grams[i]) for i in candidates}
+        else:
+            shared = Counter(i for g in query for i in self._postings.get(g, ()))
+        if not shared:
+            return None
+        best, best_key = None, None
+        for i, n in shared.items():
+            score = 2 * n / (len(query) + len(self._grams[i]))
+            candidate_key = (-score, self._rank[i])
+            if best_key is None or candidate_key < best_key:
+                best, best_key = i, candidate_key
+        score = -best_key[0]
+        if score < min_score:
+            return None
+        return self.names[best], round(score, 3)
+
+    def __len__(self):
+        return len(self.names)
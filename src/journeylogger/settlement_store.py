@@ -0,0 +1,265 @@
+# settlement_store.py
+"""
+Settlement names for parse_address(), in a sorted, memory-mapped file.
+
+Names are keyed by their lowercase words ("Gibson's Hill" → "gibson s hill")
+and kept sorted by key bytes, so a lookup is a binary search over fixed-size
+index entries. find_in() looks up runs of words in the text, extending a run
+only while some name starts with it. The cost per address therefore depends
+on its word count and log(N), so it
+barely changes between the ~650 NI settlements and a ~40k UK list. Opening
+a store only maps the file; pages are read as lookups touch them.
+
+File layout (little-endian):
+
+    header   magic "JLSETT01", count u32, max_words u32
+    index    count × (key offset u32, key length u16, name length u16, rank u32), sorted by key
+    strings  key bytes immediately followed by the display name, UTF-8
+
+rank is the settlement's position in priority order (lower wins when an
+address names several settlements).
+
+Without JOURNEYLOGGER_SETTLEMENTS the NI list in resources/data/towns.csv is
+built in memory at start-up. For the whole UK, build a file from GeoNames
+GB.txt or a CSV of place names (NI towns keep their priority at the front):
+
+    python -m journeylogger.settlement_store --places GB.txt -o resources/data/uk_settlements.idx
+"""
+
+import argparse
+import csv
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+TOWNS_PATH = Path(__file__).parent.parent.parent / "resources" / "data" / "towns.csv"
+SETTLEMENTS_PATH = os.getenv("JOURNEYLOGGER_SETTLEMENTS")
+
+MAGIC = b"JLSETT01"
+HEADER = struct.Struct("<8sII")
+ENTRY = struct.Struct("<IHHI")
+
+_WORD = re.compile(r"[^\W_]+")
+
+# towns.csv classifications in priority order; other bands are not matched
+CLASSIFICATION_PRIORITY = {
+    "small town": 1,
+    "medium town": 2,
+    "large town": 3,
+    "small village or hamlet": 4,
+    "village": 5,
+    "intermediate settlement": 6,
+}
+
+
+def settlement_key(text: str) -> str:
+    """'Gibson's Hill' / 'GIBSON'S  HILL' → 'gibson s hill'."""
+    return " ".join(_WORD.findall((text or "").lower()))
+
+
+def build_store(names) -> bytes:
+    """Store bytes for settlement names given in priority order; repeated keys keep the first."""
+    entries: dict[bytes, tuple[int, bytes]] = {}
+    for rank, name in enumerate(names):
+        key = settlement_key(name).encode("utf-8")
+        if key and key not in entries:
+            entries[key] = (rank, name.strip().encode("utf-8"))
+
+    keys = sorted(entries)
+    max_words = max((k.count(b" ") + 1 for k in keys), default=0)
+    offset = HEADER.size + ENTRY.size * len(keys)
+    index, strings = [], []
+    for key in keys:
+        rank, name = entries[key]
+        index.append(ENTRY.pack(offset, len(key), len(name), rank))
+        strings.append(key + name)
+        offset += len(key) + len(name)
+    return b"".join([HEADER.pack(MAGIC, len(keys), max_words), *index, *strings])
+
+
+def write_store(names, path: Path) -> int:
+    """Write a store file atomically; returns the number of settlements."""
+    data = build_store(names)
+    tmp = Path(f"{path}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return HEADER.unpack_from(data)[1]
+
+
+class SettlementStore:
+
+    def __init__(self, buf):
+        """buf: store bytes, or an mmap of a store file."""
+        magic, self.count, self.max_words = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a settlement store")
+        self._buf = buf
+
+    @classmethod
+    def open(cls, path) -> "SettlementStore":
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @classmethod
+    def from_names(cls, names) -> "SettlementStore":
+        return cls(build_store(names))
+
+    def _entry(self, i: int) -> tuple[int, int, int, int]:
+        return ENTRY.unpack_from(self._buf, HEADER.size + i * ENTRY.size)
+
+    def _key(self, i: int) -> bytes:
+        offset, key_len, _, _ = self._entry(i)
+        return self._buf[offset:offset + key_len]
+
+    def _search(self, target: bytes) -> int:
+        """Index of the first key >= target."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _lookup(self, target: bytes) -> tuple[tuple[str, int] | None, bool]:
+        """(hit or None, whether any longer key starts with target's words)."""
+        i = self._search(target)
+        hit = None
+        if i < self.count and self._key(i) == target:
+            offset, key_len, name_len, rank = self._entry(i)
+            hit = self._buf[offset + key_len:offset + key_len + name_len].decode("utf-8"), rank
+            i += 1
+        # Keys extending target sort straight after it
+        longer = i < self.count and self._key(i).startswith(target + b" ")
+        return hit, longer
+
+    def get(self, key: str) -> tuple[str, int] | None:
+        """(display name, rank) for an exact settlement_key(), or None."""
+        return self._lookup(key.encode("utf-8"))[0]
+
+    def find_in(self, text: str) -> list[tuple[str, int]]:
+        """Every (settlement, rank) whose name appears in text as whole words."""
+        words = _WORD.findall(text.lower())
+        found = []
+        for i in range(len(words)):
+            for j in range(i + 1, min(i + self.max_words, len(words)) + 1):
+                hit, longer = self._lookup(" ".join(words[i:j]).encode("utf-8"))
+                if hit:
+                    found.append(hit)
+                if not longer:
+                    break
+        return found
+
+    def names(self) -> list[str]:
+        """Display names in priority order."""
+        ranked = []
+        for i in range(self.count):
+            offset, key_len, name_len, rank = self._entry(i)
+            ranked.append((rank, self._buf[offset + key_len:offset + key_len + name_len].decode("utf-8")))
+        return [name for _, name in sorted(ranked)]
+
+    def close(self):
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+    def __len__(self):
+        return self.count
+
+
+# ─── Sources ───────────────────────────────────────────────────────────────────
+
+def read_towns_csv(path: Path = TOWNS_PATH) -> list[str]:
+    """NI settlements from towns.csv, footnotes stripped, in classification priority order."""
+    ranked = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            classification = re.sub(r"['\"]", "", row.get("classification") or "").strip().lower()
+            priority = CLASSIFICATION_PRIORITY.get(classification)
+            name = re.sub(r"\[.*?\]", "", row.get("settlement") or "").strip()
+            # "Milltown (Aghory)" only disambiguates; addresses say "Milltown", which has its own row
+            if priority is not None and name and "(" not in name:
+                ranked.append((priority, name))
+    return [name for _, name in sorted(ranked, key=lambda x: x[0])]
+
+
+def read_places(path: Path) -> list[str]:
+    """
+    Place names, most populous first, from GeoNames (GB.txt: populated places,
+    feature class P) or a CSV with a name column (name, settlement, place22nm
+    or placename) and optionally population/popcnt.
+    """
+    places = []
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.suffix.lower() == ".txt":
+            # geonameid, name, asciiname, alternatenames, lat, lon, feature class, code, …, population (14)
+            for cols in csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+                if len(cols) > 14 and cols[6] == "P":
+                    places.append((int(cols[14] or 0), cols[1]))
+        else:
+            reader = csv.DictReader(f)
+            fields = {name.lower().strip(): name for name in reader.fieldnames or []}
+            name_col = next((fields[c] for c in ("name", "settlement", "place22nm", "placename") if c in fields), None)
+            pop_col = next((fields[c] for c in ("population", "popcnt") if c in fields), None)
+            if not name_col:
+                raise ValueError(f"{path}: need a name column, found {reader.fieldnames}")
+            for row in reader:
+                try:
+                    population = int(float(row[pop_col])) if pop_col and row[pop_col] else 0
+                except ValueError:
+                    population = 0
+                places.append((population, row[name_col]))
+    places.sort(key=lambda p: -p[0])
+    return [name for _, name in places if name]
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_settlement_store() -> SettlementStore:
+    """JOURNEYLOGGER_SETTLEMENTS if set and readable, else towns.csv built in memory."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                if SETTLEMENTS_PATH:
+                    try:
+                        _default = SettlementStore.open(SETTLEMENTS_PATH)
+                    except Exception as e:
+                        logger.warning("Settlement store unavailable (%s), using towns.csv: %s", SETTLEMENTS_PATH, e)
+                if _default is None:
+                    _default = SettlementStore.from_names(read_towns_csv())
+    return _default
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m journeylogger.settlement_store",
+                                     description="Build a memory-mapped settlement store for parse_address().")
+    parser.add_argument("--places", type=Path, action="append", default=[],
+                        help="GeoNames GB.txt or CSV of place names (repeatable, appended in order)")
+    parser.add_argument("--towns", type=Path, default=TOWNS_PATH, help="NI towns.csv, matched first (default: shipped)")
+    parser.add_argument("--no-towns", action="store_true", help="Leave out towns.csv")
+    parser.add_argument("-o", "--output", type=Path, required=True)
+    args = parser.parse_args(argv)
+
+    names = [] if args.no_towns else read_towns_csv(args.towns)
+    for path in args.places:
+        names.extend(read_places(path))
+    if not names:
+        print("❌ No settlement names to write")
+        return 1
+
+    count = write_store(names, args.output)
+    print(f"✅ Wrote {count} settlements to {args.output}; set JOURNEYLOGGER_SETTLEMENTS={args.output} to use it")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
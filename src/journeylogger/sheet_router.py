@@ -0,0 +1,144 @@
+# sheet_router.py
+"""
+Per-user / per-team target sheets.
+
+secrets/sheets.json (or JOURNEYLOGGER_SHEETS) maps Telegram user ids to a
+team, and each team to a spreadsheet, optionally naming a tab:
+
+    {
+      "default": "<sheet id>",
+      "teams": {
+        "north": "<sheet id>",
+        "south": {"sheet_id": "<sheet id>", "worksheet": "Mileage"}
+      },
+      "users": {"123456789": "north", "987654321": "south"}
+    }
+
+A user may also map straight to a sheet id. Users not listed get
+"default", or GOOGLE_SHEET_ID when the file has none (the old behaviour).
+
+Opened worksheet handles are kept in a bounded LRU pool (SHEET_POOL_SIZE,
+default 32), and all of them share the one authorised gspread client. A new
+driver therefore costs one open_by_key the first time their sheet is used,
+with no new OAuth handshake.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+from cachetools import LRUCache
+
+from .sheet_writer import DEFAULT_SHEET_ID, connect_to_sheet
+
+logger = logging.getLogger(__name__)
+
+SHEETS_PATH = Path(os.getenv("JOURNEYLOGGER_SHEETS", Path(__file__).parent / "secrets" / "sheets.json"))
+POOL_SIZE = int(os.getenv("SHEET_POOL_SIZE", "32"))
+
+Target = tuple[str, str | None]  # (sheet id, worksheet name or None for the first tab)
+
+
+def _target(value) -> Target | None:
+    if isinstance(value, str) and value:
+        return value, None
+    if isinstance(value, dict) and value.get("sheet_id"):
+        return value["sheet_id"], value.get("worksheet")
+    return None
+
+
+class SheetRouter:
+
+    def __init__(self, mapping: dict | None = None, default_sheet_id: str | None = DEFAULT_SHEET_ID,
+                 opener=connect_to_sheet, pool_size: int = POOL_SIZE):
+        mapping = mapping or {}
+        self.teams: dict[str, Target] = {}
+        for name, value in (mapping.get("teams") or {}).items():
+            target = _target(value)
+            if target is None:
+                logger.warning("Ignoring team %r with no sheet_id", name)
+                continue
+            self.teams[name] = target
+        self.users: dict[str, str] = {str(k): v for k, v in (mapping.get("users") or {}).items()}
+        self.default: Target = _target(mapping.get("default")) or (default_sheet_id, None)
+        self.opener = opener
+        self.opens = 0
+        self._pool: LRUCache = LRUCache(maxsize=max(pool_size, 1))
+        self._opening: dict[Target, threading.Lock] = {}  # one lock per target being opened
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: Path = SHEETS_PATH, **kwargs) -> "SheetRouter":
+        """Router for the mapping in path; a missing file routes everyone to the default sheet."""
+        mapping = {}
+        if path.exists():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    mapping = json.load(f)
+            except Exception as e:
+                logger.warning("Failed to load sheet routing from %s: %s", path, e)
+        return cls(mapping, **kwargs)
+
+    def target_for(self, user_id) -> Target:
+        """(sheet id, worksheet) for a Telegram user id."""
+        entry = self.users.get(str(user_id))
+        if entry is not None:
+            target = self.teams.get(entry) if isinstance(entry, str) else None
+            target = target or _target(entry)
+            if target:
+                return target
+            logger.warning("User %s maps to unknown team or sheet %r; using the default sheet", user_id, entry)
+        return self.default
+
+    def sheet_for(self, user_id=None):
+        """
+        The worksheet handle for a user, opened at most once while it stays in
+        the pool. Opening goes over the network, so it holds only that
+        target's lock: a slow sheet never holds up other drivers.
+        """
+        target = self.target_for(user_id) if user_id is not None else self.default
+        with self._lock:
+            handle = self._pool.get(target)
+            if handle is not None:
+                return handle
+            opening = self._opening.setdefault(target, threading.Lock())
+
+        with opening:
+            with self._lock:
+                handle = self._pool.get(target)
+            if handle is not None:
+                return handle  # opened by whoever held the target lock before us
+            try:
+                handle = self.opener(*target)
+            except BaseException:
+                with self._lock:
+                    self._opening.pop(target, None)
+                raise
+            with self._lock:
+                self.opens += 1
+                self._pool[target] = handle
+                self._opening.pop(target, None)
+            return handle
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pool)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_router() -> SheetRouter:
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = SheetRouter.from_file()
+    return _default
+
+
+def sheet_for(user_id=None):
+    return default_router().sheet_for(user_id)
@@ -1,6 +1,9 @@
 # sheet_writer.py
 
 import os
+import re
+import logging
+import threading
 from pathlib import Path
 import gspread
 from datetime import datetime
@@ -8,6 +11,10 @@ from zoneinfo import ZoneInfo
 from oauth2client.service_account import ServiceAccountCredentials
 from dotenv import load_dotenv
 
+from . import http_client
+
+logger = logging.getLogger(__name__)
+
 # ─── Configurable Constants ─────────────────────────────────────────────────────
 
 root = Path(__file__).resolve().parent.parent.parent
@@ -17,25 +24,96 @@ load_dotenv(env_file)
 SERVICE_ACCOUNT_FILE = os.getenv("GOOGLE_SERVICE_ACCOUNT_JSON")
 DEFAULT_SHEET_ID = os.getenv("GOOGLE_SHEET_ID")
 
+SHEET_HEADERS = [
+    "Processed Timestamp",
+    "Calendar Day",
+    "Journey Type",
+    "Origin Town",
+    "Origin Postcode",
+    "Destination Town",
+    "Destination Postcode",
+    "Estimated Mileage (ORS)",
+    "Raw URL",
+    "Notes",
+]
+
+# ─── Offline stand-in for a gspread Worksheet ───────────────────────────────────
+
+class MemorySheet:
+    """
+    In-memory worksheet with the handful of gspread methods the bot uses.
+    Returned by connect_to_sheet() in replay mode so full-pipeline runs and
+    load tests never touch the Sheets API.
+    """
+
+    def __init__(self, rows: list[list[str]] | None = None):
+        self.rows = [list(SHEET_HEADERS)] + [list(r) for r in (rows or [])]
+
+    def append_row(self, row, **kwargs):
+        self.rows.append([str(c) for c in row])
+
+    def append_rows(self, rows, **kwargs):
+        for row in rows:
+            self.append_row(row)
+
+    def get_all_values(self):
+        return [list(r) for r in self.rows]
+
+    def get_all_records(self):
+        headers = self.rows[0]
+        return [dict(zip(headers, r + [""] * (len(headers) - len(r)))) for r in self.rows[1:]]
+
+    @property
+    def row_count(self):
+        return len(self.rows)
+
+    def get_values(self, range_name=None, **kwargs):
+        """Rows of an A1 range such as "A2:J501" (columns are ignored: rows are returned whole)."""
+        if range_name is None:
+            return self.get_all_values()
+        bounds = re.fullmatch(r"[A-Z]+(\d+):[A-Z]+(\d+)", range_name)
+        first, last = int(bounds.group(1)), int(bounds.group(2))
+        return [list(r) for r in self.rows[first - 1:last]]
+
+# One MemorySheet per sheet id (and tab), so every module sees the same rows offline
+_memory_sheets: dict[tuple[str | None, str | None], MemorySheet] = {}
+
 # ─── Setup Connection to Google Sheet ───────────────────────────────────────────
 
-def connect_to_sheet(sheet_id: str = DEFAULT_SHEET_ID):
-    if not os.path.exists(SERVICE_ACCOUNT_FILE):
-        raise FileNotFoundError(f"Service account file not found: {SERVICE_ACCOUNT_FILE}")
+_client = None
+_client_lock = threading.Lock()
 
-    scope = [
-        "https://spreadsheets.google.com/feeds",
-        "https://www.googleapis.com/auth/drive"
-    ]
-    creds = ServiceAccountCredentials.from_json_keyfile_name(SERVICE_ACCOUNT_FILE, scope)
-    client = gspread.authorize(creds)
-    return client.open_by_key(sheet_id).sheet1  # or use .worksheet("Sheet1") for named tabs
+
+def get_client():
+    """The service-account gspread client, authorised once and shared by every sheet."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                if not SERVICE_ACCOUNT_FILE or not os.path.exists(SERVICE_ACCOUNT_FILE):
+                    raise FileNotFoundError(f"Service account file not found: {SERVICE_ACCOUNT_FILE}")
+                scope = [
+                    "https://spreadsheets.google.com/feeds",
+                    "https://www.googleapis.com/auth/drive"
+                ]
+                creds = ServiceAccountCredentials.from_json_keyfile_name(SERVICE_ACCOUNT_FILE, scope)
+                _client = gspread.authorize(creds)
+    return _client
+
+
+def connect_to_sheet(sheet_id: str = DEFAULT_SHEET_ID, worksheet: str | None = None):
+    """The first tab of the spreadsheet, or the tab named `worksheet`."""
+    if http_client.is_replay():
+        return _memory_sheets.setdefault((sheet_id, worksheet), MemorySheet())
+
+    spreadsheet = get_client().open_by_key(sheet_id)
+    return spreadsheet.worksheet(worksheet) if worksheet else spreadsheet.sheet1
 
 # ─── Append a Single Row of Journey Data ────────────────────────────────────────
 
-def append_journey_to_sheet(sheet, result_dict, short_url: str, timestamp: datetime | None = None, note=""):
+def journey_row(result_dict, short_url: str, timestamp: datetime | None = None, note="") -> list:
     """
-    Appends one row to the sheet with structure:
+    Builds one sheet row with structure:
     Processed Timestamp, Calendar Day, Journey Type, Origin Town, Origin Postcode,
     Destination Town, Destination Postcode, Estimated Mileage (ORS), Raw URL, Notes
     """
@@ -49,7 +127,7 @@ def append_journey_to_sheet(sheet, result_dict, short_url: str, timestamp: datet
     processed_str = timestamp.strftime("%d %B %Y, %H:%M %Z")
     calendar_day_str = timestamp.strftime("%d %B %Y")
 
-    row = [
+    return [
         processed_str,                     # Processed Timestamp
         calendar_day_str,                 # Calendar Day
         dest.get("visit_type", ""),       # Journey Type
@@ -62,11 +140,51 @@ def append_journey_to_sheet(sheet, result_dict, short_url: str, timestamp: datet
         note,                               # Notes (can be edited manually later)
     ]
 
+
+def journey_rows(result_dict, short_url: str, timestamp: datetime | None = None, note="") -> list[list]:
+    """One row per leg for a multi-stop journey (noted "Leg i/n"), else the single journey row."""
+    legs = result_dict.get("legs")
+    if not legs:
+        return [journey_row(result_dict, short_url, timestamp=timestamp, note=note)]
+    return [
+        journey_row(leg, short_url, timestamp=timestamp,
+                    note=f"Leg {i}/{len(legs)}" + (f" – {note}" if note else ""))
+        for i, leg in enumerate(legs, start=1)
+    ]
+
+
+def append_journey_to_sheet(sheet, result_dict, short_url: str, timestamp: datetime | None = None, note=""):
+    """Appends one journey row to the sheet (see journey_row for the columns)."""
+    if result_dict.get("legs"):
+        # Multi-stop: every leg in one append_rows call
+        append_journeys_to_sheet(sheet, [(result_dict, short_url)], timestamp=timestamp, note=note)
+        return
+
+    row = journey_row(result_dict, short_url, timestamp=timestamp, note=note)
+
     try:
         sheet.append_row(row)
-        print("✅ Row appended to Google Sheet.")
+        logger.info("Row appended to Google Sheet.")
+    except Exception as e:
+        logger.error("Failed to append to Google Sheet: %s", e)
+
+# ─── Append Several Journeys in One API Call ────────────────────────────────────
+
+def append_journeys_to_sheet(sheet, journeys: list[tuple[dict, str]], timestamp: datetime | None = None, note=""):
+    """
+    Appends one row per (result_dict, short_url) pair, or per leg of a
+    multi-stop journey, with a single append_rows call, keeping the given order.
+    """
+    if not journeys:
+        return
+    timestamp = timestamp or datetime.now(ZoneInfo("Europe/London"))
+    rows = [row for result, url in journeys for row in journey_rows(result, url, timestamp=timestamp, note=note)]
+
+    try:
+        sheet.append_rows(rows)
+        logger.info("%d rows appended to Google Sheet.", len(rows))
     except Exception as e:
-        print("❌ Failed to append to Google Sheet:", e)
+        logger.error("Failed to append to Google Sheet: %s", e)
 
 
 def get_all_records(sheet, header_row: int = 1, default_blank: str = "") -> list[dict]:
@@ -1,18 +1,32 @@
 # src/journeylogger/telegram_bot.py
 import os
+import re
+import asyncio
 import logging
+from functools import partial
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from telegram import Update
-from telegram.ext import ApplicationBuilder, MessageHandler, filters, ContextTypes
+from telegram import Message, Update
+from telegram.error import BadRequest
+from telegram.ext import Application, ApplicationBuilder, BaseUpdateProcessor, MessageHandler, filters, ContextTypes
 
-from .map_processor import process_maps_link
-from .sheet_writer import append_journey_to_sheet, connect_to_sheet
+from .map_processor import process_maps_link, process_maps_links
+from .log_utils import correlation
+from .journey_store import mirror_journeys
+from .sheet_writer import append_journey_to_sheet, append_journeys_to_sheet
+from .sheet_router import sheet_for
+from .warmup import start_warmup
 
-# Initialize once
-sheet = connect_to_sheet()
 logger = logging.getLogger(__name__)
 
+# Links the pipeline understands, wherever they appear in a message
+MAPS_LINK_RE = re.compile(r"https://(?:maps\.app\.goo\.gl|maps\.apple\.com)/[^\s<>\"']*")
+
+
+def extract_maps_links(text: str) -> list[str]:
+    """Every Google/Apple Maps link in a message, in the order they appear."""
+    return [m.group(0).rstrip(".,;:!?)]") for m in MAPS_LINK_RE.finditer(text or "")]
+
 
 def process_and_log_journey(short_url: str, timestamp=None) -> dict:
     """Expands URL, parses it, logs it to the Google Sheet, and returns result dict."""
@@ -25,70 +39,281 @@ def process_and_log_journey(short_url: str, timestamp=None) -> dict:
     if not timestamp:
         timestamp = datetime.now(ZoneInfo("Europe/London"))
 
-    sheet = connect_to_sheet()
-    append_journey_to_sheet(sheet, result, short_url=short_url, timestamp=timestamp)
+    append_journey_to_sheet(sheet_for(), result, short_url=short_url, timestamp=timestamp)
 
     return result
 
+def format_journey_reply(result: dict, timestamp_str: str) -> str:
+    """The final reply: origin, destination and mileage for one journey."""
+    origin = result["origin"]
+    dest = result["destination"]
+
+    parts = [
+        f"🕑 Processed: {timestamp_str}",
+        "",
+        f"🏠 Origin:",
+        f"   • Town:     {origin.get('town', 'N/A')}",
+        f"   • Postcode: {origin.get('postcode', 'N/A')}",
+        f"   • Lat/Lon:  {origin.get('lat', 'N/A')}, {origin.get('lon', 'N/A')}",
+        "",
+        f"📍 Destination:",
+        f"   • Town:       {dest.get('town', 'N/A')}",
+        f"   • Postcode:   {dest.get('postcode', 'N/A')}",
+        f"   • Lat/Lon:    {dest.get('lat', 'N/A')}, {dest.get('lon', 'N/A')}",
+        f"   • Visit Type: {dest.get('visit_type', 'N/A')}",
+    ]
+
+    # Multi-stop route: one line per leg
+    legs = result.get("legs") or []
+    if legs:
+        parts += ["", f"🧭 {len(legs)} legs:"]
+        for i, leg in enumerate(legs, start=1):
+            miles = leg.get("distance_miles")
+            parts.append(
+                f"   {i}. {leg['origin'].get('town') or 'N/A'} → {leg['destination'].get('town') or 'N/A'} "
+                f"({leg['destination'].get('visit_type', 'visit')}) — {f'{miles:.2f} mi' if miles is not None else '? mi'}"
+            )
+
+    # Include the estimated miles if available
+    if result.get("distance_miles") is not None:
+        parts.append(f"\n🛣️ Estimated Road Distance: {result['distance_miles']:.2f} miles")
+
+    return "\n".join(parts)
+
+
+def format_batch_reply(results: list[dict | None], urls: list[str], timestamp_str: str) -> str:
+    """One combined reply for a multi-link message: a line per journey plus the total."""
+    lines = [f"🕑 Processed: {timestamp_str}", f"🧾 {len(urls)} journeys:", ""]
+    total = 0.0
+    for i, (result, url) in enumerate(zip(results, urls), start=1):
+        if not result:
+            lines.append(f"{i}. ❌ Could not process {url}")
+            continue
+        origin, dest = result["origin"], result["destination"]
+        miles = result.get("distance_miles")
+        total += miles or 0.0
+        mileage = f"{miles:.2f} mi" if miles is not None else "? mi"
+        stops = f", {len(result['legs'])} legs" if result.get("legs") else ""
+        lines.append(
+            f"{i}. {origin.get('town') or 'N/A'} → {dest.get('town') or 'N/A'} "
+            f"({dest.get('visit_type', 'visit')}{stops}) — {mileage}"
+        )
+    lines.append(f"\n🛣️ Total Estimated Road Distance: {total:.2f} miles")
+    return "\n".join(lines)
+
+
+def format_progress(stage: str, payload: dict) -> str | None:
+    """Interim text for a process_maps_link() stage, or None to leave the message as is."""
+    if stage == "addresses":
+        return (
+            "⏳ Processing…\n\n"
+            f"🏠 From: {payload.get('origin') or 'previous destination / home'}\n"
+            f"📍 To:   {payload.get('destination') or 'N/A'}"
+        )
+    if stage in ("locations", "provisional_distance"):
+        origin, dest = payload["origin"], payload["destination"]
+        text = (
+            "⏳ Processing…\n\n"
+            f"🏠 Origin:      {origin.get('town') or 'N/A'}, {origin.get('postcode') or 'N/A'}\n"
+            f"📍 Destination: {dest.get('town') or 'N/A'}, {dest.get('postcode') or 'N/A'} "
+            f"({dest.get('visit_type', 'visit')})"
+        )
+        if stage == "provisional_distance":
+            text += f"\n\n🛣️ ~{payload['distance_miles']:.1f} miles (provisional, confirming route…)"
+        return text
+    return None
+
+
+class ProgressMessage:
+    """
+    Edits one bot message in place as pipeline stages complete.
+    Edits may be requested from a worker thread; they are applied in order on
+    the event loop, and stale or unchanged texts are skipped.
+    """
+
+    def __init__(self, message: Message, loop: asyncio.AbstractEventLoop):
+        self.message = message
+        self.loop = loop
+        self._lock = asyncio.Lock()
+        self._seq = 0
+        self._shown_seq = 0
+        self._shown_text = message.text
+
+    def push(self, text: str):
+        """Thread-safe: schedule an edit without waiting for it."""
+        self._seq += 1
+        asyncio.run_coroutine_threadsafe(self._edit(self._seq, text), self.loop)
+
+    async def finish(self, text: str):
+        """Apply the final text, superseding any interim edit still in flight."""
+        self._seq += 1
+        await self._edit(self._seq, text)
+
+    async def _edit(self, seq: int, text: str):
+        async with self._lock:
+            if seq <= self._shown_seq or text == self._shown_text:
+                return
+            try:
+                await self.message.edit_text(text)
+            except BadRequest as e:
+                logger.debug("Skipped progress edit: %s", e)
+                return
+            self._shown_seq, self._shown_text = seq, text
+
+
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    # Everything logged for this message, on any thread, carries one correlation ID
+    with correlation(f"{update.message.chat_id}-{update.message.message_id}"):
+        await _handle_message(update)
+
+
+async def _handle_message(update: Update):
     user = update.message.from_user
     username = user.username
     user_id = user.id
     text = update.message.text.strip()
-    # await update.message.reply_text(f"🔍 Normalized link:\n{text}")
 
-    # Only process if it “looks like” a maps.app.goo.gl URL
-    if text.startswith("https://maps"):
-        # 1) Record current time in Europe/London
-        now_london = datetime.now(ZoneInfo("Europe/London"))
-        timestamp_str = now_london.strftime("%d %B %Y, %H:%M %Z")
+    # Only process messages containing maps.app.goo.gl / maps.apple.com links
+    links = extract_maps_links(text)
+    if not links:
+        await update.message.reply_text("Please send a maps.app.goo.gl link.")
+        return
+    if len(links) > 1:
+        await handle_batch(update, links)
+        return
+    text = links[0]
+
+    # 1) Acknowledge straight away, then edit that message as stages complete
+    ack = await update.message.reply_text("Got your link—processing…")
+    progress = ProgressMessage(ack, asyncio.get_running_loop())
 
-        await update.message.reply_text("Got your link—processing…")
+    def on_progress(stage, payload):
+        # Runs on the worker thread: render now, before later stages mutate payload
+        interim = format_progress(stage, payload)
+        if interim:
+            progress.push(interim)
 
-        try:
-            result = process_maps_link(text)
-        except Exception as e:
-            logger.error("Error processing link %s: %s from user %s: %s", text, e, username, user_id)
-            await update.message.reply_text(f"❌ Error processing link: {e}")
+    try:
+        # The driver's own sheet (pooled handle): today's last row there is the default origin
+        user_sheet = await asyncio.to_thread(sheet_for, user_id)
+        result = await asyncio.to_thread(process_maps_link, text, on_progress, None, user_sheet)
+        if not result:
+            raise ValueError("unsupported or unreadable maps link")
+    except Exception as e:
+        logger.error("Error processing link %s: %s from user %s: %s", text, e, username, user_id)
+        await progress.finish(f"❌ Error processing link: {e}")
+        return
+
+    # 2) Final reply replaces the interim text
+    now_london = datetime.now(ZoneInfo("Europe/London"))
+    timestamp_str = now_london.strftime("%d %B %Y, %H:%M %Z")
+    await progress.finish(format_journey_reply(result, timestamp_str))
+
+    # 3) Append to Google Sheet, once per journey
+    try:
+        await asyncio.to_thread(append_journey_to_sheet, user_sheet, result, short_url=text, timestamp=now_london)
+    except Exception as e:
+        await update.message.reply_text(f"⚠️ Failed to write to sheet: {e}")
+    await asyncio.to_thread(mirror_journeys, [(result, text)], now_london, user=user_id)
+
+
+async def handle_batch(update: Update, links: list[str]):
+    """Several links in one message: process concurrently, one sheet append, one reply."""
+    user = update.message.from_user
+    ack = await update.message.reply_text(f"Got {len(links)} links—processing…")
+    progress = ProgressMessage(ack, asyncio.get_running_loop())
+
+    try:
+        user_sheet = await asyncio.to_thread(sheet_for, user.id)
+        results = await asyncio.to_thread(process_maps_links, links, 4, user_sheet)
+    except Exception as e:
+        logger.error("Error processing %d links from user %s: %s", len(links), user.id, e)
+        await progress.finish(f"❌ Error processing links: {e}")
+        return
+
+    now_london = datetime.now(ZoneInfo("Europe/London"))
+    timestamp_str = now_london.strftime("%d %B %Y, %H:%M %Z")
+    await progress.finish(format_batch_reply(results, links, timestamp_str))
+
+    journeys = [(result, url) for result, url in zip(results, links) if result]
+    try:
+        await asyncio.to_thread(append_journeys_to_sheet, user_sheet, journeys, timestamp=now_london)
+    except Exception as e:
+        await update.message.reply_text(f"⚠️ Failed to write to sheet: {e}")
+    await asyncio.to_thread(mirror_journeys, journeys, now_london, user=user.id)
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Processes updates from different chats concurrently while keeping each
+    chat's updates in arrival order, so one driver's journeys still chain
+    origin → destination correctly.
+    """
+
+    def __init__(self, max_concurrent_updates: int = 32):
+        super().__init__(max_concurrent_updates)
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._waiting: dict[int, int] = {}
+
+    async def do_process_update(self, update, coroutine):
+        chat = update.effective_chat if isinstance(update, Update) else None
+        if chat is None:
+            await coroutine
             return
-        
-        # Append to Google Sheet
-        now_london = datetime.now(ZoneInfo("Europe/London"))
+
+        lock = self._locks.setdefault(chat.id, asyncio.Lock())
+        self._waiting[chat.id] = self._waiting.get(chat.id, 0) + 1
         try:
-            append_journey_to_sheet(sheet, result, short_url=text, timestamp=now_london)
-        except Exception as e:
-            await update.message.reply_text(f"⚠️ Failed to write to sheet: {e}")
-
-        # 2) Build a reply text from result
-        origin = result["origin"]
-        dest = result["destination"]
-
-        parts = [
-            f"🕑 Processed: {timestamp_str}",
-            "",
-            f"🏠 Origin:",
-            f"   • Town:     {origin.get('town', 'N/A')}",
-            f"   • Postcode: {origin.get('postcode', 'N/A')}",
-            f"   • Lat/Lon:  {origin.get('lat', 'N/A')}, {origin.get('lon', 'N/A')}",
-            "",
-            f"📍 Destination:",
-            f"   • Town:       {dest.get('town', 'N/A')}",
-            f"   • Postcode:   {dest.get('postcode', 'N/A')}",
-            f"   • Lat/Lon:    {dest.get('lat', 'N/A')}, {dest.get('lon', 'N/A')}",
-            f"   • Visit Type: {dest.get('visit_type', 'N/A')}",
-        ]
-
-        # 3) Include the estimated miles if available
-        if result.get("distance_miles") is not None:
-            parts.append(f"\n🛣️ Estimated Road Distance: {result['distance_miles']:.2f} miles")
-
-        reply = "\n".join(parts)
-        await update.message.reply_text(reply)
-    else:
-        await update.message.reply_text("Please send a maps.app.goo.gl link.")
+            async with lock:
+                await coroutine
+        finally:
+            self._waiting[chat.id] -= 1
+            if not self._waiting[chat.id]:
+                del self._waiting[chat.id]
+                del self._locks[chat.id]
+
+    async def initialize(self):
+        pass
 
-def start_bot(token: str):
-    app = ApplicationBuilder().token(token).build()
+    async def shutdown(self):
+        pass
+
+async def _start_warmup(app: Application):
+    # Only the first webhook worker warms up; see webhook_server._worker
+    if app.bot_data.get("warm_caches", True):
+        start_warmup()
+
+def build_application(token: str, base_url: str | None = None) -> Application:
+    """
+    Builds the bot Application with its handlers registered.
+    base_url points the bot at a different Bot API server, e.g. the local
+    fake used by the load tests (default: https://api.telegram.org/bot).
+    """
+    builder = (ApplicationBuilder().token(token)
+               .concurrent_updates(ChatOrderedUpdateProcessor())
+               .post_init(_start_warmup))
+    if base_url:
+        builder = builder.base_url(base_url)
+    app = builder.build()
     app.add_handler(MessageHandler(filters.TEXT & (~filters.COMMAND), handle_message))
+    return app
+
+def start_bot(token: str, base_url: str | None = None, webhook_url: str | None = None,
+              listen: str = "0.0.0.0", port: int = 8443, secret_token: str | None = None, workers: int = 1):
+    """
+    Runs the bot with long polling, or with an embedded webhook server when
+    webhook_url (the public HTTPS URL Telegram should POST to) is given.
+    """
+    if webhook_url:
+        from .webhook_server import serve_webhook
+
+        logger.info("Bot is running (webhook, %d worker(s))…", workers)
+        serve_webhook(
+            partial(build_application, base_url=base_url), token, webhook_url,
+            workers=workers, listen=listen, port=port, secret_token=secret_token,
+        )
+        return
+
+    app = build_application(token, base_url=base_url)
     logger.info("Bot is running…")
     app.run_polling()
@@ -0,0 +1,101 @@
+# warmup.py
+"""
+Background cache warm-up after the bot starts.
+
+1. Geocode every text entry in addresses.json (home, depots, …), so the
+   first journey of the day doesn't wait on the home address.
+2. Take the most frequent origin → destination pairs of stored coordinates
+   from the local journey store and route them, filling geocache.route_cache
+   with exactly the cells live journeys between those points look up.
+   Journeys without coordinates (sheet imports, failed geocodes) are left
+   out: a town centroid rarely shares a cache cell with a real address.
+
+Provider calls go through http_client's shared per-provider rate limiter,
+the same one live messages use, so the warm-up never pushes Nominatim or
+ORS past their limits; live messages are never blocked for more than one
+slot. Only one webhook worker warms up, and the warm-up is skipped in
+replay mode, where there is nothing to warm. Turn it off with
+CACHE_WARMUP=0.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from . import geocache, http_client
+from .map_utils import lookup_location
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ENABLED = os.getenv("CACHE_WARMUP", "1").lower() not in ("0", "false", "no")
+TOP_PAIRS = int(os.getenv("CACHE_WARMUP_PAIRS", "30"))
+
+COORDS = ["origin_lat", "origin_lon", "destination_lat", "destination_lon"]
+
+
+def known_address_texts(known: dict | None = None) -> list[str]:
+    """Text entries of an addresses.json mapping, de-duplicated, in file order."""
+    if known is None:
+        from .map_processor import known_addresses as known
+    return list(dict.fromkeys(entry for entries in known.values() for entry in entries if isinstance(entry, str)))
+
+
+def frequent_pairs(store=None, top: int = TOP_PAIRS) -> list[tuple]:
+    """The `top` most common ((lat, lon), (lat, lon)) journeys in the store with both ends' coordinates."""
+    if store is None or not len(store):
+        return []
+    df = store.frame()[COORDS].dropna()
+    grouped = (df.groupby(COORDS)
+                 .size()
+                 .sort_values(ascending=False, kind="stable")
+                 .head(top))
+    return [((o_lat, o_lon), (d_lat, d_lon)) for o_lat, o_lon, d_lat, d_lon in grouped.index]
+
+
+def warm_caches(known: dict | None = None, store=None, top: int = TOP_PAIRS,
+                stop: threading.Event | None = None) -> dict:
+    """Run the warm-up (blocking). Returns counts of what was resolved."""
+    from . import map_processor
+
+    stop = stop or threading.Event()
+    started = time.perf_counter()
+    stats = {"addresses": 0, "pairs": 0, "routes": 0}
+
+    for text in known_address_texts(known):
+        if stop.is_set():
+            break
+        if geocache.forward_cache.get(text) or lookup_location(text):
+            stats["addresses"] += 1
+
+    backend = map_processor.route_backend()
+    if backend.ready and backend.cacheable:
+        for (o_lat, o_lon), (d_lat, d_lon) in frequent_pairs(store, top):
+            if stop.is_set():
+                break
+            stats["pairs"] += 1
+            if map_processor.get_route_distance(o_lat, o_lon, d_lat, d_lon) is not None:
+                stats["routes"] += 1
+
+    stats["seconds"] = round(time.perf_counter() - started, 1)
+    return stats
+
+
+def _run(stop: threading.Event):
+    from .journey_store import default_store
+
+    try:
+        stats = warm_caches(store=default_store(), stop=stop)
+        logger.info("Cache warm-up done: %(addresses)d known addresses, %(pairs)d frequent pairs, "
+                    "%(routes)d routes in %(seconds)ss", stats)
+    except Exception as e:
+        logger.warning("Cache warm-up failed: %s", e)
+
+
+def start_warmup(stop: threading.Event | None = None) -> threading.Thread | None:
+    """Start the warm-up on a daemon thread; None when disabled or replaying."""
+    if not WARMUP_ENABLED or http_client.is_replay():
+        return None
+    thread = threading.Thread(target=_run, args=(stop or threading.Event(),), name="cache-warmup", daemon=True)
+    thread.start()
+    return thread
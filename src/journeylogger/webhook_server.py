@@ -0,0 +1,185 @@
+# webhook_server.py
+"""
+Embedded asyncio HTTP server receiving Telegram webhook updates.
+
+Telegram POSTs each Update as JSON to the public webhook URL; we check the
+X-Telegram-Bot-Api-Secret-Token header, decode the Update and hand it to the
+Application's update_queue. Several worker processes can listen on the same
+port (SO_REUSEPORT) behind one webhook endpoint; only the first one registers
+the webhook with Telegram. The kernel picks a worker per connection, not per
+chat, so a chat's messages are handled in order only within one worker.
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+import multiprocessing
+import signal
+from urllib.parse import urlparse
+
+from telegram import Update
+from telegram.ext import Application
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "x-telegram-bot-api-secret-token"
+MAX_BODY_BYTES = 1_000_000
+
+_REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+            405: "Method Not Allowed", 413: "Payload Too Large"}
+
+
+class WebhookServer:
+    """Minimal HTTP/1.1 keep-alive server feeding webhook Updates to an Application."""
+
+    def __init__(self, app: Application, url_path: str = "/telegram", secret_token: str | None = None):
+        self.app = app
+        self.url_path = "/" + url_path.strip("/")
+        self.secret_token = secret_token
+        self.server: asyncio.AbstractServer | None = None
+
+    async def start(self, listen: str = "0.0.0.0", port: int = 8443, reuse_port: bool = False):
+        self.server = await asyncio.start_server(self.handle, listen, port, reuse_port=reuse_port or None)
+        return self.server
+
+    @property
+    def port(self) -> int:
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status = await self.dispatch(method, path, headers, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, close=not keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method: str, path: str, headers: dict, body: bytes) -> int:
+        path = path.split("?", 1)[0]
+        if method == "GET" and path == "/healthz":
+            return 200
+        if path != self.url_path:
+            return 404
+        if method != "POST":
+            return 405
+        if self.secret_token and not hmac.compare_digest(
+            headers.get(SECRET_HEADER, "").encode(), self.secret_token.encode()
+        ):
+            logger.warning("Rejected webhook call with missing/invalid secret token")
+            return 403
+        try:
+            update = Update.de_json(json.loads(body), self.app.bot)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.error("Invalid webhook payload: %s", e)
+            return 400
+        await self.app.update_queue.put(update)
+        return 200
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, close: bool = False):
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+            f"Content-Length: 0\r\n"
+            f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n".encode("latin-1")
+        )
+        await writer.drain()
+
+
+async def run_webhook(app: Application, webhook_url: str, listen: str = "0.0.0.0", port: int = 8443,
+                      url_path: str | None = None, secret_token: str | None = None,
+                      set_webhook: bool = True, reuse_port: bool = False):
+    """Serve one Application from the webhook until SIGINT/SIGTERM."""
+    url_path = url_path or urlparse(webhook_url).path or "/"
+    webhook = WebhookServer(app, url_path=url_path, secret_token=secret_token)
+
+    async with app:
+        if set_webhook:
+            await app.bot.set_webhook(url=webhook_url, secret_token=secret_token,
+                                      allowed_updates=Update.ALL_TYPES)
+        if app.post_init:  # PTB only calls it from run_polling/run_webhook
+            await app.post_init(app)
+        await app.start()
+        await webhook.start(listen, port, reuse_port=reuse_port)
+        logger.info("Webhook listening on %s:%s%s", listen, port, webhook.url_path)
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        try:
+            await stop.wait()
+        finally:
+            await webhook.stop()
+            await app.stop()
+
+
+def _worker(build_app, token: str, index: int, **kwargs):
+    app = build_app(token)
+    app.bot_data["warm_caches"] = index == 0  # one warm-up, not one per worker
+    asyncio.run(run_webhook(app, set_webhook=index == 0, **kwargs))
+
+
+def serve_webhook(build_app, token: str, webhook_url: str, workers: int = 1, **kwargs):
+    """
+    Run `workers` processes, each with its own Application built by
+    build_app(token), all listening on the same port via SO_REUSEPORT.
+
+    Per-chat ordering (ChatOrderedUpdateProcessor) only holds within one
+    worker: with workers > 1, two messages from the same chat can land in
+    different processes and finish in either order.
+    """
+    if workers <= 1:
+        asyncio.run(run_webhook(build_app(token), webhook_url, **kwargs))
+        return
+
+    logger.warning("Running %d webhook workers: messages from one chat may be processed out of order "
+                   "across workers; use --workers 1 if journeys must chain in the order they were sent",
+                   workers)
+
+    procs = [
+        multiprocessing.Process(
+            target=_worker,
+            args=(build_app, token, i),
+            kwargs={"webhook_url": webhook_url, "reuse_port": True, **kwargs},
+            name=f"journeylogger-webhook-{i}",
+        )
+        for i in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    logger.info("Started %d webhook workers", workers)
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.join()
@@ -0,0 +1,49 @@
+"""
+Shared set-up for the provider integration tests (map_processor, gmaps_utils,
+Apple Maps links).
+
+They run in JOURNEYLOGGER_HTTP_MODE (default replay). In replay mode they
+are skipped until real responses have been recorded into the fixture store:
+run them once with JOURNEYLOGGER_HTTP_MODE=record against the live providers.
+"""
+
+import os
+import unittest
+from pathlib import Path
+
+from journeylogger import http_client, map_processor
+
+MODE = os.getenv("JOURNEYLOGGER_HTTP_MODE", "replay").lower()
+FIXTURE_DIR = Path(os.getenv("JOURNEYLOGGER_FIXTURES", http_client.DEFAULT_FIXTURE_DIR))
+
+
+def has_recordings(directory: Path = FIXTURE_DIR) -> bool:
+    return any(directory.glob("*/*.json"))
+
+
+class ProviderTestCase(unittest.TestCase):
+    """
+    Switches http_client to MODE for the class and restores it afterwards.
+    Set known_addresses to give the pipeline a fixed home/depot mapping.
+    """
+
+    known_addresses: dict | None = None
+
+    @classmethod
+    def setUpClass(cls):
+        if MODE == "replay" and not has_recordings():
+            raise unittest.SkipTest(f"no recorded provider responses in {FIXTURE_DIR}; "
+                                    "run with JOURNEYLOGGER_HTTP_MODE=record to capture them")
+        cls._previous = (http_client.get_mode(), map_processor.ORS_API_KEY, map_processor.known_addresses)
+        http_client.configure(mode=MODE, fixture_dir=FIXTURE_DIR)
+        if MODE == "replay":
+            # Keys are never part of a fixture, but routing only runs with one
+            map_processor.ORS_API_KEY = map_processor.ORS_API_KEY or "replay"
+        if cls.known_addresses is not None:
+            map_processor.set_known_addresses(cls.known_addresses)
+
+    @classmethod
+    def tearDownClass(cls):
+        mode, map_processor.ORS_API_KEY, known = cls._previous
+        map_processor.set_known_addresses(known)
+        http_client.configure(mode=mode)
@@ -0,0 +1,44 @@
+import unittest
+
+import pandas as pd
+
+from journeylogger.address_parser import COLUMNS, parse_address, parse_addresses
+
+ADDRESSES = [
+    "12 Main Street, Newtownards, BT23 4AB",
+    "Unit 4 Generic Business Park, Killinchy Road, Comber",
+    "Flat 2, 10 Downing Street, London, SW1A 2AA",
+    "12 Main Street, Newtownards, BT23 4AB",
+    None,
+    float("nan"),
+    "Bangor",
+]
+
+
+class TestParseAddresses(unittest.TestCase):
+
+    def test_columns_match_parse_address(self):
+        frame = parse_addresses(ADDRESSES)
+        self.assertEqual(list(frame.columns), COLUMNS)
+        self.assertEqual(len(frame), len(ADDRESSES))
+        for i in (0, 1, 2, 6):
+            self.assertEqual(tuple(frame.iloc[i]), parse_address(ADDRESSES[i]))
+        self.assertEqual(tuple(frame.iloc[4]), (None, None, None, []))
+
+    def test_series_index_kept_and_rows_independent(self):
+        series = pd.Series(ADDRESSES, index=[f"row{i}" for i in range(len(ADDRESSES))])
+        frame = parse_addresses(series)
+        self.assertEqual(list(frame.index), list(series.index))
+        frame.at["row4", "other_towns"].append("changed")
+        self.assertEqual(frame.at["row5", "other_towns"], [])
+
+    def test_process_pool_gives_same_result(self):
+        many = [f"{n} Main Street, {town}, BT{n % 90 + 1} 1AB"
+                for n in range(60) for town in ("Newtownards", "Comber", "Bangor")]
+        serial = parse_addresses(many)
+        pooled = parse_addresses(many, workers=2, chunk_size=10)
+        pd.testing.assert_frame_equal(serial, pooled)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,13 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 
-class TestAppleMapsIntegration(unittest.TestCase):
+from tests._replay import ProviderTestCase
+
+
+class TestAppleMapsIntegration(ProviderTestCase):
+    # The link has no origin, so the first journey of the day starts from a fixed home
+    known_addresses = {"home": ["Castle Street, Comber, BT23 5DY"], "depot": []}
+
     def test_real_apple_maps_link(self):
         url = "https://maps.apple.com/?address=14%20University%20Avenue,%20Belfast,%20Northern%20Ireland"
         result = process_maps_link(url)
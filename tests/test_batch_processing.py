@@ -0,0 +1,137 @@
+import json
+import unittest
+from datetime import datetime
+from urllib.parse import urlparse
+from zoneinfo import ZoneInfo
+
+import requests
+
+from journeylogger import geocache, http_client, map_processor
+from journeylogger.map_processor import process_maps_link, process_maps_links
+from journeylogger.sheet_writer import MemorySheet, append_journeys_to_sheet
+
+LONDON = ZoneInfo("Europe/London")
+METRES_PER_LEG = 8046.72  # 5 miles
+
+PLACES = {
+    "Killinchy St, Comber": (54.5481, -5.7402, "Comber", "BT23 5AP"),
+    "High St, Holywood": (54.6387, -5.8245, "Holywood", "BT18 9AZ"),
+    "Main St, Bangor": (54.6640, -5.6689, "Bangor", "BT20 5AG"),
+}
+
+COMBER_TO_HOLYWOOD = "https://maps.apple.com/?saddr=Killinchy%20St,%20Comber&daddr=High%20St,%20Holywood"
+UNREACHABLE = "https://maps.app.goo.gl/unreachable"
+ON_TO_BANGOR = "https://maps.apple.com/?daddr=Main%20St,%20Bangor"
+
+
+def fake_response(url, payload, status=200):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.url = url
+    resp.encoding = "utf-8"
+    resp._content = json.dumps(payload).encode("utf-8")
+    return resp
+
+
+class StubProviders:
+    """Nominatim and ORS answers for PLACES; short-link expansion always fails."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, method, url, params=None, json=None, **kwargs):
+        host, path = urlparse(url).netloc, urlparse(url).path
+        self.calls.append((host, path))
+        if host == "maps.app.goo.gl":
+            raise requests.ConnectionError("no route to maps.app.goo.gl")
+        if host == "nominatim.openstreetmap.org" and path == "/search":
+            lat, lon, town, postcode = PLACES[params["q"]]
+            return fake_response(url, [{"lat": str(lat), "lon": str(lon),
+                                        "address": {"road": params["q"].split(",")[0], "town": town,
+                                                    "postcode": postcode}}])
+        if host == "api.openrouteservice.org":
+            segments = [{"distance": METRES_PER_LEG} for _ in json["coordinates"][1:]]
+            return fake_response(url, {"routes": [{"summary": {"distance": METRES_PER_LEG * len(segments)},
+                                                   "segments": segments}]})
+        return fake_response(url, {}, status=404)
+
+
+class TestProcessMapsLinks(unittest.TestCase):
+
+    def setUp(self):
+        self.providers = StubProviders()
+        self.ors_key = map_processor.ORS_API_KEY
+        map_processor.ORS_API_KEY = "test"
+        http_client.configure(mode="live", transport=self.providers)
+        geocache.forward_cache.clear()
+        geocache.route_cache.clear()
+
+    def tearDown(self):
+        http_client.configure(mode="live", transport=requests.request)
+        http_client.health.reset()
+        map_processor.ORS_API_KEY = self.ors_key
+
+    def test_origins_chain_past_a_failed_link(self):
+        results = process_maps_links([COMBER_TO_HOLYWOOD, UNREACHABLE, ON_TO_BANGOR], target_sheet=MemorySheet())
+
+        first, failed, last = results
+        self.assertIsNone(failed)
+        self.assertEqual((first["origin"]["town"], first["destination"]["town"]), ("Comber", "Holywood"))
+        # No origin in the last link: it starts where the last good journey ended
+        self.assertEqual(last["origin"]["town"], "Holywood")
+        self.assertEqual((last["origin"]["lat"], last["origin"]["lon"]), PLACES["High St, Holywood"][:2])
+        self.assertEqual(last["destination"]["town"], "Bangor")
+        self.assertAlmostEqual(first["distance_miles"], 5.0)
+        self.assertAlmostEqual(last["distance_miles"], 5.0)
+        # The origin chain needs neither the sheet nor a second geocode of Holywood
+        searches = [c for c in self.providers.calls if c == ("nominatim.openstreetmap.org", "/search")]
+        self.assertEqual(len(searches), 3)
+
+    def test_progress_stages_in_order(self):
+        stages = []
+        result = process_maps_link(COMBER_TO_HOLYWOOD, on_progress=lambda stage, payload: stages.append(
+            (stage, payload, payload.get("distance_miles"))), target_sheet=MemorySheet())
+
+        self.assertEqual([s for s, _, _ in stages], ["addresses", "locations", "provisional_distance", "distance"])
+        (_, addresses, _), (_, _, located_miles), (_, _, provisional), (_, final, _) = stages
+        self.assertEqual(addresses, {"origin": "Killinchy St, Comber", "destination": "High St, Holywood"})
+        self.assertIsNone(located_miles)
+        self.assertGreater(provisional, 0)
+        self.assertIs(final, result)
+        self.assertAlmostEqual(result["distance_miles"], 5.0)
+
+    def test_empty_batch(self):
+        self.assertEqual(process_maps_links([]), [])
+        self.assertEqual(self.providers.calls, [])
+
+
+class TestAppendJourneys(unittest.TestCase):
+
+    def test_one_append_rows_call_for_the_batch(self):
+        sheet = MemorySheet()
+        calls = []
+        sheet.append_row = lambda row, **kwargs: calls.append([row])
+        sheet.append_rows = lambda rows, **kwargs: calls.append(rows)
+
+        journeys = [
+            ({"origin": {"town": "Comber", "postcode": "BT23 5AP"},
+              "destination": {"town": "Holywood", "postcode": "BT18 9AZ", "visit_type": "visit"},
+              "distance_miles": 9.0}, COMBER_TO_HOLYWOOD),
+            ({"origin": {"town": "Holywood", "postcode": "BT18 9AZ"},
+              "destination": {"town": "Bangor", "postcode": "BT20 5AG", "visit_type": "visit"},
+              "distance_miles": 7.5}, ON_TO_BANGOR),
+        ]
+        append_journeys_to_sheet(sheet, journeys, timestamp=datetime(2026, 10, 1, 9, 0, tzinfo=LONDON))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([(r[3], r[5], r[7]) for r in calls[0]],
+                         [("Comber", "Holywood", "9.00"), ("Holywood", "Bangor", "7.50")])
+
+    def test_nothing_to_append(self):
+        sheet = MemorySheet()
+        append_journeys_to_sheet(sheet, [])
+        self.assertEqual(sheet.get_all_records(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import csv
+import importlib.util
+import io
+import json
+import unittest
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from journeylogger.export import export, journey_features, sheet_chunks, store_chunks, write_csv, write_geojson
+from journeylogger.journey_store import JourneyStore
+from journeylogger.sheet_writer import MemorySheet, append_journeys_to_sheet
+
+LONDON = ZoneInfo("Europe/London")
+
+
+def journey(day, miles, lat=54.65):
+    return ({
+        "origin": {"town": "Comber", "postcode": "BT23 5AB", "lat": 54.55, "lon": -5.74},
+        "destination": {"town": "Bangor", "postcode": "BT20 5AB", "lat": lat, "lon": -5.67, "visit_type": "visit"},
+        "distance_miles": miles,
+    }, f"https://maps.app.goo.gl/{day}")
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.store = JourneyStore(":memory:")
+        self.sheet = MemorySheet()
+        for day in range(1, 8):
+            when = datetime(2026, 10, day, 9, 0, tzinfo=LONDON)
+            trip = journey(day, float(day), lat=None if day == 7 else 54.65)
+            self.store.add_journeys([trip], timestamp=when, user=1 if day % 2 else 2)
+            append_journeys_to_sheet(self.sheet, [trip], timestamp=when)
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_store_chunks_are_bounded_and_filtered(self):
+        chunks = list(store_chunks(self.store, start=date(2026, 10, 2), end=date(2026, 10, 6), chunk_size=2))
+        self.assertEqual([len(c) for c in chunks], [2, 2, 1])
+        self.assertEqual([r["day"] for c in chunks for r in c][0], "2026-10-02")
+
+        mine = [r for c in store_chunks(self.store, user="2", chunk_size=2) for r in c]
+        self.assertEqual([r["distance_miles"] for r in mine], [2.0, 4.0, 6.0])
+
+    def test_csv(self):
+        out = io.StringIO()
+        n = write_csv(store_chunks(self.store, chunk_size=3), out)
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        self.assertEqual(n, 7)
+        self.assertEqual(rows[0]["origin_town"], "Comber")
+
+    def test_geojson_lines_skip_missing_coordinates(self):
+        out = io.StringIO()
+        n = write_geojson(store_chunks(self.store, chunk_size=4), out)
+        collection = json.loads(out.getvalue())
+        self.assertEqual(n, 6)
+        self.assertEqual(len(collection["features"]), 6)
+        self.assertEqual(collection["features"][0]["geometry"]["coordinates"], [[-5.74, 54.55], [-5.67, 54.65]])
+
+        points = journey_features(next(store_chunks(self.store, start=date(2026, 10, 7)))[0], "points")
+        self.assertEqual([f["properties"]["role"] for f in points], ["origin"])
+
+    def test_sheet_source_reads_in_blocks(self):
+        chunks = list(sheet_chunks(self.sheet, start=date(2026, 10, 3), chunk_size=3))
+        self.assertEqual(sum(len(c) for c in chunks), 5)
+        self.assertTrue(all(len(c) <= 3 for c in chunks))
+        with self.assertRaises(ValueError):
+            sheet_chunks(self.sheet, user="1")
+
+    def test_parquet_needs_output_and_pyarrow(self):
+        with self.assertRaises(ValueError):
+            export(store_chunks(self.store), "parquet", None)
+        if importlib.util.find_spec("pyarrow") is None:
+            with self.assertRaises(ImportError):
+                export(store_chunks(self.store), "parquet", "/tmp/unused.parquet")
+
+
+if __name__ == "__main__":
+    unittest.main()
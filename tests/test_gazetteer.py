@@ -0,0 +1,135 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from journeylogger import gazetteer, http_client
+from journeylogger.gazetteer import Gazetteer, KDTree, default_gazetteer, main, postcode_sector, read_rows, sector_centroids
+from journeylogger.known_locations import haversine_m
+from journeylogger.sheet_writer import MemorySheet
+
+SETTLEMENTS = [("Comber", 54.5500, -5.7450), ("Newtownards", 54.5910, -5.6910), ("Belfast", 54.5968, -5.9254)]
+SECTORS = [("BT23 5", 54.5480, -5.7420), ("BT23 4", 54.5920, -5.6950), ("BT1 1", 54.5990, -5.9300)]
+POSTCODES = [("BT23 5AB", 54.5505, -5.7440)]
+
+
+class TestKDTree(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        rng = random.Random(3)
+        points = [(rng.uniform(54, 55.3), rng.uniform(-8.2, -5.4)) for _ in range(300)]
+        tree = KDTree(points)
+        for _ in range(50):
+            q = (rng.uniform(54, 55.3), rng.uniform(-8.2, -5.4))
+            expected = min(haversine_m(*q, *p) for p in points) / 1000
+            index, km = tree.nearest(*q)
+            self.assertAlmostEqual(km, expected, places=6)
+            self.assertAlmostEqual(haversine_m(*q, *points[index]) / 1000, expected, places=6)
+
+    def test_empty_tree(self):
+        self.assertIsNone(KDTree([]).nearest(54.6, -5.9))
+
+
+class TestGazetteer(unittest.TestCase):
+
+    def setUp(self):
+        self.gazetteer = Gazetteer(SETTLEMENTS, SECTORS)
+
+    def test_nearest_town_and_sector(self):
+        result = self.gazetteer.reverse("54.551", "-5.744")
+        self.assertEqual(result["town"], "Comber")
+        self.assertEqual(result["postcode"], "")  # a sector is only part of a postcode
+        self.assertEqual(result["raw"]["postcode_sector"], "BT23 5")
+        self.assertEqual(result["raw"]["source"], "gazetteer")
+
+    def test_full_postcode_fills_the_postcode(self):
+        result = Gazetteer(SETTLEMENTS, SECTORS, POSTCODES).reverse(54.551, -5.744)
+        self.assertEqual((result["town"], result["postcode"]), ("Comber", "BT23 5AB"))
+        self.assertEqual(result["raw"]["postcode_sector"], "BT23 5")
+
+    def test_no_offline_answer_without_postcode_rows(self):
+        # A town alone has no postcode to log: leave the point to Nominatim
+        self.assertIsNone(Gazetteer(SETTLEMENTS, []).reverse(54.551, -5.744))
+        self.assertIsNone(self.gazetteer.reverse(54.551, -5.744, max_sector_km=0.1))
+
+    def test_outside_coverage_returns_none(self):
+        self.assertIsNone(self.gazetteer.reverse(55.2, -7.0))  # far from every entry
+        self.assertIsNone(self.gazetteer.reverse("", None))
+
+    def test_shipped_settlements_alone_defer_to_nominatim(self):
+        self.assertIsNone(default_gazetteer().reverse(54.6536, -5.6685))
+
+
+class TestCoordinateDestinations(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        http_client.configure(mode="replay", fixture_dir=self.tmp.name)  # empty: any provider call would fail
+        self.shipped = gazetteer._default
+        gazetteer._default = Gazetteer(SETTLEMENTS, SECTORS)
+
+    def tearDown(self):
+        gazetteer._default = self.shipped
+        http_client.configure(mode="live")
+        self.tmp.cleanup()
+
+    def test_answered_offline_with_town_and_blank_postcode(self):
+        from journeylogger.map_processor import resolve_destination
+
+        destination, visit_type = resolve_destination("54.551, -5.744")
+        self.assertEqual((destination["town"], destination["postcode"]), ("Comber", ""))
+        self.assertEqual((destination["lat"], destination["lon"]), (54.551, -5.744))
+        self.assertEqual(visit_type, "visit")
+
+    def test_next_link_chains_from_an_offline_destination(self):
+        from journeylogger.map_processor import process_maps_link, resolve_origin
+
+        link = "https://maps.apple.com/?ll=54.551,-5.744"
+        first = process_maps_link(link, previous={"destination": {"town": "Belfast", "postcode": "BT1 1AA",
+                                                                  "lat": 54.5968, "lon": -5.9254}})
+        self.assertEqual((first["destination"]["town"], first["destination"]["postcode"]), ("Comber", ""))
+
+        # From the batch's previous result…
+        origin_str, origin = resolve_origin(None, first)
+        self.assertEqual((origin["town"], origin["lat"], origin["lon"]), ("Comber", 54.551, -5.744))
+
+        # …and from today's last sheet row, whose postcode is blank
+        now = datetime.now(ZoneInfo("Europe/London"))
+        sheet = MemorySheet([[now.isoformat(), now.strftime("%d %B %Y"), "visit", "Belfast", "BT1 1AA",
+                              "Comber", "", "7.00", link, ""]])
+        origin_str, origin = resolve_origin(None, None, sheet)
+        self.assertEqual(origin_str, "Comber")
+        self.assertEqual((origin["town"], origin["lat"], origin["lon"]), ("Comber", 54.551, -5.744))
+
+
+class TestRefresh(unittest.TestCase):
+
+    def test_postcode_sector(self):
+        self.assertEqual(postcode_sector("bt235ab"), "BT23 5")
+        self.assertEqual(postcode_sector("BT1 1AA"), "BT1 1")
+        self.assertIsNone(postcode_sector("BT1"))
+
+    def test_sector_centroids_skip_other_areas_and_missing_coords(self):
+        points = [("BT23 5AA", "54.5", "-5.7"), ("BT23 5AB", "54.6", "-5.8"),
+                  ("BT23 6AA", "99.999999", "0"), ("SW1A 1AA", "51.5", "-0.1")]
+        self.assertEqual(sector_centroids(points), [("BT23 5", 54.55, -5.75)])
+
+    def test_main_rewrites_sector_rows(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            gazetteer = Path(tmp) / "gazetteer.csv"
+            gazetteer.write_text("# attribution\nkind,name,postcode,lat,lon\nsettlement,Comber,,54.55,-5.745\n"
+                                 "sector,,BT9 9,1,1\n", encoding="utf-8")
+            postcodes = Path(tmp) / "onspd.csv"
+            postcodes.write_text("pcds,lat,long\nBT23 5AA,54.548,-5.742\n", encoding="utf-8")
+
+            self.assertEqual(main(["--postcodes", str(postcodes), "--gazetteer", str(gazetteer)]), 0)
+            self.assertTrue(gazetteer.read_text(encoding="utf-8").startswith("# attribution\n"))
+            rows = [(r["kind"], r["name"] or r["postcode"]) for r in read_rows(gazetteer)]
+            self.assertEqual(rows, [("settlement", "Comber"), ("sector", "BT23 5")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import time
+import unittest
+
+from journeylogger.geocache import ForwardGeocodeCache, ReverseGeocodeCache, RouteCache, geohash
+
+RESULT = {"lat": 54.59681, "lon": -5.93012, "town": "Belfast", "postcode": "BT1 5GS", "raw": {"road": "Donegall Square"}}
+
+
+class TestGeohash(unittest.TestCase):
+
+    def test_known_value(self):
+        # Reference value from the original geohash.org examples
+        self.assertEqual(geohash(57.64911, 10.40744, 11), "u4pruydqqvj")
+
+    def test_nearby_points_share_a_cell(self):
+        self.assertEqual(geohash(54.596810, -5.930120), geohash(54.596830, -5.930150))
+        self.assertNotEqual(geohash(54.596810, -5.930120), geohash(54.6068, -5.9301))
+
+
+class TestReverseGeocodeCache(unittest.TestCase):
+
+    def test_hit_within_cell_is_a_recentred_copy(self):
+        cache = ReverseGeocodeCache(precision=7)
+        cache.put(54.59681, -5.93012, RESULT)
+        hit = cache.get("54.59683", "-5.93015")
+        self.assertEqual(hit["town"], "Belfast")
+        self.assertEqual((hit["lat"], hit["lon"]), (54.59683, -5.93015))
+
+        hit["raw"]["road"] = "changed by caller"
+        self.assertEqual(cache.get(54.59681, -5.93012)["raw"]["road"], "Donegall Square")
+        self.assertEqual((cache.hits, cache.misses), (2, 0))
+
+    def test_miss_outside_cell_and_failures_not_cached(self):
+        cache = ReverseGeocodeCache()
+        cache.put(54.59681, -5.93012, RESULT)
+        cache.put(54.7, -6.0, None)
+        self.assertIsNone(cache.get(54.7, -6.0))
+        self.assertIsNone(cache.get("not", "numbers"))
+        self.assertEqual(len(cache), 1)
+
+    def test_eviction_policies(self):
+        lru = ReverseGeocodeCache(maxsize=1)
+        lru.put(54.1, -6.1, RESULT)
+        lru.put(54.2, -6.2, RESULT)
+        self.assertIsNone(lru.get(54.1, -6.1))
+
+        ttl = ReverseGeocodeCache(policy="ttl", ttl=0.01)
+        ttl.put(54.1, -6.1, RESULT)
+        time.sleep(0.02)
+        self.assertIsNone(ttl.get(54.1, -6.1))
+
+        self.assertIsNone(ReverseGeocodeCache(maxsize=0).get(54.1, -6.1))
+        with self.assertRaises(ValueError):
+            ReverseGeocodeCache(policy="random")
+
+
+class TestForwardAndRouteCaches(unittest.TestCase):
+
+    def test_forward_key_ignores_case_and_spacing(self):
+        cache = ForwardGeocodeCache()
+        cache.put("Donegall Square,  Belfast", RESULT)
+        cache.put("nowhere", None)
+        hit = cache.get(" donegall square, belfast ")
+        self.assertEqual((hit["town"], hit["lat"]), ("Belfast", 54.59681))
+        self.assertIsNone(cache.get("nowhere"))
+        self.assertEqual((len(cache), cache.hits, cache.misses), (1, 1, 1))
+
+    def test_route_cache_by_cell_pair(self):
+        cache = RouteCache(precision=8)
+        cache.put((54.59681, -5.93012), ("54.65", "-5.67"), 14.2)
+        self.assertEqual(cache.get((54.596812, -5.930121), (54.65, -5.67)), 14.2)
+        self.assertIsNone(cache.get((54.65, -5.67), (54.59681, -5.93012)))  # direction matters
+        self.assertIsNone(cache.get((None, None), (54.65, -5.67)))
+        self.assertIsNone(RouteCache(maxsize=0).get((54.59681, -5.93012), (54.65, -5.67)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,11 @@
 import unittest
+
 from journeylogger.gmaps_utils import expand_google_maps_url, extract_addresses_from_gmaps_url
 
-class TestGoogleMapsIntegration(unittest.TestCase):
+from tests._replay import ProviderTestCase
+
+
+class TestGoogleMapsIntegration(ProviderTestCase):
 
     def test_expand_and_extract_link_1(self):
         short_url = "https://maps.app.goo.gl/LCSFDg4kzm9AhFuZA?g_st=iw"
@@ -0,0 +1,199 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from journeylogger import http_client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_GET(self):
+        type(self).hits += 1
+        body = json.dumps({"path": self.path.split("?")[0]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestRecordReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/search"
+        _Handler.hits = 0
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        http_client.configure(mode="live", latency_ms=0, jitter_ms=0)
+        self.tmp.cleanup()
+
+    def test_record_then_replay_without_network(self):
+        http_client.configure(mode="record", fixture_dir=self.tmp.name)
+        live = http_client.get(self.url, provider="nominatim", params={"q": "Belfast", "api_key": "secret"})
+        self.assertEqual(_Handler.hits, 1)
+
+        # Stored fixture must not contain the key
+        stored = list((http_client.FixtureStore(self.tmp.name).directory / "nominatim").glob("*.json"))
+        self.assertEqual(len(stored), 1)
+        self.assertNotIn("secret", stored[0].read_text())
+
+        self.server.shutdown()
+        http_client.configure(mode="replay")
+        replayed = http_client.get(self.url, provider="nominatim", params={"q": "Belfast", "api_key": "other"})
+        self.assertEqual(_Handler.hits, 1)
+        self.assertEqual(replayed.status_code, 200)
+        self.assertEqual(replayed.json(), live.json())
+
+    def test_replay_missing_fixture_looks_like_network_error(self):
+        http_client.configure(mode="replay", fixture_dir=self.tmp.name)
+        with self.assertRaises(http_client.requests.RequestException):
+            http_client.get(self.url, provider="nominatim", params={"q": "Nowhere"})
+
+    def test_replay_simulated_latency(self):
+        store = http_client.FixtureStore(self.tmp.name)
+        store.add("ors", "POST", self.url, body={"coordinates": [[1, 2], [3, 4]]}, payload={"ok": True})
+        http_client.configure(mode="replay", fixture_dir=self.tmp.name, latency_ms=50)
+
+        started = time.perf_counter()
+        resp = http_client.post(self.url, provider="ors", json={"coordinates": [[1, 2], [3, 4]]})
+        self.assertGreaterEqual(time.perf_counter() - started, 0.05)
+        self.assertEqual(resp.json(), {"ok": True})
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def run_concurrently(self, n, fn):
+        barrier = threading.Barrier(n)
+        results, errors = [], []
+
+        def worker():
+            barrier.wait()
+            try:
+                results.append(fn())
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(n)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results, errors
+
+    def test_concurrent_identical_calls_share_one(self):
+        flights, calls = http_client.SingleFlight(), []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.1)
+            return "result"
+
+        results, errors = self.run_concurrently(8, lambda: flights.do("key", slow))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["result"] * 8)
+        self.assertEqual(flights.shared, 7)
+        self.assertEqual(flights.in_flight(), 0)
+
+        # Once finished, the next call goes out again
+        flights.do("key", slow)
+        self.assertEqual(len(calls), 2)
+
+    def test_errors_reach_every_waiter(self):
+        flights = http_client.SingleFlight()
+
+        def failing():
+            time.sleep(0.05)
+            raise ValueError("provider down")
+
+        results, errors = self.run_concurrently(4, lambda: flights.do("key", failing))
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 4)
+        self.assertTrue(all(isinstance(e, ValueError) for e in errors))
+
+    def test_replayed_requests_are_coalesced(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = "https://nominatim.example/search"
+            http_client.FixtureStore(tmp).add("nominatim", "GET", url, params={"q": "Depot"}, payload=[{"lat": "1"}])
+            http_client.configure(mode="replay", fixture_dir=tmp, latency_ms=100)
+            shared_before = http_client.flights.shared
+            try:
+                results, errors = self.run_concurrently(
+                    5, lambda: http_client.get(url, provider="nominatim", params={"q": "Depot"}).json())
+            finally:
+                http_client.configure(mode="live", latency_ms=0)
+            self.assertEqual(errors, [])
+            self.assertEqual(results, [[{"lat": "1"}]] * 5)
+            self.assertEqual(http_client.flights.shared - shared_before, 4)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def tearDown(self):
+        http_client.configure(mode="live", transport=http_client.requests.request)
+        http_client.health.reset()
+
+    def test_open_circuit_fails_fast_without_calling_provider(self):
+        calls = []
+
+        def down(method, url, **kwargs):
+            calls.append(url)
+            raise http_client.requests.ConnectTimeout("timed out")
+
+        http_client.configure(mode="live", transport=down)
+        for i in range(http_client.health.get("photon").failure_threshold):
+            with self.assertRaises(http_client.requests.ConnectTimeout):
+                http_client.get(f"https://photon.example/api?q={i}", provider="photon")
+
+        with self.assertRaises(http_client.CircuitOpenError):
+            http_client.get("https://photon.example/api?q=next", provider="photon")
+        self.assertEqual(len(calls), http_client.health.get("photon").failure_threshold)
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_parse_intervals(self):
+        self.assertEqual(http_client.parse_intervals("nominatim=1, ors=1.5,,bad"), {"nominatim": 1.0, "ors": 1.5})
+
+    def test_calls_get_consecutive_slots_per_provider(self):
+        now, slept = [0.0], []
+        limiter = http_client.RateLimiter({"nominatim": 1.0}, clock=lambda: now[0], sleep=slept.append)
+        self.assertEqual([limiter.wait("nominatim") for _ in range(3)], [0.0, 1.0, 2.0])
+        self.assertEqual(limiter.wait("photon"), 0.0)  # not limited
+        self.assertEqual(slept, [1.0, 2.0])
+
+        now[0] = 10.0  # long idle: no debt carried over
+        self.assertEqual(limiter.wait("nominatim"), 0.0)
+
+    def test_threads_share_one_limiter(self):
+        limiter = http_client.RateLimiter({"ors": 0.05})
+        started = []
+        lock = threading.Lock()
+
+        def call():
+            limiter.wait("ors")
+            with lock:
+                started.append(time.monotonic())
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        started.sort()
+        self.assertTrue(all(b - a >= 0.045 for a, b in zip(started, started[1:])), started)
+
+
+if __name__ == "__main__":
+    unittest.main()
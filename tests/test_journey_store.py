@@ -0,0 +1,83 @@
+import unittest
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from journeylogger.journey_store import JourneyStore, mileage_report, parse_sheet_timestamp
+from journeylogger.sheet_writer import MemorySheet, append_journeys_to_sheet
+
+LONDON = ZoneInfo("Europe/London")
+
+
+def journey(origin_town, dest_town, miles, visit_type="visit"):
+    return {
+        "origin": {"town": origin_town, "postcode": "BT23 4AA", "lat": 54.59, "lon": -5.69},
+        "destination": {"town": dest_town, "postcode": "BT20 5AB", "lat": "54.65", "lon": "-5.66",
+                        "visit_type": visit_type},
+        "distance_miles": miles,
+    }
+
+
+class TestJourneyStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = JourneyStore(":memory:")
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_mirrors_sheet_rows_and_import_does_not_duplicate(self):
+        when = datetime(2026, 10, 5, 9, 30, tzinfo=LONDON)
+        journeys = [(journey("Newtownards", "Bangor", 8.2), "https://maps.app.goo.gl/a"),
+                    (journey("Bangor", "Comber", None), "https://maps.app.goo.gl/b")]
+        sheet = MemorySheet()
+        append_journeys_to_sheet(sheet, journeys, timestamp=when)
+
+        self.assertEqual(self.store.add_journeys(journeys, timestamp=when, user=42), 2)
+        self.assertEqual(self.store.import_sheet_records(sheet.get_all_records()), 0)
+        self.assertEqual(len(self.store), 2)
+
+        df = self.store.frame()
+        self.assertEqual(list(df["destination_lat"]), [54.65, 54.65])
+        self.assertEqual(list(df["user"]), ["42", "42"])
+
+    def test_multi_stop_journey_stores_a_row_per_leg(self):
+        legs = [journey("Comber", "Newtownards", 5.0), journey("Newtownards", "Bangor", 6.5)]
+        multi = {"origin": legs[0]["origin"], "destination": legs[-1]["destination"],
+                 "distance_miles": 11.5, "legs": legs}
+        added = self.store.add_journeys([(multi, "https://maps.app.goo.gl/m")],
+                                        timestamp=datetime(2026, 10, 6, 8, 0, tzinfo=LONDON))
+        self.assertEqual(added, 2)
+        self.assertEqual(list(self.store.frame()["note"]), ["Leg 1/2", "Leg 2/2"])
+
+    def test_report_groups_by_month_and_visit_type(self):
+        records = [
+            {"Processed Timestamp": "30 September 2026, 17:00 BST", "Journey Type": "home",
+             "Estimated Mileage (ORS)": "10.00", "Raw URL": "u1"},
+            {"Processed Timestamp": "01 October 2026, 09:00 BST", "Journey Type": "visit",
+             "Estimated Mileage (ORS)": "4.50", "Raw URL": "u2"},
+            {"Processed Timestamp": "02 October 2026, 09:00 BST", "Journey Type": "visit",
+             "Estimated Mileage (ORS)": "", "Raw URL": "u3"},
+            {"Processed Timestamp": "not a date", "Raw URL": "junk"},
+        ]
+        self.assertEqual(self.store.import_sheet_records(records), 3)
+
+        report = mileage_report(self.store.frame(), ["month", "visit_type"])
+        rows = {(str(m), v): r for (m, v), r in report.iterrows()}
+        self.assertEqual(rows[("2026-09", "home")]["miles"], 10.0)
+        self.assertEqual(rows[("2026-10", "visit")]["journeys"], 2)
+        self.assertEqual(rows[("2026-10", "visit")]["unmeasured"], 1)
+
+        october = self.store.frame(start=date(2026, 10, 1))
+        self.assertEqual(mileage_report(october, ["day"])["miles"].sum(), 4.5)
+
+    def test_unknown_grouping_rejected(self):
+        with self.assertRaises(ValueError):
+            mileage_report(self.store.frame(), ["fortnight"])
+
+    def test_parse_sheet_timestamp(self):
+        self.assertEqual(parse_sheet_timestamp("18 October 2026, 14:03 BST"), datetime(2026, 10, 18, 14, 3))
+        self.assertIsNone(parse_sheet_timestamp(""))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from journeylogger.known_locations import GeofenceIndex, KnownLocations, PhraseMatcher, trie_regex
+
+
+class TestPhraseMatcher(unittest.TestCase):
+
+    def test_trie_regex_factors_shared_prefixes(self):
+        self.assertEqual(trie_regex(["bt9 1", "bt9 7"]), r"bt9\ (?:1|7)")
+
+    def test_finds_every_phrase_case_insensitively_in_order(self):
+        matcher = PhraseMatcher({"Business Park": "depot", "drury lane": "home", "park": "other"})
+        self.assertEqual(matcher.find_all("19 Drury Lane, near Generic BUSINESS PARK"), ["home", "depot", "other"])
+
+    def test_no_phrases_or_no_text(self):
+        self.assertEqual(PhraseMatcher({}).find_all("anything"), [])
+        self.assertEqual(PhraseMatcher({"x": "y"}).find_all(""), [])
+
+
+class TestGeofenceIndex(unittest.TestCase):
+
+    def test_point_inside_and_outside(self):
+        index = GeofenceIndex()
+        index.add(54.6012, -5.9301, 200, "depot")
+        self.assertEqual([v for _, v in index.find(54.6020, -5.9301)], ["depot"])  # ~90 m north
+        self.assertEqual(index.find(54.6100, -5.9301), [])  # ~1 km north
+
+    def test_large_radius_regrids(self):
+        index = GeofenceIndex(cell_m=100)
+        index.add(54.5, -5.9, 50, "small")
+        index.add(54.6, -5.9, 5000, "big")
+        self.assertGreaterEqual(index.cell_m, 5000)
+        self.assertEqual([v for _, v in index.find(54.63, -5.9)], ["big"])
+        self.assertEqual([v for _, v in index.find(54.5002, -5.9)], ["small"])
+
+
+class TestKnownLocations(unittest.TestCase):
+
+    def setUp(self):
+        self.known = KnownLocations({
+            "home": ["19 drury lane"],
+            "depot": ["generic business park", {"lat": 54.6012, "lon": -5.9301, "radius_m": 200}, {"lat": "bad"}],
+        })
+
+    def test_text_and_point_matches_are_combined(self):
+        self.assertEqual(self.known.match("19 Drury Lane, Comber"), {"home"})
+        self.assertEqual(self.known.match("Somewhere else", 54.6015, -5.9301), {"depot"})
+        self.assertEqual(self.known.match("Somewhere else", "", ""), set())
+
+    def test_malformed_geofence_is_ignored(self):
+        self.assertEqual(len(self.known.geofences), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
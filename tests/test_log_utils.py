@@ -0,0 +1,85 @@
+import logging
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from journeylogger import http_client
+from journeylogger.log_utils import CorrelationFilter, correlation, correlation_id, propagate
+
+
+class _Capture(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.addFilter(CorrelationFilter())
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestCorrelation(unittest.TestCase):
+
+    def test_context_sets_and_restores_id(self):
+        self.assertEqual(correlation_id.get(), "-")
+        with correlation("42-7") as cid:
+            self.assertEqual(cid, "42-7")
+            with correlation() as inner:
+                self.assertNotEqual(inner, "42-7")
+            self.assertEqual(correlation_id.get(), "42-7")
+        self.assertEqual(correlation_id.get(), "-")
+
+    def test_propagate_carries_id_into_pool_threads(self):
+        with correlation("batch"):
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                bare = list(pool.map(lambda _: correlation_id.get(), range(2)))
+                carried = list(pool.map(propagate(lambda _: correlation_id.get()), range(2)))
+        self.assertEqual(bare, ["-", "-"])
+        self.assertEqual(carried, ["batch", "batch"])
+
+    def test_filter_stamps_records(self):
+        logger = logging.getLogger("journeylogger.test_log_utils")
+        capture = _Capture()
+        logger.addHandler(capture)
+        try:
+            with correlation("abc"):
+                logger.warning("inside")
+            logger.warning("outside")
+        finally:
+            logger.removeHandler(capture)
+        self.assertEqual([r.correlation_id for r in capture.records], ["abc", "-"])
+
+
+class TestProviderEvents(unittest.TestCase):
+
+    def setUp(self):
+        self.capture = _Capture()
+        http_client.events.addHandler(self.capture)
+        self.level = http_client.events.level
+        http_client.events.setLevel(logging.INFO)
+
+    def tearDown(self):
+        http_client.events.removeHandler(self.capture)
+        http_client.events.setLevel(self.level)
+        http_client.configure(mode="live", latency_ms=0)
+
+    def test_one_event_per_call(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = http_client.FixtureStore(tmp)
+            store.add("nominatim", "GET", "https://example.test/search", params={"q": "Lisburn"}, payload=[])
+            http_client.configure(mode="replay", fixture_dir=tmp)
+
+            with correlation("j1"):
+                http_client.get("https://example.test/search", provider="nominatim", params={"q": "Lisburn"})
+                with self.assertRaises(http_client.FixtureNotFoundError):
+                    http_client.get("https://example.test/search", provider="nominatim", params={"q": "Nowhere"})
+
+        events = [r.provider_event for r in self.capture.records]
+        self.assertEqual([(e["provider"], e["status"], e["outcome"]) for e in events],
+                         [("nominatim", 200, "ok"), ("nominatim", None, "no_fixture")])
+        self.assertEqual({r.correlation_id for r in self.capture.records}, {"j1"})
+        self.assertIn("provider=nominatim GET status=200", self.capture.records[0].getMessage())
+
+
+if __name__ == "__main__":
+    unittest.main()
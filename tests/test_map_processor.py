@@ -1,7 +1,11 @@
 import unittest
+
 from journeylogger.map_processor import process_maps_link, get_town_from_uk_postcode
 
-class TestProcessMapsLinkIntegration(unittest.TestCase):
+from tests._replay import ProviderTestCase
+
+
+class TestProcessMapsLinkIntegration(ProviderTestCase):
 
     def test_link_1(self):
         url = "https://maps.app.goo.gl/YzWjVEDxFuzHjPrc9"
@@ -100,7 +104,7 @@ if __name__ == "__main__":
     unittest.main()
 
 
-class TestPostcodeLookup(unittest.TestCase):
+class TestPostcodeLookup(ProviderTestCase):
     def test_known_postcode_belfast(self):
         postcode = "BT6 9QT"
         town = get_town_from_uk_postcode(postcode)
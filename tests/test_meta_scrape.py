@@ -0,0 +1,69 @@
+import io
+import sys
+import unittest
+
+import requests
+
+from journeylogger import http_client
+from journeylogger.map_utils import scrape_meta_coords
+
+HEAD = b'<html><head><title>Maps</title><meta content="54.59681,-5.93012" name=ICBM ><meta name="x">'
+BODY = b"</head><body>" + b"<div>tile</div>" * 20_000 + b"</body></html>"
+
+
+class _Body(io.BytesIO):
+    """Response body that counts how much of it was read."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.read_bytes = 0
+
+    def read(self, n=-1, **kwargs):
+        chunk = super().read(n)
+        self.read_bytes += len(chunk)
+        return chunk
+
+
+class TestScrapeMetaCoords(unittest.TestCase):
+
+    def serve(self, html):
+        body = _Body(html)
+
+        def transport(method, url, **kwargs):
+            resp = requests.Response()
+            resp.status_code = 200
+            resp.url = url
+            resp.raw = body
+            return resp
+
+        http_client.configure(mode="live", transport=transport)
+        return body
+
+    def tearDown(self):
+        http_client.configure(mode="live", transport=http_client.requests.request)
+        http_client.health.reset()
+
+    def test_stops_at_the_tag(self):
+        body = self.serve(HEAD + BODY)
+        self.assertEqual(scrape_meta_coords("https://maps.google.com/?q=x"), (54.59681, -5.93012))
+        self.assertLess(body.read_bytes, 10_000)
+
+    def test_stops_at_end_of_head_without_parsing(self):
+        sys.modules.pop("bs4", None)
+        body = self.serve(b"<html><head><title>Maps</title>" + BODY)
+        self.assertIsNone(scrape_meta_coords("https://maps.google.com/?q=x"))
+        self.assertLess(body.read_bytes, 10_000)
+        self.assertNotIn("bs4", sys.modules)
+
+    def test_tag_split_across_chunks(self):
+        html = b"<head>" + b" " * 8180 + b'<meta name="ICBM" content="54.1,-6.2"></head>'
+        self.serve(html)
+        self.assertEqual(scrape_meta_coords("https://maps.google.com/?q=x"), (54.1, -6.2))
+
+    def test_bs4_fallback_for_markup_the_scan_cannot_read(self):
+        self.serve(b'<head><meta name="ICBM" data-x="a>b" content="54.3,-6.4"></head>')
+        self.assertEqual(scrape_meta_coords("https://maps.google.com/?q=x"), (54.3, -6.4))
+
+
+if __name__ == "__main__":
+    unittest.main()
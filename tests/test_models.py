@@ -0,0 +1,67 @@
+import unittest
+
+from journeylogger.models import Journey, Location, coord
+
+ORIGIN = {"lat": "54.5966", "lon": "-5.6971", "town": "Newtownards", "postcode": "BT23 4AA"}
+DEST = {"lat": 54.6536, "lon": -5.6689, "town": "Bangor", "postcode": "BT20 5AB",
+        "raw": {"road": "Main Street", "town": "Bangor"}}
+
+
+class TestLocation(unittest.TestCase):
+
+    def test_coords_normalised_to_float_or_none(self):
+        self.assertEqual(coord("54.6"), 54.6)
+        for junk in (None, "", "nan", "north", []):
+            self.assertIsNone(coord(junk))
+
+        loc = Location.from_dict({"lat": "", "lon": "-5.9", "town": "Lisburn"})
+        self.assertIsNone(loc.lat)
+        self.assertEqual(loc.lon, -5.9)
+        self.assertFalse(loc.has_coords)
+
+    def test_towns_interned_and_no_instance_dict(self):
+        a = Location(town="".join(["Bally", "mena"]))
+        b = Location(town="".join(["Ballym", "ena"]))
+        self.assertIs(a.town, b.town)
+        self.assertFalse(hasattr(a, "__dict__"))
+
+    def test_dict_round_trip_copies_raw(self):
+        loc = Location.from_dict(DEST)
+        d = loc.to_dict()
+        d["raw"]["road"] = "edited"
+        self.assertEqual(loc.to_dict()["raw"], DEST["raw"])
+
+
+class TestJourneyCodecs(unittest.TestCase):
+
+    def setUp(self):
+        origin = Location.from_dict(ORIGIN, raw="Home")
+        bangor = Location.from_dict(DEST, visit_type="visit")
+        holywood = Location(town="Holywood", postcode="BT18", raw="Holywood", visit_type="depot")
+        self.single = Journey(origin, bangor, 12.4)
+        self.multi = Journey(origin, holywood, 17.0, (Journey(origin, bangor, 12.4), Journey(bangor, holywood, 4.6)))
+
+    def test_dict_shape_matches_pipeline_results(self):
+        result = self.single.to_dict()
+        self.assertEqual((result["origin"]["lat"], result["origin"]["lon"]), (54.5966, -5.6971))
+        self.assertEqual(result["destination"]["visit_type"], "visit")
+        self.assertEqual(result["origin"]["raw"], "Home")
+
+    def test_json_round_trip(self):
+        for journey in (self.single, self.multi):
+            self.assertEqual(Journey.from_json(journey.to_json()), journey)
+
+    def test_binary_round_trip(self):
+        for journey in (self.single, self.multi):
+            self.assertEqual(Journey.unpack(journey.pack()), journey)
+        self.assertEqual(len(self.multi.legs), 2)
+        self.assertIsNone(Journey.unpack(self.multi.pack()).legs[1].destination.lat)
+
+    def test_raw_address_components_survive(self):
+        loc = Location.from_dict(DEST)
+        packed, _ = Location.unpack_from(loc.pack())
+        self.assertEqual(packed.to_dict()["raw"], DEST["raw"])
+
+
+if __name__ == "__main__":
+    unittest.main()
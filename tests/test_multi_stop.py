@@ -0,0 +1,57 @@
+import unittest
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from journeylogger.gmaps_utils import extract_waypoints_from_gmaps_url
+from journeylogger.sheet_writer import MemorySheet, append_journey_to_sheet
+
+
+def leg(origin_town, dest_town, miles):
+    return {
+        "origin": {"town": origin_town, "postcode": "BT1 1AA"},
+        "destination": {"town": dest_town, "postcode": "BT2 2BB", "visit_type": "visit"},
+        "distance_miles": miles,
+    }
+
+
+class TestWaypoints(unittest.TestCase):
+
+    def test_dir_url_keeps_every_stop(self):
+        url = ("https://www.google.com/maps/dir/19+Drury+Lane,+Comber/Main+St,+Newtownards/"
+               "High+St,+Bangor/@54.6,-5.8,11z/data=!4m2!4m1")
+        self.assertEqual(extract_waypoints_from_gmaps_url(url),
+                         ["19 Drury Lane, Comber", "Main St, Newtownards", "High St, Bangor"])
+
+    def test_current_location_origin_is_none(self):
+        url = "https://www.google.com/maps/dir//Main+St,+Newtownards/High+St,+Bangor/@54.6,-5.8,11z"
+        self.assertEqual(extract_waypoints_from_gmaps_url(url), [None, "Main St, Newtownards", "High St, Bangor"])
+
+    def test_daddr_to_stops(self):
+        url = "https://maps.google.com/?saddr=Comber&daddr=Main+St,+Newtownards+to:High+St,+Bangor"
+        self.assertEqual(extract_waypoints_from_gmaps_url(url),
+                         ["Comber", "Main St, Newtownards", "High St, Bangor"])
+
+    def test_place_url_has_no_waypoints(self):
+        self.assertEqual(extract_waypoints_from_gmaps_url("https://www.google.com/maps/place/Comber"), [])
+
+
+class TestLegRows(unittest.TestCase):
+
+    def test_each_leg_is_a_row_in_one_append(self):
+        sheet = MemorySheet()
+        calls = []
+        sheet.append_row = lambda row: calls.append([row])
+        sheet.append_rows = lambda rows: calls.append(rows)
+
+        journey = {"legs": [leg("Comber", "Newtownards", 5.0), leg("Newtownards", "Bangor", 4.5)]}
+        timestamp = datetime(2025, 6, 30, 9, 0, tzinfo=ZoneInfo("Europe/London"))
+        append_journey_to_sheet(sheet, journey, "https://maps.app.goo.gl/x", timestamp=timestamp)
+
+        self.assertEqual(len(calls), 1)
+        rows = calls[0]
+        self.assertEqual([(r[3], r[5], r[7], r[9]) for r in rows],
+                         [("Comber", "Newtownards", "5.00", "Leg 1/2"), ("Newtownards", "Bangor", "4.50", "Leg 2/2")])
+
+
+if __name__ == "__main__":
+    unittest.main()
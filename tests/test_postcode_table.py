@@ -0,0 +1,74 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from journeylogger.gazetteer import read_rows
+from journeylogger.postcode_table import POSTCODE_TABLE_PATH, PostcodeTable, build_rows, main, outcode
+
+ROWS = [
+    {"key": "BT23", "post_town": "Newtownards", "admin_district": "Ards and North Down", "ward": "", "lat": "", "lon": ""},
+    {"key": "BT23 6", "post_town": "Newtownards", "admin_district": "Newry, Mourne and Down", "ward": "Killinchy",
+     "lat": "", "lon": ""},
+    {"key": "BT1", "post_town": "Belfast", "admin_district": "Belfast", "ward": "", "lat": "", "lon": ""},
+]
+
+
+class TestPostcodeTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = PostcodeTable(ROWS)
+
+    def test_outcode(self):
+        self.assertEqual(outcode("bt23 5ab"), "BT23")
+        self.assertEqual(outcode("BT235AB"), "BT23")
+        self.assertEqual(outcode("BT23"), "BT23")
+
+    def test_sector_row_wins_over_outcode(self):
+        self.assertEqual(self.table.town("BT23 6XY"), "Newry, Mourne and Down")
+        self.assertEqual(self.table.town("bt235ab"), "Ards and North Down")
+        self.assertEqual(self.table.town("BT1 1AA"), "Belfast")
+
+    def test_unknown_postcode(self):
+        self.assertIsNone(self.table.town("SW1A 1AA"))
+        self.assertIsNone(self.table.town(""))
+
+    def test_shipped_table(self):
+        table = PostcodeTable.from_csv(POSTCODE_TABLE_PATH)
+        self.assertEqual(table.town("BT19 1AA"), "Ards and North Down")
+        self.assertTrue(all(row["admin_district"] for row in table.rows))
+
+
+class TestRefresh(unittest.TestCase):
+
+    def test_build_rows_takes_most_common_district(self):
+        records = [("BT23 5AA", "Ards and North Down", "Comber North", "54.55", "-5.74"),
+                   ("BT23 5AB", "Ards and North Down", "Comber North", "54.56", "-5.75"),
+                   ("BT23 6AA", "Newry, Mourne and Down", "Killinchy", "54.50", "-5.70")]
+        rows = {r["key"]: r for r in build_rows(records, {"BT23": "Newtownards"})}
+        self.assertEqual(set(rows), {"BT23", "BT23 5", "BT23 6"})
+        self.assertEqual(rows["BT23"]["admin_district"], "Ards and North Down")
+        self.assertEqual(rows["BT23"]["ward"], "")
+        self.assertEqual(rows["BT23 5"]["ward"], "Comber North")
+        self.assertEqual((rows["BT23 5"]["lat"], rows["BT23 5"]["lon"]), (54.555, -5.745))
+        self.assertEqual(rows["BT23 6"]["post_town"], "Newtownards")
+
+    def test_main_keeps_header_and_post_towns(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            table = Path(tmp) / "bt_postcodes.csv"
+            table.write_text("# source\nkey,post_town,admin_district,ward,lat,lon\nBT23,Newtownards,Old,,,\n",
+                             encoding="utf-8")
+            source = Path(tmp) / "postcodes.csv"
+            source.write_text("Postcode,Latitude,Longitude,District,Ward\n"
+                              "BT23 5AA,54.55,-5.74,Ards and North Down,Comber North\n"
+                              "SW1A 1AA,51.5,-0.14,Westminster,St James's\n", encoding="utf-8")
+
+            self.assertEqual(main(["--postcodes", str(source), "--table", str(table)]), 0)
+            self.assertTrue(table.read_text(encoding="utf-8").startswith("# source\n"))
+            rows = read_rows(table)
+            self.assertEqual([r["key"] for r in rows], ["BT23", "BT23 5"])
+            self.assertEqual(rows[0]["post_town"], "Newtownards")
+            self.assertEqual(rows[0]["admin_district"], "Ards and North Down")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import io
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from journeylogger.log_utils import propagate
+from journeylogger.profiling import format_stage_table, stage, timing
+
+
+def work(name, seconds=0.01):
+    with stage(name):
+        time.sleep(seconds)
+
+
+class TestStageTiming(unittest.TestCase):
+
+    def test_stages_add_up_in_pipeline_order(self):
+        with timing() as timer:
+            work("route")
+            work("geocode")
+            work("geocode")
+            work("custom", 0)
+        rows = timer.rows(wall_s=0.1)
+        self.assertEqual([r[0] for r in rows], ["geocode", "route", "custom", "other"])
+        self.assertEqual(rows[0][1], 2)
+        self.assertGreaterEqual(rows[0][2], 20)
+        self.assertIn("geocode", format_stage_table(timer, 0.1))
+
+    def test_worker_threads_report_through_propagate(self):
+        with timing() as timer:
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                list(pool.map(propagate(work), ["geocode"] * 3))
+        self.assertEqual(timer.calls["geocode"], 3)
+
+    def test_no_op_outside_timing(self):
+        work("geocode", 0)
+        with timing() as timer:
+            pass
+        self.assertEqual(timer.calls, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
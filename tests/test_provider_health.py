@@ -0,0 +1,104 @@
+import unittest
+
+from journeylogger import http_client
+from journeylogger.provider_health import CLOSED, HALF_OPEN, OPEN, HealthRegistry, ProviderHealth, registry, run_cascade
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.health = ProviderHealth("photon", failure_threshold=3, cooldown_s=30, clock=self.clock)
+
+    def test_opens_after_consecutive_failures(self):
+        for _ in range(2):
+            self.health.record(False, 10.0)
+        self.assertEqual(self.health.state, CLOSED)
+        self.health.record(False, 10.0)
+        self.assertEqual(self.health.state, OPEN)
+        self.assertFalse(self.health.allow())
+
+    def test_success_resets_the_failure_count(self):
+        for ok in (False, False, True, False, False):
+            self.health.record(ok, 0.1)
+        self.assertEqual(self.health.state, CLOSED)
+
+    def test_half_open_allows_a_single_probe(self):
+        for _ in range(3):
+            self.health.record(False, 10.0)
+        self.clock.now = 31
+        self.assertEqual(self.health.state, HALF_OPEN)
+        self.assertTrue(self.health.allow())
+        self.assertFalse(self.health.allow())  # probe still in flight
+
+        self.health.record(False, 10.0)  # probe failed: straight back to open
+        self.assertEqual(self.health.state, OPEN)
+
+        self.clock.now = 62
+        self.assertTrue(self.health.allow())
+        self.health.record(True, 0.2)
+        self.assertEqual(self.health.state, CLOSED)
+        self.assertTrue(self.health.allow())
+
+
+class TestOrdering(unittest.TestCase):
+
+    def test_static_order_until_enough_samples(self):
+        registry = HealthRegistry()
+        registry.get("photon").record(False, 10.0)
+        self.assertEqual(registry.order(["ors", "nominatim", "photon"]), ["ors", "nominatim", "photon"])
+
+    def test_latency_never_reorders(self):
+        registry = HealthRegistry()
+        for _ in range(5):
+            registry.get("nominatim").record(True, 2.0)
+            registry.get("photon").record(True, 0.1)
+        self.assertEqual(registry.order(["nominatim", "photon", "ors"]), ["nominatim", "photon", "ors"])
+
+    def test_open_and_failing_providers_go_last_in_order(self):
+        registry = HealthRegistry(failure_threshold=3)
+        for _ in range(3):
+            registry.get("nominatim").record(False, 10.0)
+        for ok in (True, False, True, False, False, True, False):  # 3/7 succeed, never 3 failures in a row
+            registry.get("photon").record(ok, 0.1)
+
+        self.assertEqual(registry.order(["nominatim", "photon", "ors"]), ["ors", "nominatim", "photon"])
+        stats = {s["provider"]: s for s in registry.snapshot()}
+        self.assertEqual(stats["nominatim"]["state"], OPEN)
+        self.assertEqual(stats["photon"]["state"], CLOSED)
+
+    def test_record_and_replay_keep_the_given_order(self):
+        tried = []
+
+        def step(name):
+            return name, lambda _: tried.append(name)
+
+        for _ in range(3):
+            registry.get("nominatim").record(False, 10.0)
+        try:
+            for mode in ("record", "replay"):
+                http_client.configure(mode=mode)
+                tried.clear()
+                run_cascade([step("nominatim"), step("photon")], "Comber")
+                self.assertEqual(tried, ["nominatim", "photon"], mode)
+
+            http_client.configure(mode="live")
+            tried.clear()
+            run_cascade([step("nominatim"), step("photon")], "Comber")
+            self.assertEqual(tried, ["photon", "nominatim"])
+        finally:
+            http_client.configure(mode="live")
+            registry.reset()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import tempfile
+import unittest
+
+from journeylogger import geocache, http_client, routing
+
+POINTS = [(54.5968, -5.9301), (54.6536, -5.6685), (54.5910, -5.6920)]
+OSRM_COORDS = "-5.9301,54.5968;-5.6685,54.6536;-5.692,54.591"
+
+
+class TestRouting(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = http_client.FixtureStore(self.tmp.name)
+        http_client.configure(mode="replay", fixture_dir=self.tmp.name)
+        self.cache = geocache.route_cache
+        geocache.route_cache = geocache.RouteCache()
+
+    def tearDown(self):
+        http_client.configure(mode="live")
+        geocache.route_cache = self.cache
+        routing.configure(fallback="")
+        self.tmp.cleanup()
+
+    def test_osrm_legs_are_cached(self):
+        url = f"http://localhost:5000/route/v1/driving/{OSRM_COORDS}"
+        self.store.add("osrm", "GET", url, params={"overview": "false"},
+                       payload={"code": "Ok", "routes": [{"legs": [{"distance": 20921.5}, {"distance": 8046.7}]}]})
+        backend = routing.make_backend("osrm")
+        self.assertEqual([round(m, 2) for m in routing.route_legs(POINTS, backend)], [13.0, 5.0])
+
+        http_client.configure(mode="replay", fixture_dir=tempfile.mkdtemp())  # no fixtures: must come from cache
+        self.assertEqual(len(routing.route_legs(POINTS, backend)), 2)
+
+    def test_self_hosted_ors(self):
+        backend = routing.make_backend("ors-local", "http://router:8080/ors")
+        self.assertTrue(backend.ready)
+        self.store.add("ors-local", "POST", "http://router:8080/ors/v2/directions/driving-car",
+                       body={"coordinates": [[-5.9301, 54.5968], [-5.6685, 54.6536]]},
+                       payload={"routes": [{"summary": {"distance": 16093.44}}]})
+        self.assertEqual(routing.route_legs(POINTS[:2], backend), [10.0])
+
+    def test_public_ors_needs_a_key(self):
+        self.assertFalse(routing.make_backend("ors").ready)
+        self.assertTrue(routing.make_backend("ors", ors_api_key="key").ready)
+        with self.assertRaises(ValueError):
+            routing.make_backend("carrier-pigeon")
+
+    def test_backend_without_legs_is_abstract(self):
+        with self.assertRaises(TypeError):
+            routing.RoutingBackend()
+
+    def test_fallback_covers_a_backend_that_is_not_ready(self):
+        keyless = routing.make_backend("ors")
+        self.assertIsNone(routing.route_legs(POINTS, keyless))
+        routing.configure(fallback="estimate")
+        self.assertEqual(routing.route_legs(POINTS, keyless), routing.route_legs(POINTS, routing.EstimateBackend()))
+        self.assertEqual(len(geocache.route_cache), 0)
+
+    def test_estimate_and_fallback(self):
+        estimate = routing.route_legs(POINTS, routing.make_backend("estimate"))
+        self.assertEqual(len(estimate), 2)
+        self.assertEqual(len(geocache.route_cache), 0)
+
+        osrm = routing.make_backend("osrm")  # no fixture → request fails
+        self.assertIsNone(routing.route_legs(POINTS, osrm))
+        routing.configure(fallback="estimate")
+        self.assertEqual(routing.route_legs(POINTS, osrm), estimate)
+        self.assertEqual(len(geocache.route_cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from journeylogger.settlement_index import FuzzySettlementIndex, aliases, fold
+
+SETTLEMENTS = ["Newtownards", "Warrenpoint / Burren", "Omagh Town", "Metropolitan Lisburn",
+               "Ballymena", "Ballymoney", "Annaghmore (Moss Road)"]
+
+
+class TestSettlementIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = FuzzySettlementIndex(SETTLEMENTS)
+
+    def test_fold_and_aliases(self):
+        self.assertEqual(fold("Newtown Ards"), "newtownards")
+        self.assertEqual(aliases("Warrenpoint / Burren"), ["Warrenpoint", "Burren"])
+        self.assertEqual(aliases("Omagh Town"), ["Omagh"])
+        self.assertEqual(aliases("Metropolitan Lisburn"), ["Lisburn"])
+        self.assertEqual(aliases("Annaghmore (Moss Road)"), ["Annaghmore"])
+
+    def test_spacing_variant_is_exact(self):
+        self.assertEqual(self.index.match("Newtown Ards"), ("Newtownards", 1.0))
+        self.assertEqual(self.index.match("omagh"), ("Omagh", 1.0))
+
+    def test_typos_resolve_with_confidence(self):
+        town, score = self.index.match("Newtonards")
+        self.assertEqual(town, "Newtownards")
+        self.assertGreater(score, 0.75)
+        self.assertEqual(self.index.match("Warenpoint")[0], "Warrenpoint")
+        self.assertEqual(self.index.match("Ballymenna")[0], "Ballymena")
+
+    def test_unrelated_text_below_threshold(self):
+        self.assertIsNone(self.index.match("Drury Lane", min_score=0.75))
+        self.assertIsNone(self.index.match("xq"))
+
+
+if __name__ == "__main__":
+    unittest.main()
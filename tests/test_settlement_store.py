@@ -0,0 +1,65 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from journeylogger.postcode_table import postcode_re
+from journeylogger.settlement_store import SettlementStore, read_places, read_towns_csv, settlement_key, write_store
+
+NAMES = ["Newtownards", "Gibson's Hill", "Bangor", "Newtown", "Stratford-upon-Avon", "Newtown", "Bangor"]
+
+class TestSettlementStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = SettlementStore.from_names(NAMES)
+
+    def test_keys(self):
+        self.assertEqual(settlement_key("GIBSON'S  Hill"), "gibson s hill")
+        self.assertEqual(len(self.store), 5)
+        self.assertEqual(self.store.max_words, 3)
+        self.assertEqual(self.store.names(), ["Newtownards", "Gibson's Hill", "Bangor", "Newtown", "Stratford-upon-Avon"])
+
+    def test_get_and_find_whole_words(self):
+        self.assertEqual(self.store.get("bangor"), ("Bangor", 2))
+        self.assertIsNone(self.store.get("bang"))
+        self.assertEqual(self.store.find_in("12 Gibson's Hill Road"), [("Gibson's Hill", 1)])
+        self.assertEqual(self.store.find_in("Newtownards Road, Bangor"), [("Newtownards", 0), ("Bangor", 2)])
+        self.assertEqual(self.store.find_in("Stratford upon Avon"), [("Stratford-upon-Avon", 4)])
+        self.assertEqual(self.store.find_in("Stratford upon Thames"), [])
+        self.assertEqual(SettlementStore.from_names([]).find_in("Bangor"), [])
+
+    def test_memory_mapped_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "settlements.idx"
+            self.assertEqual(write_store(NAMES, path), 5)
+            store = SettlementStore.open(path)
+            self.assertEqual(store.get("newtown"), ("Newtown", 3))
+            store.close()
+
+            path.write_bytes(b"not a store at all")
+            with self.assertRaises(ValueError):
+                SettlementStore.open(path)
+
+    def test_sources(self):
+        towns = read_towns_csv()
+        self.assertIn("Newtownards", towns)
+        self.assertFalse(any("(" in t or "[" in t for t in towns))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "places.csv"
+            path.write_text("place22nm,popcnt\nLeeds,500000\nYork,150000\nLondon,9000000\n")
+            self.assertEqual(read_places(path), ["London", "Leeds", "York"])
+            path.write_text("x\n1\n")
+            with self.assertRaises(ValueError):
+                read_places(path)
+
+
+class TestPostcodeGrammar(unittest.TestCase):
+
+    def test_uk_formats(self):
+        for pc in ["BT23 5AB", "bt235ab", "SW1A 2AA", "M1 1AE", "B33 8TH", "CR2 6XH", "DN55 1PT", "W1A 0AX", "GIR 0AA"]:
+            self.assertTrue(postcode_re.fullmatch(pc), pc)
+        for text in ["BT99 XDX", "QA1 1AA", "B33 8CH", "12345", "A1 AAA"]:
+            self.assertIsNone(postcode_re.search(text), text)
+
+
+if __name__ == "__main__":
+    unittest.main()
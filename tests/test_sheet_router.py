@@ -0,0 +1,115 @@
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from journeylogger.sheet_router import SheetRouter
+
+MAPPING = {
+    "default": "sheet-default",
+    "teams": {"north": "sheet-north", "south": {"sheet_id": "sheet-south", "worksheet": "Mileage"}, "broken": {}},
+    "users": {"1": "north", "2": "south", 3: "sheet-direct"},
+}
+
+
+class FakeOpener:
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, sheet_id, worksheet=None):
+        with self._lock:
+            self.calls.append((sheet_id, worksheet))
+        return object()
+
+
+class TestSheetRouter(unittest.TestCase):
+
+    def setUp(self):
+        self.opener = FakeOpener()
+        self.router = SheetRouter(MAPPING, default_sheet_id="sheet-env", opener=self.opener, pool_size=2)
+
+    def test_targets(self):
+        self.assertEqual(self.router.target_for(1), ("sheet-north", None))
+        self.assertEqual(self.router.target_for("2"), ("sheet-south", "Mileage"))
+        self.assertEqual(self.router.target_for(3), ("sheet-direct", None))
+        self.assertEqual(self.router.target_for(99), ("sheet-default", None))
+        self.assertNotIn("broken", self.router.teams)
+
+    def test_env_sheet_when_mapping_has_no_default(self):
+        router = SheetRouter({"users": {"1": "x"}}, default_sheet_id="sheet-env", opener=self.opener)
+        self.assertEqual(router.target_for(42), ("sheet-env", None))
+
+    def test_handles_pooled_and_shared_between_team_members(self):
+        mapping = {**MAPPING, "users": {**MAPPING["users"], "4": "north"}}
+        router = SheetRouter(mapping, opener=self.opener, pool_size=2)
+        threads = [threading.Thread(target=router.sheet_for, args=(uid,)) for uid in ("1", "4") * 10]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertIs(router.sheet_for(1), router.sheet_for(4))
+        self.assertEqual(self.opener.calls, [("sheet-north", None)])
+
+    def test_slow_open_does_not_block_other_sheets(self):
+        release = threading.Event()
+
+        def opener(sheet_id, worksheet=None):
+            if sheet_id == "sheet-north":
+                release.wait(5)
+            return self.opener(sheet_id, worksheet)
+
+        router = SheetRouter(MAPPING, opener=opener)
+        slow = threading.Thread(target=router.sheet_for, args=(1,))
+        slow.start()
+        try:
+            router.sheet_for(99)  # returns while north is still opening
+            self.assertEqual(self.opener.calls, [("sheet-default", None)])
+        finally:
+            release.set()
+            slow.join()
+        self.assertEqual(router.opens, 2)
+
+    def test_failed_open_is_retried(self):
+        attempts = []
+
+        def opener(sheet_id, worksheet=None):
+            attempts.append(sheet_id)
+            if len(attempts) == 1:
+                raise ConnectionError("sheets api down")
+            return object()
+
+        router = SheetRouter(MAPPING, opener=opener)
+        with self.assertRaises(ConnectionError):
+            router.sheet_for(1)
+        self.assertIsNotNone(router.sheet_for(1))
+        self.assertEqual(attempts, ["sheet-north", "sheet-north"])
+
+    def test_pool_is_bounded_lru(self):
+        self.router.sheet_for(1)
+        self.router.sheet_for(2)
+        self.router.sheet_for(1)
+        self.router.sheet_for(99)   # evicts south, the least recently used
+        self.assertEqual(len(self.router), 2)
+        self.router.sheet_for(1)
+        self.router.sheet_for(2)
+        self.assertEqual(self.router.opens, 4)
+
+    def test_missing_or_bad_file_routes_to_default(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            missing = SheetRouter.from_file(Path(tmp) / "sheets.json", default_sheet_id="sheet-env", opener=self.opener)
+            self.assertEqual(missing.target_for(1), ("sheet-env", None))
+
+            path = Path(tmp) / "bad.json"
+            path.write_text("{not json")
+            bad = SheetRouter.from_file(path, default_sheet_id="sheet-env", opener=self.opener)
+            self.assertEqual(bad.target_for(1), ("sheet-env", None))
+
+            path.write_text(json.dumps(MAPPING))
+            self.assertEqual(SheetRouter.from_file(path, opener=self.opener).target_for(2), ("sheet-south", "Mileage"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import asyncio
+import unittest
+from datetime import datetime, timezone
+
+from telegram import Chat, Message, Update
+from telegram.error import BadRequest
+
+from journeylogger.telegram_bot import (ChatOrderedUpdateProcessor, ProgressMessage, extract_maps_links,
+                                        format_batch_reply)
+
+
+def journey(origin, dest, miles, visit_type="visit", legs=None):
+    result = {
+        "origin": {"town": origin, "postcode": "BT1 1AA"},
+        "destination": {"town": dest, "postcode": "BT2 2BB", "visit_type": visit_type},
+        "distance_miles": miles,
+    }
+    if legs:
+        result["legs"] = legs
+    return result
+
+
+class TestExtractMapsLinks(unittest.TestCase):
+
+    def test_links_in_message_order(self):
+        text = ("Morning run: https://maps.app.goo.gl/abc123?g_st=iw then "
+                "(https://maps.apple.com/?daddr=Main%20St,%20Bangor), and https://maps.app.goo.gl/xyz789.")
+        self.assertEqual(extract_maps_links(text), [
+            "https://maps.app.goo.gl/abc123?g_st=iw",
+            "https://maps.apple.com/?daddr=Main%20St,%20Bangor",
+            "https://maps.app.goo.gl/xyz789",
+        ])
+
+    def test_other_links_and_empty_text(self):
+        self.assertEqual(extract_maps_links("see https://example.com/maps.app.goo.gl/x"), [])
+        self.assertEqual(extract_maps_links(""), [])
+        self.assertEqual(extract_maps_links(None), [])
+
+
+class TestFormatBatchReply(unittest.TestCase):
+
+    def test_lines_failures_and_total(self):
+        urls = ["https://maps.app.goo.gl/a", "https://maps.app.goo.gl/b", "https://maps.app.goo.gl/c",
+                "https://maps.app.goo.gl/d"]
+        results = [
+            journey("Comber", "Holywood", 9.0),
+            None,
+            journey("Holywood", "Bangor", None, visit_type="hospital"),
+            journey("Bangor", "Newtownards", 6.25, legs=[{}, {}]),
+        ]
+        reply = format_batch_reply(results, urls, "01 October 2026, 09:00 BST").splitlines()
+
+        self.assertEqual(reply[:2], ["🕑 Processed: 01 October 2026, 09:00 BST", "🧾 4 journeys:"])
+        self.assertEqual(reply[3:7], [
+            "1. Comber → Holywood (visit) — 9.00 mi",
+            "2. ❌ Could not process https://maps.app.goo.gl/b",
+            "3. Holywood → Bangor (hospital) — ? mi",
+            "4. Bangor → Newtownards (visit, 2 legs) — 6.25 mi",
+        ])
+        self.assertEqual(reply[-1], "🛣️ Total Estimated Road Distance: 15.25 miles")
+
+
+class FakeMessage:
+    """The bot's acknowledgement message: records every edit that reaches Telegram."""
+
+    def __init__(self, text="Got your link—processing…"):
+        self.text = text
+        self.edits = []
+
+    async def edit_text(self, text):
+        await asyncio.sleep(0.01)
+        if text == "not modified":
+            raise BadRequest("Message is not modified")
+        self.edits.append(text)
+
+
+class TestProgressMessage(unittest.TestCase):
+
+    def run_progress(self, scenario):
+        async def main():
+            message = FakeMessage()
+            await scenario(ProgressMessage(message, asyncio.get_running_loop()))
+            await asyncio.sleep(0.05)  # let scheduled edits settle
+            return message.edits
+        return asyncio.run(main())
+
+    def test_duplicate_texts_are_edited_once(self):
+        async def scenario(progress):
+            def worker():
+                for text in ("Got your link—processing…", "⏳ From Comber", "⏳ From Comber", "⏳ Comber → Bangor"):
+                    progress.push(text)
+            await asyncio.to_thread(worker)
+            await asyncio.sleep(0.1)
+            await progress.finish("✅ Comber → Bangor, 9.00 miles")
+            await progress.finish("✅ Comber → Bangor, 9.00 miles")
+
+        self.assertEqual(self.run_progress(scenario),
+                         ["⏳ From Comber", "⏳ Comber → Bangor", "✅ Comber → Bangor, 9.00 miles"])
+
+    def test_interim_edit_behind_the_final_text_is_dropped(self):
+        async def scenario(progress):
+            progress.push("⏳ Comber → Bangor")  # still queued when finish() takes over
+            await progress.finish("✅ done")
+
+        self.assertEqual(self.run_progress(scenario), ["✅ done"])
+
+    def test_rejected_edit_does_not_break_finish(self):
+        async def scenario(progress):
+            await progress.finish("not modified")
+            await progress.finish("✅ done")
+
+        self.assertEqual(self.run_progress(scenario), ["✅ done"])
+
+
+def update_in_chat(update_id, chat_id):
+    chat = Chat(id=chat_id, type=Chat.PRIVATE)
+    message = Message(message_id=update_id, date=datetime(2026, 10, 1, tzinfo=timezone.utc), chat=chat, text="x")
+    return Update(update_id=update_id, message=message)
+
+
+class TestChatOrderedUpdateProcessor(unittest.TestCase):
+
+    def run_updates(self, chat_ids):
+        events = []
+
+        async def handle(update_id):
+            events.append(("start", update_id))
+            await asyncio.sleep(0.02)
+            events.append(("end", update_id))
+
+        async def main():
+            processor = ChatOrderedUpdateProcessor()
+            await asyncio.gather(*(processor.do_process_update(update_in_chat(i, chat), handle(i))
+                                   for i, chat in enumerate(chat_ids, start=1)))
+            return processor
+
+        processor = asyncio.run(main())
+        self.assertEqual(processor._locks, {})  # idle chats are forgotten
+        return events
+
+    def test_one_chat_is_processed_in_order(self):
+        self.assertEqual(self.run_updates([7, 7, 7]),
+                         [("start", 1), ("end", 1), ("start", 2), ("end", 2), ("start", 3), ("end", 3)])
+
+    def test_different_chats_run_concurrently(self):
+        self.assertEqual(self.run_updates([7, 8]), [("start", 1), ("start", 2), ("end", 1), ("end", 2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from journeylogger.journey_store import JourneyStore
+from journeylogger.warmup import frequent_pairs, known_address_texts
+
+LONDON = ZoneInfo("Europe/London")
+
+
+def journey(dest_town, dest_pc, lat=54.65, lon=-5.67):
+    return ({
+        "origin": {"town": "Comber", "postcode": "BT23 5AB", "lat": 54.55, "lon": -5.74},
+        "destination": {"town": dest_town, "postcode": dest_pc, "lat": lat, "lon": lon},
+        "distance_miles": 10.0,
+    }, "https://maps.app.goo.gl/x")
+
+
+TRIPS = [journey("Bangor", "BT20 5AB")] * 3 + [journey("Lisburn", "BT28 1AA", lat=None, lon=None)] * 2 \
+    + [journey("Newry", "BT34 1AA", lat=54.17, lon=-6.33)]
+
+
+class TestWarmup(unittest.TestCase):
+
+    def test_known_address_texts_skip_geofences(self):
+        known = {"home": ["1 Main St", "1 main st"], "depot": ["BT99 1XX", {"lat": 54.6, "lon": -5.9}, "1 Main St"]}
+        self.assertEqual(known_address_texts(known), ["1 Main St", "1 main st", "BT99 1XX"])
+
+    def test_pairs_from_store_most_frequent_first(self):
+        store = JourneyStore(":memory:")
+        for i, trip in enumerate(TRIPS):
+            store.add_journeys([trip], timestamp=datetime(2026, 10, 1, 9, i, tzinfo=LONDON))
+        pairs = frequent_pairs(store=store, top=5)
+        store.close()
+        # Lisburn has no stored coordinates, so it is never warmed
+        self.assertEqual(pairs, [((54.55, -5.74), (54.65, -5.67)), ((54.55, -5.74), (54.17, -6.33))])
+
+    def test_no_pairs_without_history(self):
+        self.assertEqual(frequent_pairs(store=JourneyStore(":memory:")), [])
+        self.assertEqual(frequent_pairs(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
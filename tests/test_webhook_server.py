@@ -0,0 +1,59 @@
+import asyncio
+import json
+import unittest
+from types import SimpleNamespace
+
+from journeylogger.webhook_server import WebhookServer
+
+UPDATE = {
+    "update_id": 7,
+    "message": {
+        "message_id": 1,
+        "date": 1700000000,
+        "chat": {"id": 42, "type": "private"},
+        "from": {"id": 42, "is_bot": False, "first_name": "Driver"},
+        "text": "https://maps.app.goo.gl/abc",
+    },
+}
+
+
+class TestWebhookServer(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.app = SimpleNamespace(bot=None, update_queue=asyncio.Queue())
+        self.webhook = WebhookServer(self.app, url_path="/telegram", secret_token="s3cret")
+        await self.webhook.start("127.0.0.1", 0)
+
+    async def asyncTearDown(self):
+        await self.webhook.stop()
+
+    async def post(self, path: str, body: bytes, secret: str | None) -> int:
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.webhook.port)
+        headers = f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\nConnection: close\r\n"
+        if secret is not None:
+            headers += f"X-Telegram-Bot-Api-Secret-Token: {secret}\r\n"
+        writer.write(headers.encode() + b"\r\n" + body)
+        await writer.drain()
+        status_line = await reader.readline()
+        writer.close()
+        return int(status_line.split()[1])
+
+    async def test_valid_update_is_queued(self):
+        status = await self.post("/telegram", json.dumps(UPDATE).encode(), "s3cret")
+        self.assertEqual(status, 200)
+        update = self.app.update_queue.get_nowait()
+        self.assertEqual(update.update_id, 7)
+        self.assertEqual(update.message.text, "https://maps.app.goo.gl/abc")
+
+    async def test_wrong_or_missing_secret_is_rejected(self):
+        self.assertEqual(await self.post("/telegram", json.dumps(UPDATE).encode(), "nope"), 403)
+        self.assertEqual(await self.post("/telegram", json.dumps(UPDATE).encode(), None), 403)
+        self.assertTrue(self.app.update_queue.empty())
+
+    async def test_unknown_path_and_bad_json(self):
+        self.assertEqual(await self.post("/other", b"{}", "s3cret"), 404)
+        self.assertEqual(await self.post("/telegram", b"not json", "s3cret"), 400)
+
+
+if __name__ == "__main__":
+    unittest.main()